@@ -0,0 +1,295 @@
+"""
+Incremental columnar export of finished attempts for offline analytics.
+
+Finished `user_level_progress` rows (completed or failed), joined with their
+level and game, are written as Parquet files partitioned per event
+(`event=<id>/`) or per month of completion (`month=YYYY-MM/`). Top-level
+`result_data` keys become typed `result_<key>` columns (bool, int, float or
+string; nested values and mixed types are stored as JSON strings).
+
+Runs are incremental: the last exported (completion_time, progress_id) per
+source database is kept in `_watermark.json` in the output directory and
+only rows after it are read, in keyset-paginated batches of
+ANALYTICS_EXPORT_BATCH_SIZE. Each batch writes one file per partition, named
+after the starting watermark, so a run that died before saving its
+watermark is simply overwritten by the next one. Rows completed in the last
+ANALYTICS_EXPORT_SAFETY_LAG_SECONDS are left for the next run: completion_time
+is set before commit, so a slower transaction can still commit a row older
+than the watermark. A re-submitted attempt is
+exported again with a later completion_time; readers keep the last row per
+progress_id.
+
+Requires the optional `pyarrow` package.
+
+Usage:
+    python -m app.analytics export <output_dir> [--partition event|month]
+"""
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
+
+from app.core.config import settings
+from app.database import engine, shard_engines, sharding_enabled
+from app.models import EventLevel, Game, UserLevelProgress
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional, needed only to write files
+    pyarrow = None
+
+WATERMARK_FILE = "_watermark.json"
+PARTITIONS = ("event", "month")
+
+# Column -> Arrow type name, in file order; result_<key> columns follow
+BASE_COLUMNS = {
+    "progress_id": "int64",
+    "event_id": "int64",
+    "user_id": "int64",
+    "level_id": "int64",
+    "level_number": "int64",
+    "is_final_level": "bool",
+    "game_id": "int64",
+    "game_type": "string",
+    "game_name": "string",
+    "status": "string",
+    "is_passed": "bool",
+    "attempts_count": "int64",
+    "time_taken_seconds": "int64",
+    "start_time": "timestamp",
+    "completion_time": "timestamp",
+}
+
+Watermark = Tuple[datetime, int]
+
+
+def _sources() -> List[Tuple[str, object]]:
+    """(name, engine) of every database holding progress rows."""
+    if sharding_enabled():
+        return [(f"shard-{i}", shard) for i, shard in enumerate(shard_engines)]
+    return [("primary", engine)]
+
+
+def load_watermarks(out_dir: str) -> Dict[str, Watermark]:
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        raw = json.load(f)
+    return {source: (datetime.fromisoformat(wm["completion_time"]), wm["progress_id"]) for source, wm in raw.items()}
+
+
+def save_watermarks(out_dir: str, watermarks: Dict[str, Watermark]) -> None:
+    """Replace the watermark file atomically."""
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump({
+            source: {"completion_time": completed.isoformat(), "progress_id": progress_id}
+            for source, (completed, progress_id) in watermarks.items()
+        }, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def fetch_batches(conn, after: Optional[Watermark], batch_size: int, until: datetime) -> Iterator[list]:
+    """Finished attempts after the watermark and before until, oldest first, joined with their level."""
+    p, l = UserLevelProgress.__table__, EventLevel.__table__
+    query = select(
+        p.c.progress_id, p.c.event_id, p.c.user_id, p.c.level_id,
+        l.c.level_number, l.c.is_final_level, l.c.game_id,
+        p.c.status, p.c.is_passed, p.c.attempts_count, p.c.time_taken_seconds,
+        p.c.start_time, p.c.completion_time, p.c.result_data,
+    ).select_from(
+        p.join(l, l.c.level_id == p.c.level_id)
+    ).where(
+        p.c.completion_time.isnot(None),
+        p.c.completion_time < until,
+        p.c.status.in_(("completed", "failed")),
+    ).order_by(p.c.completion_time, p.c.progress_id).limit(batch_size)
+
+    while True:
+        batch_query = query
+        if after is not None:
+            completed, progress_id = after
+            batch_query = query.where(or_(
+                p.c.completion_time > completed,
+                and_(p.c.completion_time == completed, p.c.progress_id > progress_id),
+            ))
+        rows = conn.execute(batch_query).mappings().all()
+        if not rows:
+            return
+        yield rows
+        after = (rows[-1]["completion_time"], rows[-1]["progress_id"])
+        if len(rows) < batch_size:
+            return
+
+
+def _value_type(value) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int64"
+    if isinstance(value, float):
+        return "float64"
+    if isinstance(value, str):
+        return "string"
+    return "json"
+
+
+def flatten_results(raw_values: Sequence[Optional[str]]) -> Tuple[Dict[str, list], Dict[str, str]]:
+    """
+    Columns (result_<key> -> values) and their types for a batch of result_data
+    strings. A key whose values mix types, or holds lists / objects, is JSON text.
+    """
+    parsed = []
+    for raw in raw_values:
+        try:
+            value = json.loads(raw) if raw else {}
+        except ValueError:
+            value = {}
+        parsed.append(value if isinstance(value, dict) else {})
+
+    types: Dict[str, set] = {}
+    for result in parsed:
+        for key, value in result.items():
+            if value is not None:
+                types.setdefault(key, set()).add(_value_type(value))
+    # Keys that only ever held null still get a column
+    for result in parsed:
+        for key in result:
+            types.setdefault(key, set())
+
+    columns, column_types = {}, {}
+    for key in sorted(types):
+        kinds = types[key]
+        if kinds == {"int64", "float64"}:
+            kind = "float64"
+        elif len(kinds) == 1 and kinds != {"json"}:
+            kind = kinds.pop()
+        elif not kinds:
+            kind = "string"
+        else:
+            kind = "json"
+        values = [result.get(key) for result in parsed]
+        if kind == "json":
+            values = [None if v is None else json.dumps(v, separators=(",", ":")) for v in values]
+            kind = "string"
+        elif kind == "float64":
+            values = [None if v is None else float(v) for v in values]
+        columns[f"result_{key}"] = values
+        column_types[f"result_{key}"] = kind
+    return columns, column_types
+
+
+def build_columns(rows: Sequence[dict], games: Dict[int, tuple]) -> Tuple[Dict[str, list], Dict[str, str]]:
+    """Column-oriented batch with types (see BASE_COLUMNS) ready for a writer."""
+    columns = {name: [] for name in BASE_COLUMNS}
+    for row in rows:
+        game_type, game_name = games.get(row["game_id"], (None, None))
+        for name in BASE_COLUMNS:
+            if name == "game_type":
+                columns[name].append(game_type)
+            elif name == "game_name":
+                columns[name].append(game_name)
+            elif name in ("is_final_level", "is_passed"):
+                columns[name].append(bool(row[name]) if row[name] is not None else None)
+            else:
+                columns[name].append(row[name])
+    types = dict(BASE_COLUMNS)
+    result_columns, result_types = flatten_results([row["result_data"] for row in rows])
+    columns.update(result_columns)
+    types.update(result_types)
+    return columns, types
+
+
+def partition_of(row: dict, partition: str) -> str:
+    if partition == "month":
+        return f"month={row['completion_time']:%Y-%m}"
+    return f"event={row['event_id']}"
+
+
+def write_parquet(path: str, columns: Dict[str, list], types: Dict[str, str]) -> None:
+    if pyarrow is None:
+        raise RuntimeError("The analytics export needs pyarrow (pip install pyarrow)")
+    arrow_types = {
+        "int64": pyarrow.int64(), "float64": pyarrow.float64(), "bool": pyarrow.bool_(),
+        "string": pyarrow.string(), "timestamp": pyarrow.timestamp("us"),
+    }
+    table = pyarrow.table({
+        name: pyarrow.array(values, type=arrow_types[types[name]]) for name, values in columns.items()
+    })
+    pyarrow.parquet.write_table(table, path, compression=settings.ANALYTICS_EXPORT_COMPRESSION)
+
+
+def export_progress(
+    out_dir: str,
+    partition: str = "event",
+    batch_size: Optional[int] = None,
+    sources: Optional[List[Tuple[str, object]]] = None,
+    central=None,
+    writer: Callable[[str, Dict[str, list], Dict[str, str]], None] = write_parquet,
+) -> Dict[str, int]:
+    """
+    Export rows finished since the last run into out_dir.
+    Returns {"rows": exported rows, "files": files written}.
+    """
+    if partition not in PARTITIONS:
+        raise ValueError(f"partition must be one of {PARTITIONS}")
+    batch_size = batch_size or settings.ANALYTICS_EXPORT_BATCH_SIZE
+    sources = sources if sources is not None else _sources()
+    os.makedirs(out_dir, exist_ok=True)
+
+    g = Game.__table__
+    with (central or engine).connect() as conn:
+        games = {game_id: (game_type, game_name) for game_id, game_type, game_name in conn.execute(
+            select(g.c.game_id, g.c.game_type, g.c.game_name)
+        )}
+
+    watermarks = load_watermarks(out_dir)
+    # completion_time is stamped with datetime.utcnow() (naive UTC)
+    until = datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_EXPORT_SAFETY_LAG_SECONDS)
+    totals = {"rows": 0, "files": 0}
+    for source, source_engine in sources:
+        start = watermarks.get(source)
+        # Files are named after where this run started, so a rerun overwrites them
+        run_id = hashlib.blake2b(
+            f"{source}:{start[0].isoformat()}:{start[1]}".encode() if start else source.encode(),
+            digest_size=6
+        ).hexdigest()
+
+        with source_engine.connect() as conn:
+            for number, rows in enumerate(fetch_batches(conn, start, batch_size, until)):
+                by_partition: Dict[str, list] = {}
+                for row in rows:
+                    by_partition.setdefault(partition_of(row, partition), []).append(row)
+                for key, partition_rows in by_partition.items():
+                    directory = os.path.join(out_dir, key)
+                    os.makedirs(directory, exist_ok=True)
+                    columns, types = build_columns(partition_rows, games)
+                    writer(os.path.join(directory, f"part-{source}-{run_id}-{number:05d}.parquet"), columns, types)
+                    totals["files"] += 1
+                totals["rows"] += len(rows)
+                watermarks[source] = (rows[-1]["completion_time"], rows[-1]["progress_id"])
+
+        save_watermarks(out_dir, watermarks)
+    return totals
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] != "export":
+        print(__doc__)
+        return 1
+    partition = "event"
+    if "--partition" in argv:
+        partition = argv[argv.index("--partition") + 1]
+    totals = export_progress(argv[1], partition=partition)
+    print(f"✅ Exported {totals['rows']} rows in {totals['files']} files to {argv[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
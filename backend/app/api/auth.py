@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.database import get_db
 from app.schemas.auth import SendOTPRequest, VerifyOTPRequest, TokenResponse
 from app.schemas.user import UserResponse
-from app.services.otp_service import create_otp, send_otp_sms
-from app.services.auth_service import get_or_create_user, create_user_token
+from app.services.otp_service import create_otp, send_otp_sms, mark_otp_verified
+from app.services.auth_service import get_or_create_user, create_user_token, update_user_profile
 from app.utils.dependencies import get_current_user
 from app.models.user import User
 from app.models.otp import OTPVerification
@@ -17,7 +18,7 @@ async def send_otp(request: SendOTPRequest, db: Session = Depends(get_db)):
     """Send OTP to phone number."""
     try:
         # Create OTP
-        otp_record, otp_code = create_otp(db, request.phone_number)
+        otp_record, otp_code = await run_in_threadpool(create_otp, db, request.phone_number)
         
         # Send OTP via SMS
         sms_sent = await send_otp_sms(request.phone_number, otp_code)
@@ -89,12 +90,11 @@ async def verify_otp_endpoint(
         )
     
     # NOW mark OTP as verified (only after all checks pass)
-    otp_record.is_verified = True
-    db.commit()
+    await run_in_threadpool(mark_otp_verified, db, otp_record.otp_id)
     print(f"✅ OTP marked as verified")
     
     # Get or create user
-    user = get_or_create_user(db, request.phone_number, request.name)
+    user = await run_in_threadpool(get_or_create_user, db, request.phone_number, request.name)
     print(f"✅ User: {user.name} (ID: {user.user_id})")
     
     # Create token
@@ -117,12 +117,4 @@ def update_me(
     db: Session = Depends(get_db)
 ):
     """Update current user profile."""
-    if name:
-        current_user.name = name
-    if email:
-        current_user.email = email
-    
-    db.commit()
-    db.refresh(current_user)
-    
-    return current_user
+    return update_user_profile(db, current_user.user_id, name=name, email=email)
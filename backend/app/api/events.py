@@ -1,29 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Literal, Optional
+from app.database import get_db, get_event_db, get_event_read_db, get_read_db, place_events, remember_shard
 from app.schemas.event import (
     EventCreate, EventUpdate, EventResponse, 
-    EventDetailResponse, EventPublicResponse
+    EventDetailResponse, EventPublicResponse,
+    EventProvisionRequest, EventProvisionResponse
 )
 from app.models.event import Event
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, get_optional_user_id
+from app.core.config import settings
+from app.core.http_cache import cache_headers, cached_json, is_not_modified, not_modified
+from app.core.responses import row_fields
+from app.services.event_service import (
+    as_utc, encrypt_name, get_event as get_event_snapshot, get_event_by_token, invalidate_event
+)
+from app.services.export_service import MEDIA_TYPES, parse_fields, stream_export
+from app.services.funnel_service import drop_funnel
+from app.services.manifest_service import get_manifest, invalidate_manifest
+from app.services.purge_service import purge_status, remaining_rows, schedule_purge, sessions_like
+from app.services.progress_service import load_progress, summarize_progress
+from app.services.provisioning_service import load_template, provision_events
+from app.services.stats_service import get_event_stats
 from app.models.user import User
-import base64
+from app.api.leaderboard import invalidate_leaderboard
+from datetime import datetime
 
 router = APIRouter()
 
 
-def encrypt_name(name: str) -> str:
-    """Simple base64 encoding (use proper encryption in production)."""
-    return base64.b64encode(name.encode()).decode()
-
-
-def decrypt_name(encrypted: str) -> str:
-    """Simple base64 decoding."""
-    return base64.b64decode(encrypted.encode()).decode()
-
-
 @router.post("", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
 def create_event(
     event: EventCreate,
@@ -47,19 +53,57 @@ def create_event(
         baby_name_encrypted=encrypted_name,
         qr_code_token=qr_token,
         total_levels=event.total_levels,
-        event_start_time=event.event_start_time,
-        event_end_time=event.event_end_time,
+        # Stored as naive UTC, which the lifecycle scheduler compares against
+        event_start_time=as_utc(event.event_start_time),
+        event_end_time=as_utc(event.event_end_time),
         description=event.description,
         theme_config=event.theme_config
     )
     
     db.add(db_event)
+    db.flush()
+    placements = place_events(db, [db_event.event_id])
     db.commit()
     db.refresh(db_event)
+    for event_id, shard_id in placements.items():
+        remember_shard(event_id, shard_id)
+    # Drop any negative entry for the new id / token
+    invalidate_event(db_event.event_id, db_event.qr_code_token)
     
     return db_event
 
 
+@router.post("/bulk", response_model=EventProvisionResponse)
+def provision_events_in_bulk(
+    request: EventProvisionRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many events in one transaction (admin), optionally cloning a
+    template event's levels and media. Invalid items are reported per item
+    and skipped; the rest are created.
+    """
+    if len(request.events) > settings.EVENT_PROVISION_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.EVENT_PROVISION_MAX_ITEMS} events per request"
+        )
+    
+    template = None
+    if request.template_event_id is not None:
+        template = load_template(db, request.template_event_id)
+        if template is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Template event not found"
+            )
+    
+    results = provision_events(db, request.events, template, request.clone_media)
+    created = sum(1 for result in results if result["status"] == "created")
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+
 @router.get("", response_model=List[EventResponse])
 def list_events(
     skip: int = 0,
@@ -68,14 +112,14 @@ def list_events(
     current_user: User = Depends(get_current_user)
 ):
     """List all events (admin)."""
-    events = db.query(Event).offset(skip).limit(limit).all()
+    events = db.query(Event).filter(Event.deleted_at.is_(None)).offset(skip).limit(limit).all()
     return events
 
 
 @router.get("/qr/{qr_token}", response_model=EventPublicResponse)
-def get_event_by_qr(qr_token: str, db: Session = Depends(get_db)):
-    """Get event details by QR code token (public endpoint)."""
-    event = db.query(Event).filter(Event.qr_code_token == qr_token).first()
+def get_event_by_qr(qr_token: str, request: Request, db: Session = Depends(get_read_db)):
+    """Get event details by QR code token (public endpoint, cached snapshot)."""
+    event = get_event_by_token(db, qr_token)
     
     if not event:
         raise HTTPException(
@@ -89,17 +133,65 @@ def get_event_by_qr(qr_token: str, db: Session = Depends(get_db)):
             detail="Event has ended"
         )
     
-    return event
+    return cached_json(
+        request, event.public_body, settings.HTTP_CACHE_EVENT_MAX_AGE,
+        last_modified=event.last_modified, etag=event.public_etag
+    )
+
+
+@router.get("/qr/{qr_token}/manifest")
+def get_event_manifest(
+    qr_token: str,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    user_id: Optional[int] = Depends(get_optional_user_id)
+):
+    """
+    Event, enabled levels with game metadata and parsed configs, and media
+    grouped per level in one response; plus the caller's progress when a
+    token is sent. The anonymous manifest is a cached, versioned blob.
+    """
+    event = get_event_by_token(db, qr_token)
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    if not event.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Event has ended"
+        )
+    
+    # Levels, media and progress live on the event's shard
+    db.info["event_id"] = event.event_id
+    manifest = get_manifest(db, event)
+    
+    if user_id is None:
+        max_age = settings.HTTP_CACHE_EVENT_MAX_AGE
+        if is_not_modified(request, manifest.etag):
+            return not_modified(manifest.etag, max_age)
+        return manifest.public.response(request, headers=cache_headers(manifest.etag, max_age))
+    
+    progress_records = load_progress(db, event.event_id, user_id)
+    progress = summarize_progress(event.event_id, user_id, manifest.levels, progress_records)
+    return Response(
+        content=manifest.with_progress(progress),
+        media_type="application/json",
+        headers={"Cache-Control": "private, no-store", "X-Manifest-Version": manifest.version}
+    )
 
 
 @router.get("/{event_id}", response_model=EventDetailResponse)
 def get_event(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get event details by ID (admin)."""
-    event = db.query(Event).filter(Event.event_id == event_id).first()
+    event = db.query(Event).filter(Event.event_id == event_id, Event.deleted_at.is_(None)).first()
     
     if not event:
         raise HTTPException(
@@ -107,19 +199,50 @@ def get_event(
             detail="Event not found"
         )
     
-    # Add stats (you can implement this later)
+    # Counters maintained by the progress endpoints: one primary-key lookup
     event_dict = {
-        **event.__dict__,
-        "stats": {
-            "total_participants": 0,
-            "completed_all_levels": 0,
-            "correct_name_guesses": 0
-        }
+        **row_fields(event, EventDetailResponse.model_fields),
+        "stats": get_event_stats(db, event_id)
     }
     
     return event_dict
 
 
+@router.get("/{event_id}/export")
+def export_event_results(
+    event_id: int,
+    format: Literal["csv", "ndjson"] = "csv",
+    fields: Optional[str] = None,  # comma-separated result_data keys, e.g. "guess,is_correct"
+    db: Session = Depends(get_event_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Every guest's results for the event, one row per attempt, streamed in
+    batches so memory use doesn't grow with the event.
+    """
+    if not get_event_snapshot(db, event_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    try:
+        result_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        stream_export(sessions_like(db), event_id, format, result_fields),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="event-{event_id}-results.{format}"',
+            "Cache-Control": "private, no-store",
+        }
+    )
+
+
 @router.put("/{event_id}", response_model=EventResponse)
 def update_event(
     event_id: int,
@@ -128,7 +251,7 @@ def update_event(
     current_user: User = Depends(get_current_user)
 ):
     """Update event (admin)."""
-    event = db.query(Event).filter(Event.event_id == event_id).first()
+    event = db.query(Event).filter(Event.event_id == event_id, Event.deleted_at.is_(None)).first()
     
     if not event:
         raise HTTPException(
@@ -139,10 +262,15 @@ def update_event(
     # Update fields
     update_data = event_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
+        if field in ("event_start_time", "event_end_time"):
+            value = as_utc(value)
         setattr(event, field, value)
     
     db.commit()
     db.refresh(event)
+    invalidate_event(event_id, event.qr_code_token)
+    # A new end time changes the final standings
+    invalidate_leaderboard(event_id, final=True)
     
     return event
 
@@ -153,8 +281,12 @@ def delete_event(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete event (admin)."""
-    event = db.query(Event).filter(Event.event_id == event_id).first()
+    """
+    Delete event (admin).
+    The event disappears immediately; its rows are purged in the background
+    in small chunks (progress: GET /events/{event_id}/deletion).
+    """
+    event = db.query(Event).filter(Event.event_id == event_id, Event.deleted_at.is_(None)).first()
     
     if not event:
         raise HTTPException(
@@ -162,12 +294,46 @@ def delete_event(
             detail="Event not found"
         )
     
-    db.delete(event)
+    event.deleted_at = datetime.utcnow()
+    event.is_active = False
     db.commit()
+    invalidate_event(event_id, event.qr_code_token)
+    invalidate_manifest(event_id)
+    invalidate_leaderboard(event_id, final=True)
+    drop_funnel(event_id)
+    schedule_purge(db, event_id, event.deleted_at)
     
     return None
 
 
+@router.get("/{event_id}/deletion")
+def get_deletion_status(
+    event_id: int,
+    db: Session = Depends(get_event_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Progress of a deleted event's background purge (admin)."""
+    purge = purge_status(event_id)
+    if purge is not None:
+        return purge.as_dict()
+    
+    # Deleted, but queued by another worker (or before a restart)
+    deleted_at = db.query(Event.deleted_at).filter(
+        Event.event_id == event_id, Event.deleted_at.isnot(None)
+    ).scalar()
+    if deleted_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No deletion in progress for this event"
+        )
+    return {
+        "event_id": event_id,
+        "state": "pending",
+        "deleted_at": deleted_at,
+        "rows_remaining": remaining_rows(db, event_id),
+    }
+
+
 @router.patch("/{event_id}/activate", response_model=EventResponse)
 def toggle_event_status(
     event_id: int,
@@ -176,7 +342,7 @@ def toggle_event_status(
     current_user: User = Depends(get_current_user)
 ):
     """Activate or deactivate event (admin)."""
-    event = db.query(Event).filter(Event.event_id == event_id).first()
+    event = db.query(Event).filter(Event.event_id == event_id, Event.deleted_at.is_(None)).first()
     
     if not event:
         raise HTTPException(
@@ -187,5 +353,6 @@ def toggle_event_status(
     event.is_active = is_active
     db.commit()
     db.refresh(event)
+    invalidate_event(event_id, event.qr_code_token)
     
     return event
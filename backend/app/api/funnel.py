@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+from app.database import get_event_read_db
+from app.models.user import User
+from app.services.event_service import get_event
+from app.services.funnel_service import get_funnel
+from app.utils.dependencies import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/events/{event_id}/funnel")
+def get_event_funnel(
+    event_id: int,
+    db: Session = Depends(get_event_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Per-level funnel for the organizer dashboard: attempts started, in progress,
+    completed and failed, retries before passing, median / p90 completion time.
+    Served from this worker's live aggregate; live updates on /ws/events/{event_id}/funnel.
+    """
+    if not get_event(db, event_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    return Response(
+        content=get_funnel(db, event_id).body(),
+        media_type="application/json",
+        headers={"Cache-Control": "private, no-store"}
+    )
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
+from app.core.config import settings
+from app.core.http_cache import cached_json
+from app.services.game_service import get_catalog, load_catalog
 from app.schemas.game import GameCreate, GameUpdate, GameResponse
 from app.models.game import Game
 from app.utils.dependencies import get_current_user
@@ -30,29 +33,26 @@ def create_game(
     db.add(db_game)
     db.commit()
     db.refresh(db_game)
+    load_catalog(db)
     
     return db_game
 
 
 @router.get("", response_model=List[GameResponse])
 def list_games(
+    request: Request,
     include_inactive: bool = False,
     db: Session = Depends(get_db)
 ):
-    """List all available game types."""
-    query = db.query(Game)
-    
-    if not include_inactive:
-        query = query.filter(Game.is_active == True)
-    
-    games = query.all()
-    return games
+    """List all available game types (served from the in-memory catalog)."""
+    body, etag = get_catalog(db).list_body(include_inactive)
+    return cached_json(request, body, settings.HTTP_CACHE_CATALOG_MAX_AGE, etag=etag)
 
 
 @router.get("/{game_id}", response_model=GameResponse)
-def get_game(game_id: int, db: Session = Depends(get_db)):
-    """Get specific game details."""
-    game = db.query(Game).filter(Game.game_id == game_id).first()
+def get_game(game_id: int, request: Request, db: Session = Depends(get_db)):
+    """Get specific game details (served from the in-memory catalog)."""
+    game = get_catalog(db).get(game_id)
     
     if not game:
         raise HTTPException(
@@ -60,7 +60,10 @@ def get_game(game_id: int, db: Session = Depends(get_db)):
             detail="Game not found"
         )
     
-    return game
+    return cached_json(
+        request, game.body, settings.HTTP_CACHE_CATALOG_MAX_AGE,
+        last_modified=game.last_modified, etag=game.etag
+    )
 
 
 @router.put("/{game_id}", response_model=GameResponse)
@@ -85,6 +88,7 @@ def update_game(
     
     db.commit()
     db.refresh(game)
+    load_catalog(db)
     
     return game
 
@@ -106,5 +110,6 @@ def delete_game(
     
     db.delete(game)
     db.commit()
+    load_catalog(db)
     
     return None
@@ -1,149 +1,214 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from typing import Optional
-from app.database import get_db
-from app.schemas.leaderboard import LeaderboardResponse, LeaderboardEntry
+from app.database import get_event_read_db
+from app.schemas.leaderboard import LeaderboardResponse
+from app.core.cache import CachedBody, TTLCache
+from app.core.config import settings
+from app.core.responses import ORJSONResponse, dump_json
 from app.models.progress import UserLevelProgress
 from app.models.user import User
-from app.models.event import Event
 from app.models.level import EventLevel  # ← Added this import
-from app.utils.dependencies import get_current_user
-import json
+from app.services.event_service import as_utc, get_event
+from app.services.stats_service import is_correct_guess
+from app.utils.dependencies import get_current_user, require_event
 
 router = APIRouter()
 
+BADGES = {1: "🥇", 2: "🥈", 3: "🥉"}
 
-@router.get("/events/{event_id}/leaderboard", response_model=LeaderboardResponse)
-def get_leaderboard(
-    event_id: int,
-    filter: str = "all",  # all, completed, correct_guess
-    limit: int = 50,
-    offset: int = 0,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+
+class LeaderboardPage:
     """
-    Get event leaderboard.
-    Simple API that can be polled every 10-15 seconds by frontend.
+    One computed leaderboard page, shared by every viewer for
+    LEADERBOARD_CACHE_SECONDS. Only `current_user_rank` differs between
+    viewers, so a rendered (and compressed) body is kept per rank; everyone
+    outside the page shares the `None` body. A `final` page (the event has
+    ended) never changes and is kept for LEADERBOARD_FINAL_SECONDS.
     """
-    
+
+    __slots__ = ("event_id", "total_participants", "entries", "final", "ranks", "_bodies")
+
+    def __init__(self, event_id: int, total_participants: int, entries: list, final: bool = False):
+        self.event_id = event_id
+        self.total_participants = total_participants
+        self.entries = entries
+        self.final = final
+        self.ranks = {entry["user_id"]: entry["rank"] for entry in entries}
+        self._bodies = {}
+
+    def body_for(self, user_id: int) -> CachedBody:
+        rank = self.ranks.get(user_id)
+        body = self._bodies.get(rank)
+        if body is None:
+            body = self._bodies.setdefault(rank, CachedBody(dump_json({
+                "event_id": self.event_id,
+                "total_participants": self.total_participants,
+                "leaderboard": self.entries,
+                "current_user_rank": rank,
+            })))
+        return body
+
+
+leaderboard_cache = TTLCache(settings.LEADERBOARD_CACHE_SECONDS)
+final_leaderboards = TTLCache(settings.LEADERBOARD_FINAL_SECONDS)
+
+
+def invalidate_leaderboard(event_id: int, final: bool = False) -> None:
+    """
+    Drop this worker's cached pages for an event (after a completion).
+    Final pages are only dropped with `final` (the event was edited or deleted).
+    """
+    leaderboard_cache.delete_if(lambda key: key[0] == event_id)
+    if final:
+        final_leaderboards.delete_if(lambda key: key[0] == event_id)
+
+
+def _build_page(db: Session, event_id: int, filter: str, limit: int, offset: int) -> LeaderboardPage:
     # Verify event exists
-    event = db.query(Event).filter(Event.event_id == event_id).first()
+    event = get_event(db, event_id)
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
         )
     
+    # Once the event has ended, only results up to its end time count
+    final = event.has_ended()
+    ended_at = as_utc(event.event_end_time) if final else None
+    
     # Get all users who participated
-    participants = db.query(
+    participants_query = db.query(
         UserLevelProgress.user_id
     ).filter(
         UserLevelProgress.event_id == event_id
-    ).distinct().count()
+    )
+    if final:
+        participants_query = participants_query.filter(UserLevelProgress.start_time <= ended_at)
+    participants = participants_query.distinct().count()
     
     # Build leaderboard query
     # Get users with their completion stats
-    subquery = db.query(
+    levels_completed_col = func.count(UserLevelProgress.progress_id)
+    leaderboard_query = db.query(
         UserLevelProgress.user_id,
-        func.count(UserLevelProgress.progress_id).label('levels_completed'),
+        levels_completed_col.label('levels_completed'),
         func.sum(UserLevelProgress.time_taken_seconds).label('total_time'),
         func.max(UserLevelProgress.completion_time).label('last_completed')
     ).filter(
         UserLevelProgress.event_id == event_id,
-        UserLevelProgress.status == "completed"
-    ).group_by(UserLevelProgress.user_id).subquery()
-    
-    # Join with User table
-    leaderboard_query = db.query(
-        User.user_id,
-        User.name,
-        subquery.c.levels_completed,
-        subquery.c.total_time,
-        subquery.c.last_completed
-    ).join(
-        subquery, User.user_id == subquery.c.user_id
+        UserLevelProgress.status == "completed",
+        *([UserLevelProgress.completion_time <= ended_at] if final else [])
+    ).group_by(
+        UserLevelProgress.user_id
     ).order_by(
-        subquery.c.levels_completed.desc(),
-        subquery.c.total_time.asc()
+        levels_completed_col.desc(),
+        func.sum(UserLevelProgress.time_taken_seconds).asc()
     )
     
     # Apply filters
     if filter == "completed":
-        leaderboard_query = leaderboard_query.filter(
-            subquery.c.levels_completed == event.total_levels
+        leaderboard_query = leaderboard_query.having(
+            levels_completed_col == event.total_levels
         )
     
     # Get results
     results = leaderboard_query.offset(offset).limit(limit).all()
     
-    # Build leaderboard entries
-    leaderboard = []
-    for rank, (user_id, name, levels_completed, total_time, last_completed) in enumerate(results, start=offset + 1):
-        # Check if name guess was correct (for final level)
-        final_progress = db.query(UserLevelProgress).join(
-            EventLevel
+    # Look up names separately: users live on the central DB, progress may be on a shard
+    user_ids = [row.user_id for row in results]
+    names = dict(
+        db.query(User.user_id, User.name).filter(User.user_id.in_(user_ids)).all()
+    ) if user_ids else {}
+    
+    # Final-level results (name guesses) for the whole page in one query
+    final_results = {}
+    if user_ids:
+        final_rows = db.query(
+            UserLevelProgress.user_id,
+            UserLevelProgress.result_data
+        ).join(
+            EventLevel, EventLevel.level_id == UserLevelProgress.level_id
         ).filter(
-            UserLevelProgress.user_id == user_id,
             UserLevelProgress.event_id == event_id,
+            UserLevelProgress.user_id.in_(user_ids),
+            UserLevelProgress.status == "completed",
             EventLevel.is_final_level == True,
-            UserLevelProgress.status == "completed"
-        ).first()
-        
-        correct_guess = None
-        if final_progress and final_progress.result_data:
-            try:
-                result = json.loads(final_progress.result_data)
-                correct_guess = result.get("is_correct", False)
-            except:
-                pass
-        
-        # Assign badges
-        badge = None
-        if rank == 1:
-            badge = "🥇"
-        elif rank == 2:
-            badge = "🥈"
-        elif rank == 3:
-            badge = "🥉"
-        
-        entry = LeaderboardEntry(
-            rank=rank,
-            user_id=user_id,
-            name=name,
-            levels_completed=levels_completed,
-            total_time_seconds=total_time or 0,
-            all_levels_completed=levels_completed == event.total_levels,
-            correct_name_guess=correct_guess,
-            completed_at=last_completed,
-            badge=badge
-        )
-        
-        leaderboard.append(entry)
+            *([UserLevelProgress.completion_time <= ended_at] if final else [])
+        ).all()
+        for user_id, result_data in final_rows:
+            final_results.setdefault(user_id, result_data)
     
-    # Find current user's rank
-    current_user_rank = None
-    for entry in leaderboard:
-        if entry.user_id == current_user.user_id:
-            current_user_rank = entry.rank
-            break
+    # Build entries as plain dicts: the page is serialized once, straight to bytes,
+    # instead of being validated as LeaderboardEntry and again via response_model
+    leaderboard = []
+    for rank, (user_id, levels_completed, total_time, last_completed) in enumerate(results, start=offset + 1):
+        # Check if name guess was correct (for final level)
+        correct_guess = is_correct_guess(final_results.get(user_id))
+        
+        leaderboard.append({
+            "rank": rank,
+            "user_id": user_id,
+            "name": names.get(user_id, "Guest"),
+            "levels_completed": levels_completed,
+            "total_time_seconds": total_time or 0,
+            "all_levels_completed": levels_completed == event.total_levels,
+            "correct_name_guess": correct_guess,
+            "completed_at": last_completed,
+            "badge": BADGES.get(rank),
+        })
     
-    return LeaderboardResponse(
-        event_id=event_id,
-        total_participants=participants,
-        leaderboard=leaderboard,
-        current_user_rank=current_user_rank
-    )
+    return LeaderboardPage(event_id, participants, leaderboard, final)
+
+
+def get_page(db: Session, event_id: int, filter: str = "all", limit: int = 50, offset: int = 0) -> LeaderboardPage:
+    """Cached page: final pages of ended events first, then the short-lived live ones."""
+    key = (event_id, filter, limit, offset)
+    page = final_leaderboards.get(key) or leaderboard_cache.get(key)
+    if page is None:
+        page = _build_page(db, event_id, filter, limit, offset)
+        (final_leaderboards if page.final else leaderboard_cache).set(key, page)
+    return page
+
+
+def freeze_leaderboard(db: Session, event_id: int) -> None:
+    """Build the default final pages of an ended event (db routed to its shard)."""
+    invalidate_leaderboard(event_id, final=True)
+    for filter in ("all", "completed"):
+        get_page(db, event_id, filter)
+
+
+@router.get("/events/{event_id}/leaderboard", response_model=LeaderboardResponse)
+def get_leaderboard(
+    event_id: int,
+    request: Request,
+    filter: str = "all",  # all, completed, correct_guess
+    limit: int = 50,
+    offset: int = 0,
+    db: Session = Depends(get_event_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get event leaderboard.
+    Simple API that can be polled every 10-15 seconds by frontend.
+    Pages are cached briefly (an ended event's final standings for longer)
+    and served precompressed.
+    """
+    # Final pages outlive the event cache; a deleted event must not be served from them
+    require_event(db, event_id)
+    page = get_page(db, event_id, filter, limit, offset)
+    return page.body_for(current_user.user_id).response(request)
 
 
 @router.get("/events/{event_id}/leaderboard/me")
 def get_my_rank(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's rank in leaderboard."""
+    require_event(db, event_id)
     
     # Get all completed users ordered by completion
     all_users = db.query(
@@ -163,19 +228,19 @@ def get_my_rank(
     # Find current user's rank
     for rank, (user_id, levels, time) in enumerate(all_users, start=1):
         if user_id == current_user.user_id:
-            return {
+            return ORJSONResponse({
                 "user_id": current_user.user_id,
                 "rank": rank,
                 "levels_completed": levels,
                 "total_time_seconds": time or 0,
                 "total_participants": len(all_users)
-            }
+            })
     
     # User hasn't completed any levels
-    return {
+    return ORJSONResponse({
         "user_id": current_user.user_id,
         "rank": None,
         "levels_completed": 0,
         "total_time_seconds": 0,
         "total_participants": len(all_users)
-    }
+    })
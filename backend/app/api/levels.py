@@ -1,28 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_event_db, get_event_read_db
 from app.schemas.level import LevelCreate, LevelUpdate, LevelResponse, LevelDetailResponse
 from app.models.level import EventLevel
-from app.models.game import Game
 from app.models.event import Event
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, require_event
+from app.core.config import settings
+from app.core.http_cache import cached_json
+from app.core.responses import dump_validated, row_fields
+from app.services.game_service import get_catalog
+from app.services.manifest_service import invalidate_manifest
 from app.models.user import User
 
 router = APIRouter()
 
+_level_list = TypeAdapter(List[LevelDetailResponse])
+
 
 @router.post("/events/{event_id}/levels", response_model=LevelResponse, status_code=status.HTTP_201_CREATED)
 def add_level_to_event(
     event_id: int,
     level: LevelCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a game level to an event (admin)."""
     
     # Verify event exists
-    event = db.query(Event).filter(Event.event_id == event_id).first()
+    event = db.query(Event).filter(Event.event_id == event_id, Event.deleted_at.is_(None)).first()
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -30,7 +37,7 @@ def add_level_to_event(
         )
     
     # Verify game exists
-    game = db.query(Game).filter(Game.game_id == level.game_id).first()
+    game = get_catalog(db).get(level.game_id)
     if not game:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -58,6 +65,7 @@ def add_level_to_event(
     db.add(db_level)
     db.commit()
     db.refresh(db_level)
+    invalidate_manifest(event_id)
     
     return db_level
 
@@ -65,30 +73,26 @@ def add_level_to_event(
 @router.get("/events/{event_id}/levels", response_model=List[LevelDetailResponse])
 def get_event_levels(
     event_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_event_read_db)
 ):
-    """Get all levels for an event."""
-    
-    # Verify event exists
-    event = db.query(Event).filter(Event.event_id == event_id).first()
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found"
-        )
+    """Get all levels for an event (public, cacheable; ETag is a hash of the body)."""
+    require_event(db, event_id)
     
-    # Get levels with game info
-    levels = db.query(EventLevel, Game).join(
-        Game, EventLevel.game_id == Game.game_id
-    ).filter(
+    # Get levels; game metadata comes from the in-memory catalog, not a join
+    levels = db.query(EventLevel).filter(
         EventLevel.event_id == event_id,
         EventLevel.is_enabled == True
     ).order_by(EventLevel.level_number).all()
     
+    catalog = get_catalog(db)
     result = []
-    for level, game in levels:
+    for level in levels:
+        game = catalog.get(level.game_id)
+        if not game:
+            continue
         level_dict = {
-            **level.__dict__,
+            **row_fields(level, LevelResponse.model_fields),
             "game_name": game.game_name,
             "game_type": game.game_type,
             "component_name": game.component_name,
@@ -97,34 +101,33 @@ def get_event_levels(
         }
         result.append(level_dict)
     
-    return result
+    return cached_json(request, dump_validated(_level_list, result), settings.HTTP_CACHE_EVENT_MAX_AGE)
 
 
 @router.get("/events/{event_id}/levels/{level_id}", response_model=LevelDetailResponse)
 def get_level(
     event_id: int,
     level_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_event_read_db)
 ):
     """Get specific level details."""
+    require_event(db, event_id)
     
-    level = db.query(EventLevel, Game).join(
-        Game, EventLevel.game_id == Game.game_id
-    ).filter(
+    event_level = db.query(EventLevel).filter(
         EventLevel.level_id == level_id,
         EventLevel.event_id == event_id
     ).first()
     
-    if not level:
+    game = get_catalog(db).get(event_level.game_id) if event_level else None
+    
+    if not game:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Level not found"
         )
     
-    event_level, game = level
-    
     level_dict = {
-        **event_level.__dict__,
+        **row_fields(event_level, LevelResponse.model_fields),
         "game_name": game.game_name,
         "game_type": game.game_type,
         "component_name": game.component_name,
@@ -140,10 +143,11 @@ def update_level(
     event_id: int,
     level_id: int,
     level_update: LevelUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update level configuration (admin)."""
+    require_event(db, event_id)
     
     level = db.query(EventLevel).filter(
         EventLevel.level_id == level_id,
@@ -162,6 +166,7 @@ def update_level(
     
     db.commit()
     db.refresh(level)
+    invalidate_manifest(event_id)
     
     return level
 
@@ -170,10 +175,11 @@ def update_level(
 def delete_level(
     event_id: int,
     level_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """Remove level from event (admin)."""
+    require_event(db, event_id)
     
     level = db.query(EventLevel).filter(
         EventLevel.level_id == level_id,
@@ -188,5 +194,6 @@ def delete_level(
     
     db.delete(level)
     db.commit()
+    invalidate_manifest(event_id)
     
     return None
\ No newline at end of file
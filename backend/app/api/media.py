@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_event_db, get_event_read_db, sharding_enabled
 from app.schemas.media import MediaUploadResponse, MediaAssetResponse
 from app.models.media import MediaAsset
 from app.models.event import Event
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, require_event
+from app.core.config import settings
+from app.core.http_cache import cached_json, is_not_modified, make_etag, not_modified
+from app.core.responses import dump_validated
+from app.services.manifest_service import invalidate_manifest
 from app.models.user import User
 
 router = APIRouter()
 
+_media_list = TypeAdapter(List[MediaAssetResponse])
+
 
 @router.post("/events/{event_id}/media", response_model=MediaUploadResponse, status_code=status.HTTP_201_CREATED)
 async def upload_media(
@@ -19,7 +26,7 @@ async def upload_media(
     file_url: str = Form(...),  # For now, accept URL directly (Cloudinary URL)
     thumbnail_url: Optional[str] = Form(None),
     display_order: int = Form(0),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -29,7 +36,7 @@ async def upload_media(
     """
     
     # Verify event exists
-    event = db.query(Event).filter(Event.event_id == event_id).first()
+    event = db.query(Event).filter(Event.event_id == event_id, Event.deleted_at.is_(None)).first()
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,6 +56,7 @@ async def upload_media(
     db.add(media)
     db.commit()
     db.refresh(media)
+    invalidate_manifest(event_id)
     
     return media
 
@@ -56,11 +64,17 @@ async def upload_media(
 @router.get("/events/{event_id}/media", response_model=List[MediaAssetResponse])
 def get_event_media(
     event_id: int,
+    request: Request,
     level_id: Optional[int] = None,
     asset_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_event_read_db)
 ):
-    """Get all media assets for an event."""
+    """
+    Get all media assets for an event (public, cacheable).
+    Assets are never edited in place, so the ETag is derived from the matching
+    asset ids; a revalidation is answered from the index without loading rows.
+    """
+    require_event(db, event_id)
     
     query = db.query(MediaAsset).filter(MediaAsset.event_id == event_id)
     
@@ -70,17 +84,36 @@ def get_event_media(
     if asset_type:
         query = query.filter(MediaAsset.asset_type == asset_type)
     
-    media = query.order_by(MediaAsset.display_order).all()
-    return media
+    query = query.order_by(MediaAsset.display_order, MediaAsset.asset_id)
+    max_age = settings.HTTP_CACHE_EVENT_MAX_AGE
+    
+    if request.headers.get("if-none-match"):
+        asset_ids = [row.asset_id for row in query.with_entities(MediaAsset.asset_id)]
+        etag = make_etag("media", event_id, level_id, asset_type, asset_ids)
+        if is_not_modified(request, etag):
+            return not_modified(etag, max_age)
+    
+    media = query.all()
+    etag = make_etag("media", event_id, level_id, asset_type, [m.asset_id for m in media])
+    return cached_json(request, dump_validated(_media_list, media), max_age, etag=etag)
 
 
 @router.delete("/media/{asset_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_media(
     asset_id: int,
+    event_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete media asset."""
+    """Delete media asset. event_id is required when sharding is enabled."""
+    
+    if sharding_enabled():
+        if event_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="event_id is required to locate media"
+            )
+        db.info["event_id"] = event_id
     
     media = db.query(MediaAsset).filter(MediaAsset.asset_id == asset_id).first()
     
@@ -90,7 +123,9 @@ def delete_media(
             detail="Media not found"
         )
     
+    media_event_id = media.event_id
     db.delete(media)
     db.commit()
+    invalidate_manifest(media_event_id)
     
     return None
@@ -0,0 +1,53 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core import profiler
+
+router = APIRouter()
+
+
+def require_profiler_signature(request: Request) -> None:
+    """Admin gate: the request must carry a valid X-Profile signature for itself."""
+    if not profiler.verify(request.headers.get(profiler.PROFILE_HEADER), request.method, request.url.path):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired profiler signature"
+        )
+
+
+@router.get("/artifacts/{name}", dependencies=[Depends(require_profiler_signature)])
+def get_artifact(name: str):
+    """Download a single-request speedscope profile."""
+    path = os.path.join(settings.PROFILER_OUTPUT_DIR, os.path.basename(name))
+    if not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="application/json", filename=os.path.basename(path))
+
+
+@router.get("/sampler", dependencies=[Depends(require_profiler_signature)])
+def get_sampler_report():
+    """Per-route stacks from the background sampler, as a speedscope file."""
+    sampler = profiler.get_background_sampler()
+    report = sampler.report()
+    report["running"] = sampler.running
+    return report
+
+
+@router.post("/sampler/start", dependencies=[Depends(require_profiler_signature)])
+def start_sampler():
+    """Start the background sampler."""
+    profiler.get_background_sampler().start()
+    return {"running": True}
+
+
+@router.post("/sampler/stop", dependencies=[Depends(require_profiler_signature)])
+def stop_sampler():
+    """Stop the background sampler."""
+    profiler.get_background_sampler().stop()
+    return {"running": False}
@@ -3,35 +3,49 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime
 from typing import List
-from app.database import get_db
+from app.database import get_event_db, get_event_read_db
+from app.core.write_executor import run_write
+from app.core.metrics import LEVEL_COMPLETIONS
+from app.api.leaderboard import invalidate_leaderboard
 from app.schemas.progress import (
     ProgressStart, ProgressUpdate, ProgressComplete,
     ProgressResponse, UserProgressSummary
 )
+from app.models.event import Event
 from app.models.progress import UserLevelProgress
 from app.models.level import EventLevel
-from app.models.event import Event
-from app.utils.dependencies import get_current_user
+from app.services.progress_service import load_progress, summarize_progress
+from app.services.stats_service import count_completion, count_start
+from app.services import funnel_service
+from app.utils.dependencies import get_current_user, require_event
 from app.models.user import User
 
 router = APIRouter()
 
 
+def _reject_deleted_event(session: Session, event_id: int) -> None:
+    """
+    Inside a write unit: refuse to write for an event deleted since the request
+    checked it, so no rows reappear behind the purge.
+    """
+    if session.query(Event.event_id).filter(
+        Event.event_id == event_id, Event.deleted_at.is_(None)
+    ).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+
+
 @router.get("/events/{event_id}/progress", response_model=UserProgressSummary)
 def get_user_progress(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's overall progress in an event."""
     
-    # Verify event exists
-    event = db.query(Event).filter(Event.event_id == event_id).first()
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found"
-        )
+    require_event(db, event_id)
     
     # Get all levels for this event
     levels = db.query(EventLevel).filter(
@@ -40,63 +54,8 @@ def get_user_progress(
     ).order_by(EventLevel.level_number).all()
     
     # Get user's progress for each level
-    progress_records = db.query(UserLevelProgress).filter(
-        UserLevelProgress.event_id == event_id,
-        UserLevelProgress.user_id == current_user.user_id
-    ).all()
-    
-    # Create progress map
-    progress_map = {p.level_id: p for p in progress_records}
-    
-    # Build level progress
-    level_progress = []
-    completed_levels = 0
-    total_time = 0
-    current_level = 1
-    
-    for level in levels:
-        progress = progress_map.get(level.level_id)
-        
-        if progress:
-            level_data = {
-                "level_id": level.level_id,
-                "level_number": level.level_number,
-                "status": progress.status,
-                "attempts_count": progress.attempts_count,
-                "time_taken_seconds": progress.time_taken_seconds,
-                "completed_at": progress.completion_time
-            }
-            
-            if progress.status == "completed":
-                completed_levels += 1
-                if progress.time_taken_seconds:
-                    total_time += progress.time_taken_seconds
-            else:
-                current_level = level.level_number
-        else:
-            level_data = {
-                "level_id": level.level_id,
-                "level_number": level.level_number,
-                "status": "locked" if level.level_number > current_level else "not_started"
-            }
-        
-        level_progress.append(level_data)
-    
-    # Get first and last activity
-    first_progress = min(progress_records, key=lambda x: x.created_at) if progress_records else None
-    last_progress = max(progress_records, key=lambda x: x.updated_at) if progress_records else None
-    
-    return {
-        "event_id": event_id,
-        "user_id": current_user.user_id,
-        "total_levels": len(levels),
-        "completed_levels": completed_levels,
-        "current_level": current_level,
-        "total_time_seconds": total_time,
-        "started_at": first_progress.created_at if first_progress else None,
-        "last_activity": last_progress.updated_at if last_progress else None,
-        "level_progress": level_progress
-    }
+    progress_records = load_progress(db, event_id, current_user.user_id)
+    return summarize_progress(event_id, current_user.user_id, levels, progress_records)
 
 
 @router.post("/events/{event_id}/levels/{level_id}/start", response_model=ProgressResponse, status_code=status.HTTP_201_CREATED)
@@ -104,10 +63,11 @@ def start_level(
     event_id: int,
     level_id: int,
     request: ProgressStart,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """Start playing a level."""
+    require_event(db, event_id)
     
     # Verify level exists
     level = db.query(EventLevel).filter(
@@ -141,30 +101,39 @@ def start_level(
                     detail="Previous level not completed"
                 )
     
-    # Create or update progress record
-    existing_progress = db.query(UserLevelProgress).filter(
-        UserLevelProgress.user_id == current_user.user_id,
-        UserLevelProgress.level_id == level_id,
-        UserLevelProgress.status == "in_progress"
-    ).first()
-    
-    if existing_progress:
-        return existing_progress
-    
-    # Create new progress record
-    progress = UserLevelProgress(
-        user_id=current_user.user_id,
-        event_id=event_id,
-        level_id=level_id,
-        status="in_progress",
-        attempts_count=1,
-        start_time=datetime.utcnow()
-    )
-    
-    db.add(progress)
-    db.commit()
-    db.refresh(progress)
-    
+    # Create progress record, or return the attempt already in progress.
+    # The check runs inside the unit of work so concurrent starts can't both insert.
+    user_id = current_user.user_id
+    level_number = level.level_number
+
+    def create_progress(session: Session):
+        _reject_deleted_event(session, event_id)
+        existing_progress = session.query(UserLevelProgress).filter(
+            UserLevelProgress.user_id == user_id,
+            UserLevelProgress.level_id == level_id,
+            UserLevelProgress.status == "in_progress"
+        ).first()
+
+        if existing_progress:
+            return existing_progress, False
+
+        progress = UserLevelProgress(
+            user_id=user_id,
+            event_id=event_id,
+            level_id=level_id,
+            status="in_progress",
+            attempts_count=1,
+            start_time=datetime.utcnow()
+        )
+        session.add(progress)
+        session.flush()
+        count_start(session, progress)
+        session.refresh(progress)
+        return progress, True
+
+    progress, created = run_write(db, create_progress)
+    if created:
+        funnel_service.record_start(event_id, level_id, level_number)
     return progress
 
 
@@ -173,27 +142,34 @@ def update_progress(
     event_id: int,
     level_id: int,
     update: ProgressUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update game state during gameplay (for resume)."""
+    require_event(db, event_id)
     
-    progress = db.query(UserLevelProgress).filter(
-        UserLevelProgress.progress_id == update.progress_id,
-        UserLevelProgress.user_id == current_user.user_id,
-        UserLevelProgress.level_id == level_id
-    ).first()
-    
-    if not progress:
+    user_id = current_user.user_id
+
+    def save_game_state(session: Session) -> bool:
+        progress = session.query(UserLevelProgress).filter(
+            UserLevelProgress.progress_id == update.progress_id,
+            UserLevelProgress.user_id == user_id,
+            UserLevelProgress.level_id == level_id
+        ).first()
+
+        if not progress:
+            return False
+
+        progress.game_state = update.game_state
+        return True
+
+    if not run_write(db, save_game_state):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Progress not found"
         )
     
-    progress.game_state = update.game_state
-    db.commit()
-    
-    return {"message": "Progress saved", "progress_id": progress.progress_id}
+    return {"message": "Progress saved", "progress_id": update.progress_id}
 
 
 @router.post("/events/{event_id}/levels/{level_id}/complete", response_model=dict)
@@ -201,38 +177,71 @@ def complete_level(
     event_id: int,
     level_id: int,
     completion: ProgressComplete,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_db),
     current_user: User = Depends(get_current_user)
 ):
     """Submit level completion."""
+    require_event(db, event_id)
     
-    progress = db.query(UserLevelProgress).filter(
-        UserLevelProgress.progress_id == completion.progress_id,
-        UserLevelProgress.user_id == current_user.user_id,
-        UserLevelProgress.level_id == level_id
-    ).first()
+    user_id = current_user.user_id
+
+    def record_completion(session: Session):
+        _reject_deleted_event(session, event_id)
+        progress = session.query(UserLevelProgress).filter(
+            UserLevelProgress.progress_id == completion.progress_id,
+            UserLevelProgress.user_id == user_id,
+            UserLevelProgress.level_id == level_id
+        ).first()
+
+        if not progress:
+            return None
+
+        # Calculate time taken
+        completed_at = datetime.utcnow()
+        if progress.start_time:
+            time_taken = int((completed_at - progress.start_time).total_seconds())
+        else:
+            time_taken = 0
+
+        # Update progress
+        previous_status = progress.status
+        progress.status = "completed" if completion.is_passed else "failed"
+        progress.completion_time = completed_at
+        progress.time_taken_seconds = time_taken
+        progress.result_data = completion.result_data
+        progress.is_passed = completion.is_passed
+        count_completion(session, progress, previous_status)
+
+        # Earlier attempts at this level, for the live funnel's retry distribution
+        retries = None
+        if previous_status not in ("completed", "failed") and funnel_service.tracked_funnel(event_id):
+            retries = session.query(func.count(UserLevelProgress.progress_id)).filter(
+                UserLevelProgress.user_id == user_id,
+                UserLevelProgress.level_id == level_id,
+                UserLevelProgress.progress_id < progress.progress_id
+            ).scalar()
+
+        return {
+            "progress_id": progress.progress_id,
+            "status": progress.status,
+            "time_taken_seconds": time_taken,
+            "completed_at": completed_at,
+            "retries": retries
+        }
+
+    completed = run_write(db, record_completion)
     
-    if not progress:
+    if not completed:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Progress not found"
         )
-    
-    # Calculate time taken
-    if progress.start_time:
-        time_taken = int((datetime.utcnow() - progress.start_time).total_seconds())
-    else:
-        time_taken = 0
-    
-    # Update progress
-    progress.status = "completed" if completion.is_passed else "failed"
-    progress.completion_time = datetime.utcnow()
-    progress.time_taken_seconds = time_taken
-    progress.result_data = completion.result_data
-    progress.is_passed = completion.is_passed
-    
-    db.commit()
-    db.refresh(progress)
+    LEVEL_COMPLETIONS.inc(result="passed" if completion.is_passed else "failed")
+    invalidate_leaderboard(event_id)
+    if completed["retries"] is not None:
+        funnel_service.record_finish(
+            event_id, level_id, completion.is_passed, completed["time_taken_seconds"], completed["retries"]
+        )
     
     # Get next level info
     level = db.query(EventLevel).filter(EventLevel.level_id == level_id).first()
@@ -248,12 +257,12 @@ def complete_level(
     ).scalar()
     
     response = {
-        "progress_id": progress.progress_id,
+        "progress_id": completed["progress_id"],
         "level_id": level_id,
-        "status": progress.status,
-        "time_taken_seconds": time_taken,
+        "status": completed["status"],
+        "time_taken_seconds": completed["time_taken_seconds"],
         "is_passed": completion.is_passed,
-        "completed_at": progress.completion_time,
+        "completed_at": completed["completed_at"],
         "leaderboard_rank": rank or 1,
         "celebration": {
             "message": "🎉 Great job! Level completed!" if completion.is_passed else "Try again!",
@@ -276,10 +285,11 @@ def complete_level(
 def get_attempt_history(
     event_id: int,
     level_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_event_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get attempt history for a level."""
+    require_event(db, event_id)
     
     attempts = db.query(UserLevelProgress).filter(
         UserLevelProgress.user_id == current_user.user_id,
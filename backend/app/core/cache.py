@@ -0,0 +1,118 @@
+"""
+In-process caches for hot read endpoints.
+
+`TTLCache` holds values for a fixed number of seconds (0 disables it).
+`CachedBody` is a rendered response body that keeps its compressed variants
+next to it: each encoding is produced on first use and reused by every
+later request for the same payload, so the compression middleware never
+sees these responses.
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core import compression
+from app.core.config import settings
+
+_caches: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+
+class TTLCache:
+    """Thread-safe key/value cache with a fixed time to live, bounded FIFO."""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if self.ttl <= 0:
+            return default
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            # O(1) eviction of the oldest entry, so a flood of new keys stays cheap
+            while len(self._data) >= self.maxsize:
+                self._data.popitem(last=False)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_if(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def clear_caches() -> None:
+    """Empty every TTLCache (tests, admin tooling)."""
+    for cache in list(_caches):
+        cache.clear()
+
+
+class CachedBody:
+    """A response body plus its lazily built compressed variants."""
+
+    __slots__ = ("body", "media_type", "_encoded", "_lock")
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body = body
+        self.media_type = media_type
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        """The body in `encoding` (None = identity), compressed at most once."""
+        if encoding is None:
+            return self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._encoded.get(encoding)
+                if data is None:
+                    data = compression.compress(self.body, encoding)
+                    self._encoded[encoding] = data
+        return data
+
+    def response(self, request: Request, status_code: int = 200,
+                 headers: Optional[Dict[str, str]] = None) -> Response:
+        """Response for `request`, precompressed when the client accepts it."""
+        encoding = None
+        if settings.COMPRESSION_ENABLED and len(self.body) >= settings.COMPRESSION_MIN_SIZE:
+            encoding = compression.negotiate(request.headers.get("accept-encoding"))
+        response = Response(
+            content=self.encoded(encoding), status_code=status_code,
+            headers=headers, media_type=self.media_type
+        )
+        response.headers["vary"] = "Accept-Encoding"
+        if encoding is not None:
+            response.headers["content-encoding"] = encoding
+        return response
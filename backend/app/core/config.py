@@ -16,6 +16,113 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./utsav_games.db"
+
+    # Read replica (empty = read-only endpoints use the primary)
+    READ_DATABASE_URL: str = ""
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # clients that just wrote read from primary
+    READ_REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    READ_REPLICA_SYNC_SECONDS: float = 0  # >0: copy a SQLite primary into a SQLite replica
+
+    # Per-event sharding: comma-separated shard URLs (empty = no sharding)
+    SHARD_DATABASE_URLS: str = ""
+
+    # Database tuning - SQLite (applied on every new connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_CACHE_SIZE: int = -65536  # negative = KiB, i.e. 64 MB
+    SQLITE_TEMP_STORE: str = "MEMORY"
+
+    # Database tuning - server databases (PostgreSQL etc.)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+
+    # Single-writer queue with group commit (mainly for SQLite)
+    WRITE_QUEUE_ENABLED: bool = False
+    WRITE_QUEUE_MAX_BATCH: int = 64
+    WRITE_QUEUE_MAX_WAIT_MS: float = 2.0
+    WRITE_QUEUE_TIMEOUT_SECONDS: float = 30.0  # a caller gives up waiting on the writer after this
+
+    # Observability
+    SQL_INSTRUMENTATION_ENABLED: bool = True  # per-request query stats: N+1 warnings, slow-request log
+    SQL_INSTRUMENTATION_HEADERS: bool = False  # also send X-DB-Queries / Server-Timing; keep off in production
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # same statement this many times in one request
+    SLOW_REQUEST_THRESHOLD_MS: float = 500
+    METRICS_ENABLED: bool = False  # Prometheus text format at /metrics
+    METRICS_TOKEN: str = ""  # if set, /metrics requires "Authorization: Bearer <token>"
+
+    # Profiler (disabled unless PROFILER_SECRET is set)
+    PROFILER_SECRET: str = ""  # signs X-Profile headers; only admins should hold it
+    PROFILER_SIGNATURE_MAX_AGE_SECONDS: int = 300
+    PROFILER_REQUEST_INTERVAL_MS: float = 1.0
+    PROFILER_SAMPLER_ENABLED: bool = False  # start the background sampler on startup
+    PROFILER_SAMPLER_INTERVAL_MS: float = 20.0
+    PROFILER_WINDOW_SECONDS: float = 60.0
+    PROFILER_OUTPUT_DIR: str = "./profiles"
+
+    # Tracing
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0  # share of new traces recorded
+    TRACING_EXPORTER: str = "jsonl"  # jsonl | memory | package.module:ExporterClass
+    TRACING_JSONL_PATH: str = "./traces.jsonl"
+
+    # Response compression (gzip, plus brotli when installed) and caching
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    LEADERBOARD_CACHE_SECONDS: float = 5.0  # shared page snapshot; 0 = no cache
+    LEADERBOARD_FINAL_SECONDS: float = 86400  # pages of an ended event (results up to its end)
+
+    # Event lookup cache, by event_id and QR token
+    EVENT_CACHE_SECONDS: float = 30
+    EVENT_NEGATIVE_CACHE_SECONDS: float = 10  # unknown ids / tokens
+    EVENT_CACHE_MAX_ENTRIES: int = 10000
+    MANIFEST_CACHE_SECONDS: float = 300  # also rebuilt when the event or catalog changes
+
+    # Event dashboard counters are maintained on writes; this recounts them from progress rows
+    EVENT_STATS_RECONCILE_SECONDS: float = 3600  # 0 = never
+
+    # Live per-level funnel (organizer dashboard), rebuilt from progress rows this often
+    FUNNEL_REBUILD_SECONDS: float = 600
+    FUNNEL_MAX_EVENTS: int = 1000
+    FUNNEL_SKETCH_ACCURACY: float = 0.01  # relative error of median / p90 times
+    FUNNEL_PUSH_INTERVAL_SECONDS: float = 1.0  # websocket checks for changes this often
+
+    # Results export: rows fetched and written per chunk
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_MAX_RESULT_FIELDS: int = 20
+
+    # Columnar analytics export (python -m app.analytics)
+    ANALYTICS_EXPORT_BATCH_SIZE: int = 50000  # rows per Parquet file and partition
+    ANALYTICS_EXPORT_COMPRESSION: str = "zstd"
+    ANALYTICS_EXPORT_SAFETY_LAG_SECONDS: float = 300  # rows completed more recently wait for the next run
+
+    # Event deletion: soft delete, then rows purged in chunks by a background thread
+    EVENT_PURGE_DELAY_SECONDS: float = 30  # let in-flight requests for the event finish
+    EVENT_PURGE_CHUNK_SIZE: int = 500  # rows per transaction
+    EVENT_PURGE_PAUSE_SECONDS: float = 0.05  # between chunks, so live writes get the lock
+    EVENT_PURGE_STATUS_SECONDS: float = 86400  # finished purges stay visible this long
+
+    # Bulk provisioning (POST /api/events/bulk)
+    EVENT_PROVISION_MAX_ITEMS: int = 500  # events per request
+
+    # Lifecycle scheduler: activates / deactivates events at event_start_time / event_end_time (UTC)
+    EVENT_SCHEDULER_INTERVAL_SECONDS: float = 15  # 0 = off
+    EVENT_SCHEDULER_CATCHUP_SECONDS: float = 3600  # on start, apply transitions this far back
+    EVENT_PREWARM_SECONDS: float = 300  # caches kept warm from this long before the start to as long after
+
+    # In-memory game catalog; re-read after this long so every worker sees admin edits
+    GAME_CATALOG_MAX_AGE_SECONDS: float = 300
+
+    # HTTP caching of public endpoints (Cache-Control max-age, seconds)
+    HTTP_CACHE_CATALOG_MAX_AGE: int = 300  # game catalog
+    HTTP_CACHE_EVENT_MAX_AGE: int = 30  # QR lookup, level and media lists
+    HTTP_CACHE_STALE_WHILE_REVALIDATE: int = 600
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production-min-32-chars"
@@ -30,6 +137,7 @@ class Settings(BaseSettings):
     MSG91_SENDER_ID: str = ""
     MSG91_TEMPLATE_ID: str = ""
     OTP_EXPIRY_MINUTES: int = 5
+    OTP_STUB_CODE: str = ""  # load tests: fixed OTP and no SMS (development/test/loadtest only)
     
     # Google OAuth
     GOOGLE_CLIENT_ID: str = ""
@@ -50,6 +158,11 @@ class Settings(BaseSettings):
             return ["*"]
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
     
+    @property
+    def shard_urls_list(self) -> List[str]:
+        """Convert SHARD_DATABASE_URLS string to list."""
+        return [url.strip() for url in self.SHARD_DATABASE_URLS.split(",") if url.strip()]
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,149 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor hooks record every statement executed while a request is
+being served: the query count, total DB time and statement fingerprints.
+The middleware logs fingerprints repeated SQL_N_PLUS_ONE_THRESHOLD or more
+times as a likely N+1 and requests slower than SLOW_REQUEST_THRESHOLD_MS
+with their full query list. With SQL_INSTRUMENTATION_HEADERS it also reports
+them to the client in `X-DB-Queries` and `Server-Timing` response headers.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+# Keep at most this many statements per request for the slow-request log
+MAX_RECORDED_QUERIES = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN \((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+\b")
+
+_current_stats: ContextVar[Optional["RequestQueryStats"]] = ContextVar("request_query_stats", default=None)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so repeats with different values compare equal."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    return _IN_LIST.sub("IN (?...)", normalized)
+
+
+class RequestQueryStats:
+    """Statements executed while serving one request."""
+
+    __slots__ = ("count", "total_time", "queries", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.queries: List[Tuple[str, float]] = []
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.fingerprints[fingerprint(statement)] += 1
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append((statement, duration))
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Fingerprints executed at least `threshold` times (likely N+1)."""
+        return {fp: n for fp, n in self.fingerprints.items() if n >= threshold}
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats for the request being served, if any."""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+_installed = False
+
+
+def install_sql_instrumentation() -> None:
+    """Register the cursor hooks on every engine (idempotent)."""
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+class SQLInstrumentationMiddleware:
+    """ASGI middleware adding per-request DB stats to logs (and optionally responses)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and settings.SQL_INSTRUMENTATION_HEADERS:
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", str(stats.count))
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} queries"'
+                )
+                repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+                if repeated:
+                    headers.append("X-DB-N-Plus-One", str(max(repeated.values())))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _report(scope, stats: RequestQueryStats, elapsed: float) -> None:
+        route = f"{scope.get('method')} {scope.get('path')}"
+
+        for fp, n in stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD).items():
+            logger.warning("Likely N+1 on %s: %d x %s", route, n, fp)
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            lines = [
+                f"  {duration * 1000:8.2f} ms  {_WHITESPACE.sub(' ', statement)}"
+                for statement, duration in stats.queries
+            ]
+            logger.warning(
+                "Slow request %s: %.1f ms, %d queries, %.1f ms in DB\n%s",
+                route, elapsed_ms, stats.count, stats.total_time * 1000, "\n".join(lines)
+            )
@@ -0,0 +1,87 @@
+"""
+HTTP caching for public, near-static endpoints.
+
+Responses carry a weak ETag (a hash of the body, or of a cheap validator
+when the body isn't built yet), an optional Last-Modified, and
+`Cache-Control: public, max-age=..., stale-while-revalidate=...` so browsers
+and a reverse proxy can reuse them. A matching If-None-Match (or, without
+one, If-Modified-Since) gets a bodyless 304.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over bytes or any repr-able parts (weak: shared by gzip/identity bodies)."""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """True when the client's cached copy is still current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second precision
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(etag: str, max_age: int, last_modified: Optional[datetime] = None) -> dict:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={max_age}, "
+            f"stale-while-revalidate={settings.HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+        ),
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: str, max_age: int, last_modified: Optional[datetime] = None) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, max_age, last_modified))
+
+
+def cached_json(request: Request, body: bytes, max_age: int,
+                last_modified: Optional[datetime] = None, etag: Optional[str] = None) -> Response:
+    """JSON response for `body` with validators, or a 304 if the client has it."""
+    etag = etag or make_etag(body)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, max_age, last_modified)
+    return Response(
+        content=body, media_type="application/json",
+        headers=cache_headers(etag, max_age, last_modified)
+    )
@@ -0,0 +1,321 @@
+"""
+In-process metrics registry served in Prometheus text format at /metrics.
+
+Deliberately small: counters, gauges and histograms with fixed label names,
+each guarded by a plain lock. Gauges that mirror live state (connection
+pools, the threadpool) are read from a callback at scrape time instead of
+being updated on every request.
+"""
+import hmac
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback: Optional[Callable] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        # callback() returns {label_values_tuple: value}
+        self._callback = callback
+        if not self.labelnames and callback is None:
+            self._values[()] = 0.0
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        if self._callback is not None:
+            items = list(self._callback().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (e.g. latencies in seconds)."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += n
+                le = 'le="{}"'.format(_format_value(bound))
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+# HTTP
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status")
+))
+HTTP_REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+))
+
+# Database
+DB_POOL_CHECKOUT_WAIT = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+))
+
+# Domain
+OTP_SENDS = registry.register(Counter(
+    "otp_sends_total", "OTP SMS send attempts", ("result",)
+))
+LEVEL_COMPLETIONS = registry.register(Counter(
+    "level_completions_total", "Level completion submissions", ("result",)
+))
+
+
+def _pool_stats() -> Dict[str, Dict[LabelValues, float]]:
+    from app.database import engine, read_engine, shard_engines
+
+    engines = [("primary", engine)]
+    if read_engine is not engine:
+        engines.append(("replica", read_engine))
+    engines.extend((f"shard{i}", shard) for i, shard in enumerate(shard_engines))
+
+    stats = {"checked_out": {}, "size": {}, "overflow": {}}
+    for name, db_engine in engines:
+        pool = db_engine.pool
+        # Only QueuePool-style pools report these (not SQLite :memory: pools)
+        if hasattr(pool, "checkedout"):
+            stats["checked_out"][(name,)] = pool.checkedout()
+            stats["size"][(name,)] = pool.size()
+            stats["overflow"][(name,)] = max(pool.overflow(), 0)
+    return stats
+
+
+registry.register(Gauge(
+    "db_pool_connections_checked_out", "Pooled DB connections currently in use", ("database",),
+    callback=lambda: _pool_stats()["checked_out"]
+))
+registry.register(Gauge(
+    "db_pool_size", "Configured DB connection pool size", ("database",),
+    callback=lambda: _pool_stats()["size"]
+))
+registry.register(Gauge(
+    "db_pool_overflow", "DB connections open beyond the pool size", ("database",),
+    callback=lambda: _pool_stats()["overflow"]
+))
+
+
+def _threadpool_stats(key: str) -> Dict[LabelValues, float]:
+    """Usage of the threadpool that runs sync endpoints (read from the event loop)."""
+    import anyio.to_thread
+
+    try:
+        statistics = anyio.to_thread.current_default_thread_limiter().statistics()
+    except Exception:
+        # No running event loop
+        return {}
+    return {(): getattr(statistics, key)}
+
+
+registry.register(Gauge(
+    "threadpool_threads_busy", "Threadpool workers running sync endpoints",
+    callback=lambda: _threadpool_stats("borrowed_tokens")
+))
+registry.register(Gauge(
+    "threadpool_threads_limit", "Threadpool worker limit",
+    callback=lambda: _threadpool_stats("total_tokens")
+))
+registry.register(Gauge(
+    "threadpool_tasks_waiting", "Sync endpoint calls queued for a threadpool worker",
+    callback=lambda: _threadpool_stats("tasks_waiting")
+))
+
+
+def scrape_allowed(authorization: Optional[str]) -> bool:
+    """Check the scraper's bearer token against METRICS_TOKEN (open when no token is set)."""
+    if not settings.METRICS_TOKEN:
+        return True
+    scheme, _, token = (authorization or "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+
+
+def route_template(scope) -> str:
+    """The matched route's path template (e.g. /api/events/{event_id}), not the raw path."""
+    # Recent FastAPI resolves included routers lazily and keeps the prefixed path here
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None and getattr(context, "path", None):
+        return context.path
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"], route=route_template(scope), status=str(status_code)
+            )
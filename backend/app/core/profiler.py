@@ -0,0 +1,347 @@
+"""
+On-demand sampling profiler for live requests.
+
+Two modes, both available only when PROFILER_SECRET is set:
+
+* Single request: send `X-Profile: <timestamp>.<signature>` (see `sign`)
+  and the request is sampled every PROFILER_REQUEST_INTERVAL_MS. The stacks
+  are saved as a speedscope JSON file in PROFILER_OUTPUT_DIR and the file
+  name is returned in the `X-Profile-Artifact` response header.
+* Background sampler: a low-rate thread samples every thread and
+  aggregates stacks per route template over PROFILER_WINDOW_SECONDS.
+
+Stacks are attributed to a request by the endpoint and dependency functions
+found on them, so sync endpoints running in the threadpool are covered.
+Concurrent requests to the same endpoint are indistinguishable while
+profiling a single one.
+
+Sign a request from a shell:
+    python -m app.core.profiler sign GET /api/events/1/progress
+"""
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile"
+ARTIFACT_HEADER = "X-Profile-Artifact"
+ADMIN_PREFIX = "/api/admin/profiler"
+
+# (filename, first line, function name) - one speedscope frame
+FrameKey = Tuple[str, int, str]
+Stack = Tuple[FrameKey, ...]
+
+
+def _frame_key(code) -> FrameKey:
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def sign(method: str, path: str, secret: Optional[str] = None, timestamp: Optional[int] = None) -> str:
+    """Build an X-Profile header value for one method + path."""
+    secret = secret or settings.PROFILER_SECRET
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = f"{timestamp}:{method.upper()}:{path}".encode()
+    digest = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"{timestamp}.{digest}"
+
+
+def verify(header: Optional[str], method: str, path: str) -> bool:
+    """Check an X-Profile header: valid signature for this request, not expired."""
+    if not header or not settings.PROFILER_SECRET:
+        return False
+    timestamp, _, _ = header.partition(".")
+    if not timestamp.isdigit():
+        return False
+    if abs(time.time() - int(timestamp)) > settings.PROFILER_SIGNATURE_MAX_AGE_SECONDS:
+        return False
+    return hmac.compare_digest(header, sign(method, path, timestamp=int(timestamp)))
+
+
+def _walk(frame) -> List:
+    """Frames from the outermost call to the innermost."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _stack_from(stack: Stack, keys) -> Optional[Stack]:
+    """Trim a stack to start at the first frame whose key is in `keys`."""
+    for i, key in enumerate(stack):
+        if key in keys:
+            return stack[i:]
+    return None
+
+
+def _dependant_codes(dependant) -> Set:
+    """Code objects of an endpoint and all of its dependencies."""
+    codes = set()
+    pending = [dependant]
+    while pending:
+        current = pending.pop()
+        call = current.call
+        code = getattr(call, "__code__", None) or getattr(getattr(call, "__call__", None), "__code__", None)
+        if code is not None:
+            codes.add(code)
+        pending.extend(current.dependencies)
+    return codes
+
+
+def to_speedscope(profiles: Dict[str, Counter], interval_ms: float, name: str) -> dict:
+    """Render {profile name: Counter(stack -> samples)} as a speedscope file."""
+    frames: List[dict] = []
+    index: Dict[FrameKey, int] = {}
+
+    def frame_index(key: FrameKey) -> int:
+        if key not in index:
+            index[key] = len(frames)
+            frames.append({"name": key[2], "file": key[0], "line": key[1]})
+        return index[key]
+
+    rendered = []
+    for profile_name, stacks in profiles.items():
+        samples, weights = [], []
+        for stack, count in stacks.most_common():
+            samples.append([frame_index(key) for key in stack])
+            weights.append(count * interval_ms)
+        rendered.append({
+            "type": "sampled",
+            "name": profile_name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        })
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": settings.APP_NAME,
+        "shared": {"frames": frames},
+        "profiles": rendered,
+    }
+
+
+class _SamplingThread(threading.Thread):
+    """Calls `on_sample(frames_by_thread)` every `interval` seconds until stopped."""
+
+    def __init__(self, interval: float, on_sample, name: str):
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self.on_sample = on_sample
+        self._stopped = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            frames.pop(own, None)
+            self.on_sample(frames)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class RequestProfile:
+    """Samples every thread while one request runs; filtered to it afterwards."""
+
+    def __init__(self, interval_ms: float):
+        self.interval_ms = interval_ms
+        # Whole stack of every thread -> samples; keyed when taken, so no frame is kept alive
+        self._samples: Counter = Counter()
+        self._thread = _SamplingThread(interval_ms / 1000, self._on_sample, "request-profiler")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._thread.stop()
+
+    def _on_sample(self, frames_by_thread) -> None:
+        for frame in frames_by_thread.values():
+            self._samples[tuple(_frame_key(f.f_code) for f in _walk(frame))] += 1
+
+    def stacks(self, codes) -> Counter:
+        keys = {_frame_key(code) for code in codes}
+        stacks: Counter = Counter()
+        for stack, count in self._samples.items():
+            trimmed = _stack_from(stack, keys)
+            if trimmed is not None:
+                stacks[trimmed] += count
+        return stacks
+
+
+# endpoint code object -> route template, learned from served requests
+_endpoint_routes: Dict[object, str] = {}
+
+
+class BackgroundSampler:
+    """Low-rate sampler aggregating stacks per route over a rolling window."""
+
+    def __init__(self, interval_ms: float, window_seconds: float):
+        self.interval_ms = interval_ms
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._thread: Optional[_SamplingThread] = None
+        self._window_start = time.time()
+        self._current: Dict[str, Counter] = {}
+        self._last: Optional[Tuple[float, Dict[str, Counter]]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._window_start = time.time()
+                self._current = {}
+                self._thread = _SamplingThread(self.interval_ms / 1000, self._on_sample, "background-profiler")
+                self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.stop()
+
+    def _on_sample(self, frames_by_thread) -> None:
+        routes = _endpoint_routes
+        if not routes:
+            return
+        for frame in frames_by_thread.values():
+            frames = _walk(frame)
+            for i, f in enumerate(frames):
+                route = routes.get(f.f_code)
+                if route is not None:
+                    stack = tuple(_frame_key(x.f_code) for x in frames[i:])
+                    with self._lock:
+                        self._current.setdefault(route, Counter())[stack] += 1
+                    break
+
+        now = time.time()
+        if now - self._window_start >= self.window_seconds:
+            with self._lock:
+                self._last = (self._window_start, self._current)
+                self._window_start, self._current = now, {}
+
+    def report(self) -> dict:
+        """Speedscope file for the last complete window (or the current one)."""
+        with self._lock:
+            if self._last is not None:
+                started, profiles = self._last
+            else:
+                started, profiles = self._window_start, self._current
+            profiles = {route: Counter(stacks) for route, stacks in profiles.items()}
+        return to_speedscope(profiles, self.interval_ms, f"routes since {int(started)}")
+
+
+_sampler: Optional[BackgroundSampler] = None
+
+
+def get_background_sampler() -> BackgroundSampler:
+    global _sampler
+    if _sampler is None:
+        _sampler = BackgroundSampler(settings.PROFILER_SAMPLER_INTERVAL_MS, settings.PROFILER_WINDOW_SECONDS)
+    return _sampler
+
+
+def stop_background_sampler() -> None:
+    if _sampler is not None:
+        _sampler.stop()
+
+
+def save_artifact(profile: dict, method: str, path: str) -> str:
+    """Write a speedscope file to PROFILER_OUTPUT_DIR and return its name."""
+    os.makedirs(settings.PROFILER_OUTPUT_DIR, exist_ok=True)
+    slug = path.strip("/").replace("/", "_") or "root"
+    name = f"{int(time.time())}-{method.lower()}-{slug}-{uuid.uuid4().hex[:8]}.speedscope.json"
+    with open(os.path.join(settings.PROFILER_OUTPUT_DIR, name), "w") as f:
+        json.dump(profile, f)
+    return name
+
+
+class ProfilerMiddleware:
+    """Profiles signed requests and teaches the background sampler route templates."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        header = Headers(scope=scope).get(PROFILE_HEADER)
+        if header is None or path.startswith(ADMIN_PREFIX) or not verify(header, method, path):
+            await self.app(scope, receive, send)
+            self._learn_route(scope)
+            return
+
+        artifact = {}
+
+        async def send_with_artifact(message):
+            if message["type"] == "http.response.start":
+                # The body is already computed when headers go out
+                profile.__exit__()
+                artifact["name"] = self._save(scope, profile, method, path)
+                if artifact["name"]:
+                    MutableHeaders(scope=message).append(ARTIFACT_HEADER, artifact["name"])
+            await send(message)
+
+        profile = RequestProfile(settings.PROFILER_REQUEST_INTERVAL_MS)
+        with profile:
+            await self.app(scope, receive, send_with_artifact)
+        self._learn_route(scope)
+
+    @staticmethod
+    def _learn_route(scope) -> None:
+        endpoint = scope.get("endpoint")
+        code = getattr(endpoint, "__code__", None)
+        if code is not None and code not in _endpoint_routes:
+            from app.core.metrics import route_template
+            _endpoint_routes[code] = route_template(scope)
+
+    @staticmethod
+    def _save(scope, profile: RequestProfile, method: str, path: str) -> Optional[str]:
+        route = scope.get("route")
+        dependant = getattr(route, "dependant", None)
+        if dependant is None:
+            return None
+        stacks = profile.stacks(_dependant_codes(dependant))
+        return save_artifact(
+            to_speedscope({f"{method} {path}": stacks}, profile.interval_ms, f"{method} {path}"),
+            method, path
+        )
+
+
+def main(argv: Iterable[str]) -> int:
+    argv = list(argv)
+    if len(argv) != 3 or argv[0] != "sign":
+        print(__doc__)
+        return 1
+    if not settings.PROFILER_SECRET:
+        print("❌ PROFILER_SECRET is not set")
+        return 1
+    print(f"{PROFILE_HEADER}: {sign(argv[1], argv[2])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,47 @@
+"""
+JSON response rendering.
+
+`ORJSONResponse` is the app-wide default response class. Routes with a
+`response_model` are still validated and dumped to bytes by Pydantic in one
+pass; everything else (plain dicts, and hot endpoints that return a response
+directly to skip validation) is encoded by orjson, which handles datetimes,
+UUIDs and dataclasses natively. Falls back to the stdlib encoder when orjson
+isn't installed.
+"""
+import json
+from typing import Any, Iterable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dump_json(content: Any) -> bytes:
+    """Encode `content` to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def row_fields(row: Any, names: Iterable[str]) -> dict:
+    """Plain dict of the named attributes of an ORM row (no SQLAlchemy state)."""
+    return {name: getattr(row, name) for name in names if hasattr(row, name)}
+
+
+def dump_validated(adapter: TypeAdapter, value: Any) -> bytes:
+    """Validate ORM rows or dicts against a response schema once and encode them."""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
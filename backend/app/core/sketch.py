@@ -0,0 +1,64 @@
+"""
+Mergeable quantile sketch (DDSketch).
+
+Values are counted in logarithmic buckets, so any quantile is returned within
+`relative_accuracy` of the true value, an insert is O(1), and memory grows with
+the log of the value range rather than the number of values. Sketches with
+the same accuracy merge by adding bucket counts, which makes them suitable
+for combining per-worker or per-shard aggregates.
+"""
+import math
+from collections import defaultdict
+from typing import Dict, Optional
+
+
+class DDSketch:
+    """Quantiles of non-negative values, each within `relative_accuracy`."""
+
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "bins", "zeros", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = defaultdict(int)
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        if value < 0:
+            raise ValueError("DDSketch only holds non-negative values")
+        if value == 0:
+            self.zeros += 1
+        else:
+            self.bins[math.ceil(math.log(value) / self._log_gamma)] += 1
+        self.count += 1
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add another sketch's values to this one (same accuracy required)."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, n in other.bins.items():
+            self.bins[index] += n
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0..1), or None if the sketch is empty."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i], in relative terms
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
@@ -0,0 +1,392 @@
+"""
+Lightweight request tracing.
+
+Spans follow the OpenTelemetry model (trace id, span id, parent, attributes,
+status) without the SDK dependency. The current span lives in a ContextVar,
+so it follows the request into threadpool endpoints, the write queue and
+anything started with `propagate()` (the event purger queues its work that
+way). Background loops open their own trace per tick with `start_trace()`.
+Incoming W3C `traceparent` headers are continued and every traced response
+carries one back.
+
+Finished spans go to a pluggable exporter chosen by TRACING_EXPORTER:
+"jsonl" (one JSON object per span in TRACING_JSONL_PATH), "memory", or a
+"package.module:ClassName" import path for a custom SpanExporter.
+When TRACING_ENABLED is off, `start_span` and `traced` cost one flag check.
+"""
+import asyncio
+import contextvars
+import functools
+import importlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_time", "_started",
+                 "duration", "attributes", "status", "thread", "local_root")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.thread = threading.current_thread().name
+        self.local_root = False  # outermost span of a request, start_trace() or propagate() call
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    def end(self) -> None:
+        """Finish the span and hand it to the exporter."""
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+            tracer.export(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "status": self.status,
+            "thread": self.thread,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stand-in yielded when tracing is off or the request isn't sampled."""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """Receives every finished span. Subclass and point TRACING_EXPORTER at it."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JSONLinesExporter(SpanExporter):
+    """Appends spans to a local file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            # Flush once per finished unit of work rather than per span. Local
+            # roots may have a parent: a remote caller, or (for propagate()) a
+            # request span that usually ended before them
+            if span.local_root:
+                self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class InMemoryExporter(SpanExporter):
+    """Keeps finished spans in a list (tests, debugging)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+def _exporter_from_settings() -> SpanExporter:
+    name = settings.TRACING_EXPORTER
+    if name == "jsonl":
+        return JSONLinesExporter(settings.TRACING_JSONL_PATH)
+    if name == "memory":
+        return InMemoryExporter()
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class Tracer:
+    """Holds the exporter; spans are created through the module functions."""
+
+    def __init__(self):
+        self.enabled = settings.TRACING_ENABLED
+        self._exporter: Optional[SpanExporter] = None
+        self._lock = threading.Lock()
+
+    @property
+    def exporter(self) -> SpanExporter:
+        if self._exporter is None:
+            with self._lock:
+                if self._exporter is None:
+                    self._exporter = _exporter_from_settings()
+        return self._exporter
+
+    def set_exporter(self, exporter: Optional[SpanExporter]) -> None:
+        """Swap the exporter (None = rebuild from settings on next use)."""
+        with self._lock:
+            old, self._exporter = self._exporter, exporter
+        if old is not None and old is not exporter:
+            old.shutdown()
+
+    def export(self, span: Span) -> None:
+        try:
+            self.exporter.export(span)
+        except Exception:
+            # Tracing must never break a request
+            pass
+
+    def shutdown(self) -> None:
+        self.set_exporter(None)
+
+
+tracer = Tracer()
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def begin_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+    """Start a child of the current span without making it current (caller must end() it)."""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(name, parent.trace_id, parent.span_id, attributes)
+
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Run a block as a child span of the current one (no-op outside a traced request)."""
+    parent = _current_span.get() if tracer.enabled else None
+    if parent is None:
+        yield NOOP_SPAN
+        return
+
+    span = Span(name, parent.trace_id, parent.span_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+@contextmanager
+def start_trace(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Run a block as the root span of a new trace (background loops), sampled like requests."""
+    if not tracer.enabled or random.random() >= settings.TRACING_SAMPLE_RATE:
+        yield NOOP_SPAN
+        return
+
+    span = Span(name, f"{random.getrandbits(128):032x}", attributes=attributes)
+    span.local_root = True
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping each call to a sync or async function in a span."""
+
+    def decorator(fn: Callable):
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await fn(*args, **kwargs)
+                with start_span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with start_span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def propagate(fn: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Bind `fn` to the caller's trace context, for work run on another thread
+    or after the response. Each call becomes a span under the caller's span.
+    """
+    ctx = contextvars.copy_context()
+    span_name = name or f"background.{getattr(fn, '__name__', 'task')}"
+
+    def run_traced(*args, **kwargs):
+        with start_span(span_name) as span:
+            if span is not NOOP_SPAN:
+                span.local_root = True
+            return fn(*args, **kwargs)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # A fresh copy per call, so the wrapper can run concurrently
+        return ctx.copy().run(run_traced, *args, **kwargs)
+
+    return wrapper
+
+
+def traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+
+def parse_traceparent(header: Optional[str]):
+    """Return (trace_id, parent_span_id, sampled) from a W3C traceparent header, or None."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = begin_span("db.query", {
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:1000],
+    })
+    if span is not None and context is not None:
+        context._trace_span = span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+        span.end()
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.end()
+
+
+_db_hooks_installed = False
+
+
+def install_db_tracing() -> None:
+    """Trace every SQL statement as a child of the current span (idempotent)."""
+    global _db_hooks_installed
+    if not _db_hooks_installed:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _db_hooks_installed = True
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span for each request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        incoming = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < settings.TRACING_SAMPLE_RATE
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        span = Span(f"HTTP {scope['method']}", trace_id, parent_id, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        span.local_root = True
+        token = _current_span.set(span)
+
+        async def send_with_traceparent(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = "error"
+                MutableHeaders(scope=message).append("traceparent", traceparent(span))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            from app.core.metrics import route_template
+            route = route_template(scope)
+            span.name = f"{scope['method']} {route}"
+            span.set_attribute("http.route", route)
+            span.end()
@@ -0,0 +1,243 @@
+"""
+Single-writer queue with group commit.
+
+SQLite only allows one writer at a time, so many threadpool workers each
+committing a tiny transaction just queue up on the lock and pay an fsync
+apiece. When WRITE_QUEUE_ENABLED is on, mutating units of work are handed
+to one dedicated writer thread instead. The writer drains whatever is
+queued, runs every unit inside its own SAVEPOINT in a single transaction
+and commits once, then resolves each caller's future with its own result
+or error. On SQLite the batch transaction is opened with an explicit
+BEGIN IMMEDIATE: pysqlite sends no BEGIN before a SAVEPOINT, so the first
+savepoint would start the transaction and its RELEASE would commit that
+unit on its own.
+
+A unit of work is a callable taking a Session. It runs on the writer's
+session, so it must look rows up by id rather than reuse ORM objects
+loaded by the request session. `run_write` rolls the request session back
+before waiting, so a request never holds a pooled connection the writer
+needs; a session with unflushed changes is refused rather than discarded.
+"""
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tracing import start_span, traced
+
+UnitOfWork = Callable[[Session], Any]
+
+_STOP = object()
+
+
+def _begin_batch(session: Session, transaction, connection) -> None:
+    """Open the batch transaction explicitly, so savepoint RELEASEs don't commit."""
+    if transaction.parent is None and connection.dialect.name == "sqlite":
+        # IMMEDIATE also takes the write lock up front (waits on the busy timeout)
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+class WriteExecutor:
+    """Runs units of work on one writer thread, committing them in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch: int = 64,
+        max_wait_ms: float = 2.0,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches_committed = 0
+        self.units_committed = 0
+
+    def start(self):
+        """Start the writer thread (idempotent)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="db-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, unit: UnitOfWork, event_id: Optional[int] = None) -> Future:
+        """
+        Queue a unit of work and return a future for its result.
+        event_id routes event-scoped tables to the right shard when sharding is on.
+        """
+        # Restarts the writer if it died
+        self.start()
+        future: Future = Future()
+        # Carry the caller's context (request tracing, etc.) into the writer
+        self._queue.put((future, unit, contextvars.copy_context(), event_id))
+        return future
+
+    def shutdown(self, wait: bool = True):
+        """Flush pending work and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            if wait:
+                thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            for shard_id, group in self._group_by_shard(batch).items():
+                self._commit_batch(group, shard_id)
+            if stop:
+                return
+
+    @staticmethod
+    def _group_by_shard(batch):
+        """Split a batch so each group commits against a single shard."""
+        from app.database import sharding_enabled, shard_for_event
+
+        if not sharding_enabled():
+            return {None: [item[:3] for item in batch]}
+
+        groups = {}
+        for future, unit, ctx, event_id in batch:
+            try:
+                shard_id = shard_for_event(event_id) if event_id is not None else None
+            except Exception:
+                # Directory lookup failed; the unit will surface its own routing error
+                shard_id = None
+            groups.setdefault(shard_id, []).append((future, unit, ctx))
+        return groups
+
+    def _commit_batch(self, batch, shard_id: Optional[int] = None):
+        outcomes = []
+        session = self.session_factory()
+        event.listen(session, "after_begin", _begin_batch)
+        if shard_id is not None:
+            session.info["shard_id"] = shard_id
+        try:
+            for future, unit, ctx in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                savepoint = session.begin_nested()
+                try:
+                    result = ctx.run(unit, session)
+                    savepoint.commit()
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    savepoint.rollback()
+                    outcomes.append((future, None, e))
+
+            session.commit()
+            self.batches_committed += 1
+            self.units_committed += sum(1 for _, _, error in outcomes if error is None)
+        except Exception as e:
+            # The group commit itself failed: nothing in this batch was saved
+            session.rollback()
+            unit_errors = {id(future): error for future, _, error in outcomes}
+            outcomes = [
+                (future, None, unit_errors.get(id(future)) or e)
+                for future, _, _ in batch
+                if not future.cancelled()
+            ]
+        finally:
+            session.close()
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+_executor: Optional[WriteExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_write_executor() -> Optional[WriteExecutor]:
+    """Return the shared write executor, or None when the queue is disabled."""
+    global _executor
+    if not settings.WRITE_QUEUE_ENABLED:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from sqlalchemy.orm import sessionmaker
+                from app.database import engine, RoutingSession
+
+                writer_sessions = sessionmaker(
+                    class_=RoutingSession,
+                    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+                )
+                _executor = WriteExecutor(
+                    writer_sessions,
+                    max_batch=settings.WRITE_QUEUE_MAX_BATCH,
+                    max_wait_ms=settings.WRITE_QUEUE_MAX_WAIT_MS,
+                )
+    return _executor
+
+
+def shutdown_write_executor():
+    """Stop the shared writer thread, committing anything still queued."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+@traced("db.run_write")
+def run_write(db: Session, unit: UnitOfWork) -> Any:
+    """
+    Run a unit of work and commit it.
+    Goes through the writer thread when the write queue is enabled,
+    otherwise runs on the caller's session and commits directly.
+    """
+    executor = get_write_executor()
+    if executor is None:
+        result = unit(db)
+        db.commit()
+        return result
+
+    # The unit runs on the writer's session; changes made on this one wouldn't be committed
+    if db.new or db.dirty or db.deleted:
+        raise RuntimeError("run_write called with uncommitted changes on the request session")
+
+    # Hand the caller's connections back before waiting: the writer checks out from
+    # the same pools, and callers blocked while holding them would starve it.
+    # (This expires the caller's loaded objects; they reload on next access.)
+    db.rollback()
+
+    def traced_unit(session: Session) -> Any:
+        # Runs on the writer thread, under this call's span
+        with start_span("db.write_unit"):
+            return unit(session)
+
+    future = executor.submit(traced_unit, event_id=db.info.get("event_id"))
+    return future.result(timeout=settings.WRITE_QUEUE_TIMEOUT_SECONDS)
@@ -1,16 +1,211 @@
-from sqlalchemy import create_engine
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.util import find_tables
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+def is_sqlite_url(url: str) -> bool:
+    """Check whether a database URL points at SQLite."""
+    return url.startswith("sqlite")
+
+
+def _apply_sqlite_pragmas(engine, foreign_keys: bool = True):
+    """Apply the SQLite tuning profile to every new DBAPI connection."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # busy_timeout first so the journal_mode switch can wait for other writers
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA temp_store = {settings.SQLITE_TEMP_STORE}")
+        cursor.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+        cursor.close()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        from app.core.metrics import DB_POOL_CHECKOUT_WAIT
+
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def _uses_queue_pool(url: str) -> bool:
+    """In-memory SQLite gets a single-connection pool; everything else a QueuePool."""
+    return not (is_sqlite_url(url) and make_url(url).database in (None, "", ":memory:"))
+
+
+def build_engine(url: str, foreign_keys: bool = True, **kwargs):
+    """
+    Create an engine using the settings-driven tuning profile.
+    SQLite gets WAL + pragmas on connect; server databases get pool settings.
+    """
+    if _uses_queue_pool(url):
+        kwargs.setdefault("poolclass", TimedQueuePool)
+
+    if is_sqlite_url(url):
+        connect_args = {
+            "check_same_thread": False,
+            # pysqlite's own lock wait, in seconds
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        db_engine = create_engine(url, connect_args=connect_args, **kwargs)
+        _apply_sqlite_pragmas(db_engine, foreign_keys=foreign_keys)
+        return db_engine
+
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        **kwargs
+    )
+
+
+# Tables whose rows belong to one event; routed by event_id when sharding is on.
+# Global tables (users, games, events, event_shards) always stay on the central DB.
+EVENT_SCOPED_TABLES = {"event_levels", "user_level_progress", "media_assets", "event_stats"}
+
+# Shard engines, indexed by shard id (empty list = sharding disabled)
+shard_engines = []
+
+# event_id -> shard id, filled from the event_shards directory on first use
+_event_shards = {}
+_event_shards_lock = threading.Lock()
+
+
+def configure_shards(urls) -> None:
+    """(Re)build the shard engines. Shards don't enforce foreign keys since parents live centrally."""
+    for shard in shard_engines:
+        shard.dispose()
+    shard_engines[:] = [build_engine(url, foreign_keys=False) for url in urls]
+    _event_shards.clear()
+
+
+def sharding_enabled() -> bool:
+    return bool(shard_engines)
+
+
+def default_shard_for_event(event_id: int) -> int:
+    """Shard for a new event; also the fallback for events created before placements were recorded."""
+    return event_id % len(shard_engines)
+
+
+def place_events(db: Session, event_ids: List[int]) -> Dict[int, int]:
+    """
+    Record the shard of newly created events in event_shards, in db's
+    transaction, so changing SHARD_DATABASE_URLS doesn't move them.
+    Returns event_id -> shard id ({} when sharding is off); pass them to
+    `remember_shard` once committed.
+    """
+    if not shard_engines or not event_ids:
+        return {}
+    placements = {event_id: default_shard_for_event(event_id) for event_id in event_ids}
+    db.execute(
+        text("INSERT INTO event_shards (event_id, shard_id) VALUES (:event_id, :shard_id)"),
+        [{"event_id": event_id, "shard_id": shard_id} for event_id, shard_id in placements.items()]
+    )
+    return placements
+
+
+def shard_for_event(event_id: int, central=None) -> int:
+    """
+    Look up which shard holds an event's rows (cached per process).
+    Events created before placements were recorded fall back to the default.
+    """
+    shard_id = _event_shards.get(event_id)
+    if shard_id is not None:
+        return shard_id
+
+    with (central or engine).connect() as conn:
+        shard_id = conn.execute(
+            text("SELECT shard_id FROM event_shards WHERE event_id = :event_id"),
+            {"event_id": event_id}
+        ).scalar()
+    if shard_id is None:
+        shard_id = default_shard_for_event(event_id)
+
+    with _event_shards_lock:
+        _event_shards[event_id] = shard_id
+    return shard_id
+
+
+def remember_shard(event_id: int, shard_id: int) -> None:
+    """Update the cached placement after an event is placed or moved."""
+    with _event_shards_lock:
+        _event_shards[event_id] = shard_id
+
+
+def _touches_event_scoped_tables(mapper, clause) -> bool:
+    """Decide whether a statement targets event-scoped tables, refusing cross-shard joins."""
+    if clause is not None:
+        tables = {t.name for t in find_tables(clause, include_crud=True) if hasattr(t, "name")}
+        if tables:
+            scoped = tables & EVENT_SCOPED_TABLES
+            if scoped and tables - EVENT_SCOPED_TABLES:
+                raise RuntimeError(
+                    f"Cross-shard join between {sorted(scoped)} and "
+                    f"{sorted(tables - EVENT_SCOPED_TABLES)}; query them separately"
+                )
+            return bool(scoped)
+
+    if mapper is not None and hasattr(mapper, "local_table"):
+        return mapper.local_table.name in EVENT_SCOPED_TABLES
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Session that sends event-scoped tables to the event's shard.
+    The event comes from session.info["event_id"] (or an explicit
+    session.info["shard_id"]); everything else uses the session's own bind.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if shard_engines and _touches_event_scoped_tables(mapper, clause):
+            shard_id = self.info.get("shard_id")
+            if shard_id is None:
+                event_id = self.info.get("event_id")
+                if event_id is None:
+                    raise RuntimeError("Event-scoped query on a session without an event_id")
+                shard_id = shard_for_event(event_id, central=self.bind)
+            return shard_engines[shard_id]
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+engine = build_engine(settings.DATABASE_URL)
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+# Read replica engine (falls back to the primary when not configured)
+read_engine = build_engine(settings.READ_DATABASE_URL) if settings.READ_DATABASE_URL else engine
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=read_engine)
+
+configure_shards(settings.shard_urls_list)
 
 # Create Base class for models
 Base = declarative_base()
@@ -23,3 +218,141 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get a shard-aware DB session for routes under /events/{event_id}
+def get_event_db(event_id: int):
+    db = SessionLocal()
+    db.info["event_id"] = event_id
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Read-your-writes: client key -> monotonic time until which reads stay on the primary
+_recent_writers = {}
+_recent_writers_lock = threading.Lock()
+_replica_health = {"healthy": True, "checked_at": 0.0}
+
+
+def read_replica_enabled() -> bool:
+    """Whether read-only endpoints have a separate replica to use."""
+    return read_engine is not engine
+
+
+def _client_key(request: Request) -> Optional[str]:
+    """
+    Identify a client for read-your-writes by its bearer token. Anonymous
+    clients get None: a venue's guests often share one address behind NAT,
+    so keying them by IP would pin the whole venue to the primary.
+    """
+    return request.headers.get("authorization") or None
+
+
+def note_write(request: Request) -> None:
+    """Pin this client's reads to the primary for READ_YOUR_WRITES_SECONDS."""
+    key = _client_key(request)
+    if key is None:
+        return
+    now = time.monotonic()
+    with _recent_writers_lock:
+        _recent_writers[key] = now + settings.READ_YOUR_WRITES_SECONDS
+        if len(_recent_writers) > 10000:
+            for key, until in list(_recent_writers.items()):
+                if until < now:
+                    del _recent_writers[key]
+
+
+def _is_sticky(request: Request) -> bool:
+    key = _client_key(request)
+    if key is None:
+        return False
+    until = _recent_writers.get(key)
+    return until is not None and until > time.monotonic()
+
+
+def _replica_is_healthy() -> bool:
+    """Ping the replica at most once per READ_REPLICA_HEALTH_CHECK_SECONDS."""
+    now = time.monotonic()
+    if now - _replica_health["checked_at"] < settings.READ_REPLICA_HEALTH_CHECK_SECONDS:
+        return _replica_health["healthy"]
+
+    _replica_health["checked_at"] = now
+    try:
+        with read_engine.connect() as conn:
+            conn.execute(text("SELECT 1 FROM events LIMIT 1"))
+        _replica_health["healthy"] = True
+    except Exception as e:
+        if _replica_health["healthy"]:
+            logger.warning("Read replica unavailable, using primary: %s", e)
+        _replica_health["healthy"] = False
+    return _replica_health["healthy"]
+
+
+def _read_session(request: Request) -> Session:
+    use_replica = (
+        read_replica_enabled()
+        and not _is_sticky(request)
+        and _replica_is_healthy()
+    )
+    return ReadSessionLocal() if use_replica else SessionLocal()
+
+
+# Dependency to get a DB session for read-only endpoints
+def get_read_db(request: Request):
+    db = _read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for read-only routes under /events/{event_id} (replica + shard aware).
+# Shards have no replicas, so event-scoped tables always read from the event's shard.
+def get_event_read_db(event_id: int, request: Request):
+    db = _read_session(request)
+    db.info["event_id"] = event_id
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def sync_sqlite_replica(primary_url: str = None, replica_url: str = None) -> None:
+    """
+    Copy a SQLite primary into a SQLite replica file with the online backup API.
+    Meant for local testing of replica routing; real deployments use
+    database-level replication.
+    """
+    primary_path = make_url(primary_url or settings.DATABASE_URL).database
+    replica_path = make_url(replica_url or settings.READ_DATABASE_URL).database
+
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def start_replica_sync() -> None:
+    """Keep a local SQLite replica in sync every READ_REPLICA_SYNC_SECONDS."""
+    if not (
+        settings.READ_REPLICA_SYNC_SECONDS > 0
+        and read_replica_enabled()
+        and is_sqlite_url(settings.DATABASE_URL)
+        and is_sqlite_url(settings.READ_DATABASE_URL)
+    ):
+        return
+
+    def sync_loop():
+        while True:
+            try:
+                sync_sqlite_replica()
+            except Exception:
+                logger.exception("Replica sync failed")
+            time.sleep(settings.READ_REPLICA_SYNC_SECONDS)
+
+    threading.Thread(target=sync_loop, name="replica-sync", daemon=True).start()
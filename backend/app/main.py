@@ -1,51 +1,155 @@
-from fastapi import FastAPI
+"""
+FastAPI application factory.
+
+Importing this module has no side effects on the database: the schema is
+managed by Alembic (`alembic upgrade head`) and shards by
+`python -m app.sharding init`, each run once as a separate step.
+Heavy dependencies (jose, passlib, requests) are imported on first use.
+"""
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.database import engine, Base
-
-# Import routers
-from app.api import auth, events, games, levels, media, progress, leaderboard
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Initialize FastAPI app
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    debug=settings.DEBUG,
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# CORS middleware - Allow all origins in development
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins in development
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(events.router, prefix="/api/events", tags=["Events"])
-app.include_router(games.router, prefix="/api/games", tags=["Games"])
-app.include_router(levels.router, prefix="/api", tags=["Levels"])
-app.include_router(media.router, prefix="/api", tags=["Media"])
-app.include_router(progress.router, prefix="/api", tags=["Progress"])
-app.include_router(leaderboard.router, prefix="/api", tags=["Leaderboard"])
-
-
-@app.get("/")
-def read_root():
-    return {
-        "message": "Welcome to Utsav Games API",
-        "version": settings.APP_VERSION,
-        "docs": "/docs"
-    }
-
-
-@app.get("/health")
-def health_check():
-    return {"status": "healthy", "environment": settings.ENVIRONMENT}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.database import start_replica_sync
+    from app.core.write_executor import shutdown_write_executor
+
+    # Start the local SQLite replica sync, if configured
+    start_replica_sync()
+    # Game catalog snapshot (falls back to loading on first use)
+    from app.services.game_service import preload_catalog
+    preload_catalog(app)
+    # Purge events deleted before the last shutdown
+    from app.services.purge_service import resume_purges
+    resume_purges(app)
+    # Periodic recount of the event dashboard counters
+    from app.services.stats_service import start_stats_reconciler
+    start_stats_reconciler()
+    # Scheduled activation, pre-warming and final leaderboards
+    from app.services.lifecycle_service import start_lifecycle_scheduler, stop_lifecycle_scheduler
+    start_lifecycle_scheduler(app)
+    if settings.PROFILER_SECRET and settings.PROFILER_SAMPLER_ENABLED:
+        from app.core.profiler import get_background_sampler
+        get_background_sampler().start()
+    yield
+    stop_lifecycle_scheduler()
+    # Commit anything still queued for the writer thread
+    shutdown_write_executor()
+    if settings.PROFILER_SECRET:
+        from app.core.profiler import stop_background_sampler
+        stop_background_sampler()
+    if settings.TRACING_ENABLED:
+        from app.core.tracing import tracer
+        tracer.shutdown()
+
+
+async def read_your_writes(request: Request, call_next):
+    """Pin a client's reads to the primary right after it writes."""
+    from app.database import note_write
+
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        note_write(request)
+    return response
+
+
+def create_app() -> FastAPI:
+    """Build the FastAPI app (usable with `uvicorn --factory app.main:create_app`)."""
+    from app.database import read_replica_enabled
+    from app.api import auth, events, games, levels, media, progress, leaderboard, funnel
+    from app.websockets import funnel_ws
+    from app.core.responses import ORJSONResponse
+
+    app = FastAPI(
+        title=settings.APP_NAME,
+        version=settings.APP_VERSION,
+        debug=settings.DEBUG,
+        docs_url="/docs",
+        redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+
+    # CORS middleware - Allow all origins in development
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Allow all origins in development
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # gzip / brotli for JSON and text bodies over COMPRESSION_MIN_SIZE
+    if settings.COMPRESSION_ENABLED:
+        from app.core.compression import CompressionMiddleware
+        app.add_middleware(CompressionMiddleware)
+
+    # N+1 and slow-request warnings (plus query count / DB time headers if enabled)
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        from app.core.db_instrumentation import SQLInstrumentationMiddleware, install_sql_instrumentation
+        install_sql_instrumentation()
+        app.add_middleware(SQLInstrumentationMiddleware)
+
+    # Per-route latency histograms and in-flight requests for /metrics
+    if settings.METRICS_ENABLED:
+        from app.core.metrics import MetricsMiddleware
+        app.add_middleware(MetricsMiddleware)
+
+    # Signed single-request profiles and the background sampler
+    if settings.PROFILER_SECRET:
+        from app.core.profiler import ProfilerMiddleware
+        app.add_middleware(ProfilerMiddleware)
+
+    # Request spans, with DB statements and service calls as children
+    if settings.TRACING_ENABLED:
+        from app.core.tracing import TracingMiddleware, install_db_tracing
+        install_db_tracing()
+        app.add_middleware(TracingMiddleware)
+
+    # Read-your-writes stickiness is only needed when a replica is configured
+    if read_replica_enabled():
+        app.middleware("http")(read_your_writes)
+
+    # Include routers
+    app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
+    app.include_router(events.router, prefix="/api/events", tags=["Events"])
+    app.include_router(games.router, prefix="/api/games", tags=["Games"])
+    app.include_router(levels.router, prefix="/api", tags=["Levels"])
+    app.include_router(media.router, prefix="/api", tags=["Media"])
+    app.include_router(progress.router, prefix="/api", tags=["Progress"])
+    app.include_router(leaderboard.router, prefix="/api", tags=["Leaderboard"])
+    app.include_router(funnel.router, prefix="/api", tags=["Funnel"])
+    app.include_router(funnel_ws.router, tags=["Funnel"])
+    if settings.PROFILER_SECRET:
+        from app.api import profiler
+        app.include_router(profiler.router, prefix="/api/admin/profiler", tags=["Profiler"])
+
+    @app.get("/")
+    def read_root():
+        return {
+            "message": "Welcome to Utsav Games API",
+            "version": settings.APP_VERSION,
+            "docs": "/docs"
+        }
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "healthy", "environment": settings.ENVIRONMENT}
+
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics(request: Request):
+            # async so threadpool gauges are read from the event loop
+            from app.core.metrics import registry, scrape_allowed, CONTENT_TYPE
+            if not scrape_allowed(request.headers.get("authorization")):
+                return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+            return Response(registry.render(), media_type=CONTENT_TYPE)
+
+    return app
+
+
+app = create_app()
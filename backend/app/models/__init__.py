@@ -5,6 +5,8 @@ from app.models.game import Game
 from app.models.level import EventLevel
 from app.models.progress import UserLevelProgress
 from app.models.media import MediaAsset
+from app.models.shard import EventShard
+from app.models.stats import EventStats
 
 __all__ = [
     "User", 
@@ -13,5 +15,7 @@ __all__ = [
     "Game", 
     "EventLevel",
     "UserLevelProgress",
-    "MediaAsset"
+    "MediaAsset",
+    "EventShard",
+    "EventStats"
 ]
@@ -22,6 +22,7 @@ class Event(Base):
     theme_config = Column(Text, nullable=True)  # JSON string for theme colors
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # soft-deleted, rows being purged
     
     @staticmethod
     def generate_qr_token():
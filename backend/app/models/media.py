@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 
 class MediaAsset(Base):
     __tablename__ = "media_assets"
+    __table_args__ = (
+        Index("ix_media_assets_event_display_order", "event_id", "display_order"),
+    )
     
     asset_id = Column(Integer, primary_key=True, index=True)
     event_id = Column(Integer, ForeignKey("events.event_id", ondelete="CASCADE"), nullable=False)
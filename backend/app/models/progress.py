@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 
 class UserLevelProgress(Base):
     __tablename__ = "user_level_progress"
+    __table_args__ = (
+        # Leaderboard aggregates: completed rows of one event, grouped by user
+        Index("ix_user_level_progress_event_status_user", "event_id", "status", "user_id"),
+        # Level start / unlock checks for one user
+        Index("ix_user_level_progress_user_level_status", "user_id", "level_id", "status"),
+        # Incremental analytics export: keyset scan of finished attempts
+        Index("ix_user_level_progress_completion", "completion_time", "progress_id"),
+    )
     
     progress_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class EventShard(Base):
+    """Directory entry placing an event's rows on a shard (central DB only)."""
+    __tablename__ = "event_shards"
+    
+    event_id = Column(Integer, ForeignKey("events.event_id", ondelete="CASCADE"), primary_key=True)
+    shard_id = Column(Integer, nullable=False)
+    moved_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<EventShard event={self.event_id} shard={self.shard_id}>"
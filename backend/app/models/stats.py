@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class EventStats(Base):
+    """Per-event dashboard counters, kept up to date by the progress endpoints."""
+    __tablename__ = "event_stats"
+    
+    event_id = Column(Integer, ForeignKey("events.event_id", ondelete="CASCADE"), primary_key=True)
+    
+    total_participants = Column(Integer, nullable=False, default=0)
+    completed_all_levels = Column(Integer, nullable=False, default=0)  # completed the final level
+    correct_name_guesses = Column(Integer, nullable=False, default=0)
+    
+    reconciled_at = Column(DateTime(timezone=True), nullable=True)  # last full recount
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<EventStats event={self.event_id} participants={self.total_participants}>"
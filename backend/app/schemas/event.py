@@ -1,6 +1,6 @@
 from pydantic import BaseModel, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class EventBase(BaseModel):
@@ -19,6 +19,29 @@ class EventCreate(EventBase):
     theme_config: Optional[str] = None
 
 
+class EventProvisionRequest(BaseModel):
+    """Bulk creation; with a template, its levels (and media references) are cloned into each event."""
+    template_event_id: Optional[int] = None
+    clone_media: bool = True
+    events: List[EventCreate]  # total_levels, description and theme_config default to the template's
+
+
+class EventProvisionResult(BaseModel):
+    index: int  # position in the request
+    status: str  # created, invalid, failed
+    event_id: Optional[int] = None
+    qr_code_token: Optional[str] = None
+    levels: int = 0
+    media: int = 0
+    detail: Optional[str] = None
+
+
+class EventProvisionResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[EventProvisionResult]
+
+
 class EventUpdate(BaseModel):
     event_name: Optional[str] = None
     event_date: Optional[datetime] = None
@@ -3,8 +3,11 @@ from app.models.user import User
 from app.core.security import create_access_token
 from datetime import timedelta
 from app.core.config import settings
+from app.core.write_executor import run_write
+from app.core.tracing import traced
 
 
+@traced()
 def get_or_create_user(db: Session, phone_number: str, name: str = None) -> User:
     """Get existing user or create new one."""
     user = db.query(User).filter(User.phone_number == phone_number).first()
@@ -12,19 +15,42 @@ def get_or_create_user(db: Session, phone_number: str, name: str = None) -> User
     if user:
         return user
     
-    # Create new user
-    user = User(
-        name=name or "User",
-        phone_number=phone_number,
-        is_verified=True
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    def create_user(session: Session) -> User:
+        # Re-check inside the unit of work so two logins can't both insert
+        existing = session.query(User).filter(User.phone_number == phone_number).first()
+        if existing:
+            return existing
+
+        user = User(
+            name=name or "User",
+            phone_number=phone_number,
+            is_verified=True
+        )
+        session.add(user)
+        session.flush()
+        session.refresh(user)
+        return user
+    
+    return run_write(db, create_user)
+
+
+@traced()
+def update_user_profile(db: Session, user_id: int, name: str = None, email: str = None) -> User:
+    """Update a user's name and/or email."""
+    def apply_update(session: Session) -> User:
+        user = session.query(User).filter(User.user_id == user_id).first()
+        if name:
+            user.name = name
+        if email:
+            user.email = email
+        session.flush()
+        session.refresh(user)
+        return user
     
-    return user
+    return run_write(db, apply_update)
 
 
+@traced()
 def create_user_token(user: User) -> dict:
     """Create access token for user."""
     access_token = create_access_token(
@@ -0,0 +1,152 @@
+"""
+Event lookup cache.
+
+Most event-scoped routes only need to know that an event exists and a few
+of its fields, and the QR lookup is the hottest public endpoint. Events are
+cached here as immutable snapshots, keyed by both event_id and
+qr_code_token, for EVENT_CACHE_SECONDS. Unknown ids and tokens are cached
+too, for EVENT_NEGATIVE_CACHE_SECONDS, in a separate bounded cache so a
+token-guessing flood can neither reach the database nor evict real events.
+
+The event admin endpoints invalidate entries after committing; other
+workers see the change when their entries expire.
+"""
+import base64
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from app.models.event import Event
+from app.schemas.event import EventPublicResponse
+
+_public_event = TypeAdapter(EventPublicResponse)
+
+
+def encrypt_name(name: str) -> str:
+    """Simple base64 encoding (use proper encryption in production)."""
+    return base64.b64encode(name.encode()).decode()
+
+
+def decrypt_name(encrypted: str) -> str:
+    """Simple base64 decoding."""
+    return base64.b64decode(encrypted.encode()).decode()
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, as stored (aware values from the API or Postgres are converted)."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@dataclass(frozen=True)
+class EventSnapshot:
+    """Read-only copy of an event row (without the encrypted answer)."""
+    event_id: int
+    event_name: str
+    event_date: datetime
+    organizer_name: str
+    qr_code_token: str
+    total_levels: int
+    is_active: bool
+    event_start_time: Optional[datetime]
+    event_end_time: Optional[datetime]
+    description: Optional[str]
+    theme_config: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+    public_body: bytes = field(repr=False)  # encoded EventPublicResponse
+    public_etag: str = field(repr=False)
+
+    @property
+    def last_modified(self) -> datetime:
+        return self.updated_at or self.created_at
+
+    def has_ended(self, now: Optional[datetime] = None) -> bool:
+        end = as_utc(self.event_end_time)
+        return end is not None and end <= (now or datetime.utcnow())
+
+    @classmethod
+    def from_row(cls, event: Event) -> "EventSnapshot":
+        body = _public_event.dump_json(_public_event.validate_python(event, from_attributes=True))
+        return cls(
+            event_id=event.event_id,
+            event_name=event.event_name,
+            event_date=event.event_date,
+            organizer_name=event.organizer_name,
+            qr_code_token=event.qr_code_token,
+            total_levels=event.total_levels,
+            is_active=bool(event.is_active),
+            event_start_time=event.event_start_time,
+            event_end_time=event.event_end_time,
+            description=event.description,
+            theme_config=event.theme_config,
+            created_at=event.created_at,
+            updated_at=event.updated_at,
+            public_body=body,
+            public_etag=make_etag(body),
+        )
+
+
+_MISSING = object()
+
+_by_id = TTLCache(settings.EVENT_CACHE_SECONDS, maxsize=settings.EVENT_CACHE_MAX_ENTRIES)
+_by_token = TTLCache(settings.EVENT_CACHE_SECONDS, maxsize=settings.EVENT_CACHE_MAX_ENTRIES)
+_missing = TTLCache(settings.EVENT_NEGATIVE_CACHE_SECONDS, maxsize=settings.EVENT_CACHE_MAX_ENTRIES)
+
+
+def _remember(event: Optional[Event], negative_key: tuple) -> Optional[EventSnapshot]:
+    if event is None:
+        _missing.set(negative_key, True)
+        return None
+    snapshot = EventSnapshot.from_row(event)
+    _by_id.set(snapshot.event_id, snapshot)
+    _by_token.set(snapshot.qr_code_token, snapshot)
+    return snapshot
+
+
+def get_event(db: Session, event_id: int) -> Optional[EventSnapshot]:
+    """Snapshot of the event, or None if it doesn't exist or was deleted."""
+    snapshot = _by_id.get(event_id)
+    if snapshot is not None:
+        return snapshot
+    if _missing.get(("id", event_id)):
+        return None
+    return _remember(db.query(Event).filter(
+        Event.event_id == event_id, Event.deleted_at.is_(None)
+    ).first(), ("id", event_id))
+
+
+def get_event_by_token(db: Session, qr_token: str) -> Optional[EventSnapshot]:
+    """Snapshot of the event behind a QR token, or None if no event has it."""
+    snapshot = _by_token.get(qr_token)
+    if snapshot is not None:
+        return snapshot
+    if _missing.get(("token", qr_token)):
+        return None
+    return _remember(db.query(Event).filter(
+        Event.qr_code_token == qr_token, Event.deleted_at.is_(None)
+    ).first(), ("token", qr_token))
+
+
+def load_event(db: Session, event_id: int) -> Optional[EventSnapshot]:
+    """Re-read the event into the cache, restarting its TTL (pre-warming)."""
+    return _remember(db.query(Event).filter(
+        Event.event_id == event_id, Event.deleted_at.is_(None)
+    ).first(), ("id", event_id))
+
+
+def invalidate_event(event_id: int, qr_token: Optional[str] = None) -> None:
+    """Forget an event (after it is created, changed or deleted) in this worker."""
+    cached = _by_id.get(event_id)
+    _by_id.delete(event_id)
+    _missing.delete(("id", event_id))
+    for token in {qr_token, cached.qr_code_token if cached else None} - {None}:
+        _by_token.delete(token)
+        _missing.delete(("token", token))
@@ -0,0 +1,162 @@
+"""
+Streaming export of an event's results.
+
+Progress rows are read with `yield_per`, so the database driver hands them
+over in batches of EXPORT_BATCH_SIZE (a server-side cursor where the backend
+has one) instead of materializing the event. Each batch looks up its users'
+names in one query (users live on the central database, progress may be on
+a shard), is rendered as CSV or NDJSON and yielded as one chunk. Memory stays
+proportional to the batch size, not to the event. The stream opens its own
+session (bound like the request's) and closes it when the body is done.
+"""
+import csv
+import io
+import json
+import re
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.responses import dump_json
+from app.models.level import EventLevel
+from app.models.progress import UserLevelProgress
+from app.models.user import User
+
+BASE_COLUMNS = (
+    "user_id", "name", "level_number", "status", "attempts_count", "is_passed",
+    "time_taken_seconds", "start_time", "completion_time",
+)
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# result_data keys that may be exported as columns
+_FIELD_NAME = re.compile(r"^[A-Za-z0-9_]{1,64}$")
+
+# Spreadsheet apps evaluate cells starting with these; guest names are user input
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def parse_fields(raw: str) -> List[str]:
+    """Validated result_data keys from a comma-separated list; raises ValueError."""
+    fields = [f.strip() for f in raw.split(",") if f.strip()] if raw else []
+    if len(fields) > settings.EXPORT_MAX_RESULT_FIELDS:
+        raise ValueError(f"At most {settings.EXPORT_MAX_RESULT_FIELDS} result fields can be exported")
+    bad = [f for f in fields if not _FIELD_NAME.match(f)]
+    if bad:
+        raise ValueError(f"Invalid result field names: {', '.join(bad)}")
+    return list(dict.fromkeys(fields))
+
+
+def _result_values(result_data, fields: Sequence[str]) -> list:
+    if not fields:
+        return []
+    try:
+        result = json.loads(result_data) if result_data else {}
+    except ValueError:
+        result = {}
+    if not isinstance(result, dict):
+        result = {}
+    return [result.get(field) for field in fields]
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, separators=(",", ":"))
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _batches(db: Session, event_id: int) -> Iterator[list]:
+    progress = db.execute(
+        select(
+            UserLevelProgress.user_id,
+            UserLevelProgress.level_id,
+            UserLevelProgress.status,
+            UserLevelProgress.attempts_count,
+            UserLevelProgress.is_passed,
+            UserLevelProgress.time_taken_seconds,
+            UserLevelProgress.start_time,
+            UserLevelProgress.completion_time,
+            UserLevelProgress.result_data,
+        )
+        .where(UserLevelProgress.event_id == event_id)
+        .order_by(UserLevelProgress.user_id, UserLevelProgress.progress_id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    for batch in progress.partitions():
+        yield batch
+
+
+def export_rows(db: Session, event_id: int, fields: Sequence[str]) -> Iterator[List[Dict]]:
+    """
+    Batches of export rows, as lists of column -> value dicts (db routed
+    to the event's shard). Result fields are exported as `result.<field>`.
+    """
+    level_numbers = dict(db.query(EventLevel.level_id, EventLevel.level_number).filter(
+        EventLevel.event_id == event_id
+    ).all())
+    result_columns = [f"result.{field}" for field in fields]
+
+    for batch in _batches(db, event_id):
+        user_ids = {row.user_id for row in batch}
+        names = dict(db.query(User.user_id, User.name).filter(User.user_id.in_(user_ids)).all())
+        rows = []
+        for row in batch:
+            record = {
+                "user_id": row.user_id,
+                "name": names.get(row.user_id, "Guest"),
+                "level_number": level_numbers.get(row.level_id),
+                "status": row.status,
+                "attempts_count": row.attempts_count,
+                "is_passed": bool(row.is_passed),
+                "time_taken_seconds": row.time_taken_seconds,
+                "start_time": row.start_time,
+                "completion_time": row.completion_time,
+            }
+            record.update(zip(result_columns, _result_values(row.result_data, fields)))
+            rows.append(record)
+        yield rows
+
+
+def stream_csv(db: Session, event_id: int, fields: Sequence[str]) -> Iterator[bytes]:
+    columns = list(BASE_COLUMNS) + [f"result.{field}" for field in fields]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in export_rows(db, event_id, fields):
+        for record in rows:
+            writer.writerow([_csv_cell(record[column]) for column in columns])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def stream_ndjson(db: Session, event_id: int, fields: Sequence[str]) -> Iterator[bytes]:
+    for rows in export_rows(db, event_id, fields):
+        yield b"".join(dump_json(record) + b"\n" for record in rows)
+
+
+def stream_export(
+    session_factory: Callable[[], Session], event_id: int, format: str, fields: Sequence[str]
+) -> Iterator[bytes]:
+    """
+    The export body, read through its own session: a streamed body outlives
+    the request's dependencies, so it must not use their session.
+    """
+    db = session_factory()
+    db.info["event_id"] = event_id
+    try:
+        stream = stream_ndjson if format == "ndjson" else stream_csv
+        yield from stream(db, event_id, fields)
+    finally:
+        db.close()
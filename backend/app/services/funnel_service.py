@@ -0,0 +1,174 @@
+"""
+Live per-level funnel for the organizer dashboard.
+
+For each level of an event an `EventFunnel` keeps the number of attempts
+started, completed and failed (the difference is attempts in progress), how
+many retries passing players needed, and a DDSketch of completion times for
+the median and p90. It is built once per worker from the event's progress
+rows and then fed by `start_level` / `complete_level` in O(1) per call, so
+snapshots never touch the database.
+
+Funnels are only fed while loaded; an evicted one is rebuilt from the
+database on the next read. Rebuilding every FUNNEL_REBUILD_SECONDS also
+folds in writes made by other workers.
+"""
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.responses import dump_json
+from app.core.sketch import DDSketch
+from app.models.level import EventLevel
+from app.models.progress import UserLevelProgress
+
+# Retry counts at or above this share one "N+" bucket
+MAX_RETRY_BUCKET = 5
+
+
+def _retry_bucket(retries: int) -> str:
+    return f"{MAX_RETRY_BUCKET}+" if retries >= MAX_RETRY_BUCKET else str(retries)
+
+
+class LevelFunnel:
+    __slots__ = ("level_id", "level_number", "started", "completed", "failed", "retries", "durations")
+
+    def __init__(self, level_id: int, level_number: Optional[int]):
+        self.level_id = level_id
+        self.level_number = level_number
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries: Counter = Counter()
+        self.durations = DDSketch(settings.FUNNEL_SKETCH_ACCURACY)
+
+    def finish(self, passed: bool, seconds: Optional[int], retries: int) -> None:
+        if not passed:
+            self.failed += 1
+            return
+        self.completed += 1
+        self.retries[_retry_bucket(retries)] += 1
+        if seconds is not None:
+            self.durations.add(max(seconds, 0))
+
+    def as_dict(self) -> dict:
+        median, p90 = self.durations.quantile(0.5), self.durations.quantile(0.9)
+        return {
+            "level_id": self.level_id,
+            "level_number": self.level_number,
+            "started": self.started,
+            "in_progress": max(self.started - self.completed - self.failed, 0),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": dict(self.retries),
+            "median_seconds": round(median, 1) if median is not None else None,
+            "p90_seconds": round(p90, 1) if p90 is not None else None,
+        }
+
+
+class EventFunnel:
+    """All level funnels of one event; `version` changes on every update."""
+
+    def __init__(self, event_id: int):
+        self.event_id = event_id
+        self.levels: Dict[int, LevelFunnel] = {}
+        self.version = 0
+        self._lock = threading.Lock()
+        self._body: Optional[bytes] = None
+        self._body_version = -1
+
+    def _level(self, level_id: int, level_number: Optional[int]) -> LevelFunnel:
+        level = self.levels.get(level_id)
+        if level is None:
+            level = self.levels[level_id] = LevelFunnel(level_id, level_number)
+        return level
+
+    def record_start(self, level_id: int, level_number: Optional[int] = None) -> None:
+        with self._lock:
+            self._level(level_id, level_number).started += 1
+            self.version += 1
+
+    def record_finish(self, level_id: int, passed: bool, seconds: Optional[int], retries: int) -> None:
+        with self._lock:
+            self._level(level_id, None).finish(passed, seconds, retries)
+            self.version += 1
+
+    def body(self) -> bytes:
+        """Encoded snapshot, re-encoded only after an update."""
+        with self._lock:
+            if self._body_version != self.version:
+                levels = sorted(self.levels.values(), key=lambda l: (l.level_number or 0, l.level_id))
+                self._body = dump_json({
+                    "event_id": self.event_id,
+                    "version": self.version,
+                    "levels": [level.as_dict() for level in levels],
+                })
+                self._body_version = self.version
+            return self._body
+
+
+def build_funnel(db: Session, event_id: int) -> EventFunnel:
+    """Replay an event's progress rows (db routed to its shard) into a fresh funnel."""
+    funnel = EventFunnel(event_id)
+    for level_id, level_number in db.query(EventLevel.level_id, EventLevel.level_number).filter(
+        EventLevel.event_id == event_id
+    ):
+        funnel._level(level_id, level_number)
+
+    attempts: Counter = Counter()
+    rows = db.query(
+        UserLevelProgress.user_id,
+        UserLevelProgress.level_id,
+        UserLevelProgress.status,
+        UserLevelProgress.time_taken_seconds
+    ).filter(
+        UserLevelProgress.event_id == event_id
+    ).order_by(UserLevelProgress.progress_id)
+    for user_id, level_id, status, seconds in rows:
+        level = funnel._level(level_id, None)
+        level.started += 1
+        if status in ("completed", "failed"):
+            level.finish(status == "completed", seconds, attempts[(user_id, level_id)])
+        attempts[(user_id, level_id)] += 1
+    return funnel
+
+
+_funnels = TTLCache(settings.FUNNEL_REBUILD_SECONDS, maxsize=settings.FUNNEL_MAX_EVENTS)
+_build_lock = threading.Lock()
+
+
+def get_funnel(db: Session, event_id: int) -> EventFunnel:
+    """The event's live funnel, built from the database if this worker has none."""
+    funnel = _funnels.get(event_id)
+    if funnel is None:
+        with _build_lock:
+            funnel = _funnels.get(event_id)
+            if funnel is None:
+                funnel = build_funnel(db, event_id)
+                _funnels.set(event_id, funnel)
+    return funnel
+
+
+def tracked_funnel(event_id: int) -> Optional[EventFunnel]:
+    """The event's funnel if loaded in this worker; writes skip events nobody watches."""
+    return _funnels.get(event_id)
+
+
+def record_start(event_id: int, level_id: int, level_number: int) -> None:
+    funnel = tracked_funnel(event_id)
+    if funnel is not None:
+        funnel.record_start(level_id, level_number)
+
+
+def record_finish(event_id: int, level_id: int, passed: bool, seconds: Optional[int], retries: int) -> None:
+    funnel = tracked_funnel(event_id)
+    if funnel is not None:
+        funnel.record_finish(level_id, passed, seconds, retries)
+
+
+def drop_funnel(event_id: int) -> None:
+    """Forget an event's funnel in this worker (after it is deleted)."""
+    _funnels.delete(event_id)
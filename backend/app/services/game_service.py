@@ -0,0 +1,165 @@
+"""
+In-memory game catalog.
+
+The catalog is a handful of rows that change perhaps once a month, so it is
+held as an immutable snapshot: loaded at startup (or on first use), replaced
+as a whole by the game admin endpoints after they commit, and re-read after
+GAME_CATALOG_MAX_AGE_SECONDS so other workers pick up changes too. Readers
+just take the current snapshot; a swap is a single reference assignment.
+
+The snapshot also carries the encoded catalog responses and their ETags, so
+the catalog endpoints do no database or serialization work at all.
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from app.models.game import Game
+from app.schemas.game import GameResponse
+
+logger = logging.getLogger(__name__)
+
+_game_list = TypeAdapter(List[GameResponse])
+_game = TypeAdapter(GameResponse)
+
+
+@dataclass(frozen=True)
+class CatalogGame:
+    game_id: int
+    game_name: str
+    game_type: str
+    description: Optional[str]
+    component_name: str
+    default_config_schema: Optional[str]
+    config_schema: Any  # default_config_schema parsed; treat as read-only
+    is_active: bool
+    created_at: datetime
+    updated_at: Optional[datetime]
+    body: bytes = field(repr=False)  # encoded GameResponse
+    etag: str = field(repr=False)
+
+    @property
+    def last_modified(self) -> datetime:
+        return self.updated_at or self.created_at
+
+
+def _parse_schema(raw: Optional[str]) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        logger.warning("Invalid default_config_schema JSON ignored")
+        return None
+
+
+@dataclass(frozen=True)
+class GameCatalog:
+    by_id: Mapping[int, CatalogGame]
+    loaded_at: float
+    # (body, etag) for GET /api/games, keyed by include_inactive
+    lists: Mapping[bool, Tuple[bytes, str]]
+
+    def get(self, game_id: int) -> Optional[CatalogGame]:
+        return self.by_id.get(game_id)
+
+    def list_body(self, include_inactive: bool = False) -> Tuple[bytes, str]:
+        return self.lists[include_inactive]
+
+
+def build_catalog(games: List[Game]) -> GameCatalog:
+    """Snapshot the given rows (all games, active or not)."""
+    games = sorted(games, key=lambda g: g.game_id)
+    validated = _game_list.validate_python(games, from_attributes=True)
+    by_id = {}
+    for row, model in zip(games, validated):
+        body = _game.dump_json(model)
+        by_id[row.game_id] = CatalogGame(
+            game_id=row.game_id,
+            game_name=row.game_name,
+            game_type=row.game_type,
+            description=row.description,
+            component_name=row.component_name,
+            default_config_schema=row.default_config_schema,
+            config_schema=_parse_schema(row.default_config_schema),
+            is_active=bool(row.is_active),
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            body=body,
+            etag=make_etag(body),
+        )
+
+    lists = {}
+    for include_inactive in (False, True):
+        body = _game_list.dump_json([m for m in validated if include_inactive or m.is_active])
+        lists[include_inactive] = (body, make_etag(body))
+
+    return GameCatalog(
+        by_id=MappingProxyType(by_id), loaded_at=time.monotonic(), lists=MappingProxyType(lists)
+    )
+
+
+_catalog: Optional[GameCatalog] = None
+_load_lock = threading.Lock()
+
+
+def _reload(db: Session) -> GameCatalog:
+    global _catalog
+    _catalog = build_catalog(db.query(Game).all())
+    return _catalog
+
+
+def load_catalog(db: Session) -> GameCatalog:
+    """Read the games table and swap in a new snapshot (after a catalog write)."""
+    # Serialized, so the snapshot read last is the one left in place
+    with _load_lock:
+        return _reload(db)
+
+
+def get_catalog(db: Session) -> GameCatalog:
+    """The current snapshot, (re)loaded with `db` when missing or expired."""
+    catalog = _catalog
+    if catalog is not None and not _expired(catalog):
+        return catalog
+    with _load_lock:
+        # Another request may have reloaded it while we waited
+        catalog = _catalog
+        if catalog is None or _expired(catalog):
+            catalog = _reload(db)
+    return catalog
+
+
+def _expired(catalog: GameCatalog) -> bool:
+    max_age = settings.GAME_CATALOG_MAX_AGE_SECONDS
+    return max_age > 0 and time.monotonic() - catalog.loaded_at >= max_age
+
+
+def reset_catalog() -> None:
+    """Forget the snapshot; the next reader loads a fresh one."""
+    global _catalog
+    _catalog = None
+
+
+def preload_catalog(app) -> None:
+    """Load the snapshot at startup through the app's (possibly overridden) get_db."""
+    from app.database import get_db
+
+    session_factory = app.dependency_overrides.get(get_db, get_db)
+    sessions = session_factory()
+    try:
+        load_catalog(next(sessions))
+    except Exception as e:
+        # Not migrated yet, or the database is down: load on first use instead
+        logger.warning("Game catalog not preloaded: %s", e)
+    finally:
+        sessions.close()
@@ -0,0 +1,152 @@
+"""
+Event lifecycle scheduler.
+
+Every worker runs a background thread that, each
+EVENT_SCHEDULER_INTERVAL_SECONDS:
+
+- activates events whose `event_start_time` passed since the previous tick
+  and deactivates those whose `event_end_time` passed (times are naive UTC);
+- pre-warms events starting within EVENT_PREWARM_SECONDS (and for as long
+  after the start): the event cache by id and QR token, the manifest with
+  its levels, game catalog and media, and the stats counters, so the first
+  wave of guests never builds them on the request path;
+- freezes the leaderboard of events that ended: their pages only count
+  results up to the end time and are kept for LEADERBOARD_FINAL_SECONDS.
+
+Only transitions since the previous tick are applied (on start, the last
+EVENT_SCHEDULER_CATCHUP_SECONDS), so a manual toggle in between is not
+overridden. The updates are conditional, so several workers applying the
+same transition is harmless; each of them warms its own caches.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.api.leaderboard import freeze_leaderboard
+from app.core.config import settings
+from app.core.tracing import start_trace
+from app.models.event import Event
+from app.services.event_service import invalidate_event, load_event
+from app.services.manifest_service import get_manifest
+from app.services.purge_service import app_sessions
+from app.services.stats_service import get_event_stats
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], Session]
+
+
+def prewarm_event(db: Session, event_id: int) -> bool:
+    """Load the event's per-worker structures (db routed to its shard). False if it is gone."""
+    event = load_event(db, event_id)
+    if event is None:
+        return False
+    get_manifest(db, event)
+    get_event_stats(db, event_id)
+    return True
+
+
+def _event_session(session_factory: SessionFactory, event_id: int) -> Session:
+    db = session_factory()
+    db.info["event_id"] = event_id
+    return db
+
+
+def run_lifecycle(session_factory: SessionFactory, since: datetime, now: datetime) -> Dict[str, List[int]]:
+    """Apply transitions in (since, now] and pre-warm upcoming events. Returns the event ids acted on."""
+    lead = timedelta(seconds=settings.EVENT_PREWARM_SECONDS)
+    live = Event.deleted_at.is_(None)
+
+    db = session_factory()
+    try:
+        started = db.query(Event.event_id, Event.qr_code_token).filter(
+            live,
+            Event.event_start_time > since,
+            Event.event_start_time <= now,
+            or_(Event.event_end_time.is_(None), Event.event_end_time > now)
+        ).all()
+        ended = db.query(Event.event_id, Event.qr_code_token).filter(
+            live,
+            Event.event_end_time > since,
+            Event.event_end_time <= now
+        ).all()
+        upcoming = [event_id for (event_id,) in db.query(Event.event_id).filter(
+            live,
+            Event.event_start_time > now - lead,
+            Event.event_start_time <= now + lead,
+            or_(Event.event_end_time.is_(None), Event.event_end_time > now)
+        )]
+
+        if started:
+            db.execute(update(Event).where(
+                Event.event_id.in_([event_id for event_id, _ in started]), Event.is_active == False
+            ).values(is_active=True))
+        if ended:
+            db.execute(update(Event).where(
+                Event.event_id.in_([event_id for event_id, _ in ended]), Event.is_active == True
+            ).values(is_active=False))
+        db.commit()
+    finally:
+        db.close()
+
+    for event_id, qr_token in started + ended:
+        invalidate_event(event_id, qr_token)
+
+    warmed = []
+    for event_id in upcoming:
+        db = _event_session(session_factory, event_id)
+        try:
+            if prewarm_event(db, event_id):
+                warmed.append(event_id)
+        finally:
+            db.close()
+
+    for event_id, _ in ended:
+        db = _event_session(session_factory, event_id)
+        try:
+            freeze_leaderboard(db, event_id)
+        finally:
+            db.close()
+
+    return {
+        "activated": [event_id for event_id, _ in started],
+        "deactivated": [event_id for event_id, _ in ended],
+        "warmed": warmed,
+    }
+
+
+_stop: Optional[threading.Event] = None
+
+
+def start_lifecycle_scheduler(app) -> None:
+    """Run `run_lifecycle` every EVENT_SCHEDULER_INTERVAL_SECONDS (through the app's get_db) until stopped."""
+    global _stop
+    if settings.EVENT_SCHEDULER_INTERVAL_SECONDS <= 0 or _stop is not None:
+        return
+    session_factory = app_sessions(app)
+    stop = _stop = threading.Event()
+
+    def lifecycle_loop():
+        since = datetime.utcnow() - timedelta(seconds=settings.EVENT_SCHEDULER_CATCHUP_SECONDS)
+        while not stop.wait(settings.EVENT_SCHEDULER_INTERVAL_SECONDS):
+            now = datetime.utcnow()
+            try:
+                with start_trace("event.lifecycle"):
+                    run_lifecycle(session_factory, since, now)
+                since = now
+            except Exception:
+                # Transitions since `since` are retried on the next tick
+                logger.exception("Event lifecycle tick failed")
+
+    threading.Thread(target=lifecycle_loop, name="event-lifecycle", daemon=True).start()
+
+
+def stop_lifecycle_scheduler() -> None:
+    global _stop
+    if _stop is not None:
+        _stop.set()
+        _stop = None
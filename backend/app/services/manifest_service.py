@@ -0,0 +1,152 @@
+"""
+Event manifest: everything the game client needs after a QR scan, in one body.
+
+The public part (event, enabled levels with game metadata and parsed
+configs, media grouped per level) is built once per event and kept as a
+precompressed `CachedBody` with a content-derived version. It is rebuilt
+when the event snapshot or the game catalog changes, when an admin edits
+the event's levels or media (`invalidate_manifest`), and at the latest
+after MANIFEST_CACHE_SECONDS. Authenticated callers get the same bytes with
+their progress spliced in, so the shared part is never re-serialized.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import CachedBody, TTLCache
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from app.core.responses import dump_json
+from app.models.level import EventLevel
+from app.models.media import MediaAsset
+from app.services.event_service import EventSnapshot
+from app.services.game_service import GameCatalog, get_catalog
+
+
+class ManifestLevel(NamedTuple):
+    level_id: int
+    level_number: int
+
+
+@dataclass(frozen=True)
+class Manifest:
+    event_id: int
+    version: str
+    etag: str
+    levels: Tuple[ManifestLevel, ...]  # enabled levels, for progress summaries
+    event_etag: str = field(repr=False)  # snapshot it was built from
+    catalog: GameCatalog = field(repr=False)
+    prefix: bytes = field(repr=False)  # the JSON object without its closing brace
+    public: CachedBody = field(repr=False)  # prefix + "progress": null
+
+    def with_progress(self, progress: Optional[dict]) -> bytes:
+        """Full body for one caller; only the progress part is encoded per request."""
+        return self.prefix + b',"progress":' + dump_json(progress) + b"}"
+
+
+def _parse(raw: Optional[str]) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _media_item(asset: MediaAsset) -> dict:
+    return {
+        "asset_id": asset.asset_id,
+        "asset_type": asset.asset_type,
+        "file_url": asset.file_url,
+        "thumbnail_url": asset.thumbnail_url,
+        "display_order": asset.display_order,
+    }
+
+
+def build_manifest(db: Session, event: EventSnapshot) -> Manifest:
+    """Query levels and media (db must be routed to the event's shard) and encode the manifest."""
+    catalog = get_catalog(db)
+    levels = db.query(EventLevel).filter(
+        EventLevel.event_id == event.event_id,
+        EventLevel.is_enabled == True
+    ).order_by(EventLevel.level_number).all()
+    media = db.query(MediaAsset).filter(
+        MediaAsset.event_id == event.event_id
+    ).order_by(MediaAsset.display_order, MediaAsset.asset_id).all()
+
+    media_by_level: Dict[Optional[int], List[dict]] = {}
+    for asset in media:
+        media_by_level.setdefault(asset.level_id, []).append(_media_item(asset))
+
+    level_entries = []
+    manifest_levels = []
+    for level in levels:
+        game = catalog.get(level.game_id)
+        if game is None:
+            continue
+        manifest_levels.append(ManifestLevel(level.level_id, level.level_number))
+        level_entries.append({
+            "level_id": level.level_id,
+            "level_number": level.level_number,
+            "is_final_level": bool(level.is_final_level),
+            "max_retries": level.max_retries,
+            "config": _parse(level.level_config),
+            "passing_criteria": _parse(level.passing_criteria),
+            "game": {
+                "game_id": game.game_id,
+                "game_name": game.game_name,
+                "game_type": game.game_type,
+                "component_name": game.component_name,
+                "config_schema": game.config_schema,
+            },
+            "media": media_by_level.get(level.level_id, []),
+        })
+
+    content = {
+        "event": {
+            "event_id": event.event_id,
+            "event_name": event.event_name,
+            "event_date": event.event_date,
+            "is_active": event.is_active,
+            "total_levels": event.total_levels,
+            "description": event.description,
+            "theme": _parse(event.theme_config),
+        },
+        "levels": level_entries,
+        "event_media": media_by_level.get(None, []),
+    }
+    encoded = dump_json(content)
+    version = make_etag(encoded)[3:-1]
+    prefix = b'{"version":"' + version.encode() + b'",' + encoded[1:-1]
+
+    return Manifest(
+        event_id=event.event_id,
+        version=version,
+        etag=f'W/"{version}"',
+        levels=tuple(manifest_levels),
+        event_etag=event.public_etag,
+        catalog=catalog,
+        prefix=prefix,
+        public=CachedBody(prefix + b',"progress":null}'),
+    )
+
+
+_manifests = TTLCache(settings.MANIFEST_CACHE_SECONDS, maxsize=settings.EVENT_CACHE_MAX_ENTRIES)
+
+
+def get_manifest(db: Session, event: EventSnapshot) -> Manifest:
+    """Cached manifest for the event, rebuilt if the event or game catalog changed."""
+    manifest = _manifests.get(event.event_id)
+    if (manifest is None
+            or manifest.event_etag != event.public_etag
+            or manifest.catalog is not get_catalog(db)):
+        manifest = build_manifest(db, event)
+        _manifests.set(event.event_id, manifest)
+    return manifest
+
+
+def invalidate_manifest(event_id: int) -> None:
+    """Drop this worker's manifest after the event's levels or media change."""
+    _manifests.delete(event_id)
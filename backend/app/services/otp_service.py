@@ -1,30 +1,51 @@
 import random
-import requests
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from app.models.otp import OTPVerification
 from app.core.config import settings
+from app.core.metrics import OTP_SENDS
+from app.core.write_executor import run_write
+from app.core.tracing import Span, start_span, traceparent, traced
+
+
+# The only environments where OTP_STUB_CODE is honoured
+OTP_STUB_ENVIRONMENTS = ("development", "test", "loadtest")
+
+
+def _otp_stub_active() -> bool:
+    """Load tests use a fixed OTP and skip SMS; ignored outside OTP_STUB_ENVIRONMENTS."""
+    return bool(settings.OTP_STUB_CODE) and settings.ENVIRONMENT in OTP_STUB_ENVIRONMENTS
 
 
 def generate_otp() -> str:
     """Generate a 6-digit OTP."""
+    if _otp_stub_active():
+        return settings.OTP_STUB_CODE
     return str(random.randint(100000, 999999))
 
 
+@traced()
 async def send_otp_sms(phone_number: str, otp_code: str) -> bool:
     """
     Send OTP via MSG91 SMS service.
     For development, just print to console.
     """
+    if _otp_stub_active():
+        OTP_SENDS.inc(result="stubbed")
+        return True
+
     if settings.ENVIRONMENT == "development" or not settings.MSG91_AUTH_KEY:
         # Development mode - just print OTP
         print(f"\n{'='*50}")
         print(f"📱 OTP for {phone_number}: {otp_code}")
         print(f"{'='*50}\n")
+        OTP_SENDS.inc(result="logged")
         return True
     
     # Production - Send via MSG91
     try:
+        import requests
+        
         url = "https://api.msg91.com/api/v5/otp"
         
         payload = {
@@ -38,42 +59,54 @@ async def send_otp_sms(phone_number: str, otp_code: str) -> bool:
             "Content-Type": "application/json"
         }
         
-        response = requests.post(url, json=payload, headers=headers)
-        return response.status_code == 200
+        with start_span("http.post msg91", {"http.method": "POST", "http.url": url}) as span:
+            if isinstance(span, Span):
+                headers["traceparent"] = traceparent(span)
+            response = requests.post(url, json=payload, headers=headers)
+            span.set_attribute("http.status_code", response.status_code)
+        sent = response.status_code == 200
+        OTP_SENDS.inc(result="sent" if sent else "failed")
+        return sent
     except Exception as e:
         print(f"Error sending OTP: {e}")
+        OTP_SENDS.inc(result="failed")
         return False
 
 
+@traced()
 def create_otp(db: Session, phone_number: str) -> tuple[OTPVerification, str]:
     """
     Create and store OTP in database.
     Returns (OTPVerification object, otp_code)
     """
-    # Invalidate any existing OTPs for this phone number
-    db.query(OTPVerification).filter(
-        OTPVerification.phone_number == phone_number,
-        OTPVerification.is_verified == False
-    ).update({"is_verified": True})
-    
     # Generate new OTP
     otp_code = generate_otp()
     expires_at = datetime.utcnow() + timedelta(minutes=settings.OTP_EXPIRY_MINUTES)
     
-    # Create OTP record
-    otp_record = OTPVerification(
-        phone_number=phone_number,
-        otp_code=otp_code,
-        expires_at=expires_at
-    )
+    def store_otp(session: Session) -> OTPVerification:
+        # Invalidate any existing OTPs for this phone number
+        session.query(OTPVerification).filter(
+            OTPVerification.phone_number == phone_number,
+            OTPVerification.is_verified == False
+        ).update({"is_verified": True})
+
+        # Create OTP record
+        otp_record = OTPVerification(
+            phone_number=phone_number,
+            otp_code=otp_code,
+            expires_at=expires_at
+        )
+        session.add(otp_record)
+        session.flush()
+        session.refresh(otp_record)
+        return otp_record
     
-    db.add(otp_record)
-    db.commit()
-    db.refresh(otp_record)
+    otp_record = run_write(db, store_otp)
     
     return otp_record, otp_code
 
 
+@traced()
 def verify_otp(db: Session, phone_number: str, otp_code: str) -> bool:
     """Verify OTP code."""
     otp_record = db.query(OTPVerification).filter(
@@ -89,7 +122,17 @@ def verify_otp(db: Session, phone_number: str, otp_code: str) -> bool:
         return False
     
     # Mark as verified
-    otp_record.is_verified = True
-    db.commit()
+    mark_otp_verified(db, otp_record.otp_id)
     
     return True
+
+
+@traced()
+def mark_otp_verified(db: Session, otp_id: int) -> None:
+    """Mark an OTP record as used."""
+    def mark_verified(session: Session) -> None:
+        session.query(OTPVerification).filter(
+            OTPVerification.otp_id == otp_id
+        ).update({"is_verified": True})
+    
+    run_write(db, mark_verified)
@@ -0,0 +1,74 @@
+from typing import Iterable, List
+
+from sqlalchemy.orm import Session
+
+from app.models.progress import UserLevelProgress
+
+
+def load_progress(db: Session, event_id: int, user_id: int) -> List[UserLevelProgress]:
+    """All of a user's progress rows in an event."""
+    return db.query(UserLevelProgress).filter(
+        UserLevelProgress.event_id == event_id,
+        UserLevelProgress.user_id == user_id
+    ).all()
+
+
+def summarize_progress(event_id: int, user_id: int, levels: Iterable, progress_records: List[UserLevelProgress]) -> dict:
+    """
+    UserProgressSummary for the given enabled levels (ordered by level_number;
+    anything with `level_id` and `level_number`) and the user's progress rows.
+    """
+    levels = list(levels)
+
+    # Create progress map
+    progress_map = {p.level_id: p for p in progress_records}
+
+    # Build level progress
+    level_progress = []
+    completed_levels = 0
+    total_time = 0
+    current_level = 1
+
+    for level in levels:
+        progress = progress_map.get(level.level_id)
+
+        if progress:
+            level_data = {
+                "level_id": level.level_id,
+                "level_number": level.level_number,
+                "status": progress.status,
+                "attempts_count": progress.attempts_count,
+                "time_taken_seconds": progress.time_taken_seconds,
+                "completed_at": progress.completion_time
+            }
+
+            if progress.status == "completed":
+                completed_levels += 1
+                if progress.time_taken_seconds:
+                    total_time += progress.time_taken_seconds
+            else:
+                current_level = level.level_number
+        else:
+            level_data = {
+                "level_id": level.level_id,
+                "level_number": level.level_number,
+                "status": "locked" if level.level_number > current_level else "not_started"
+            }
+
+        level_progress.append(level_data)
+
+    # Get first and last activity
+    first_progress = min(progress_records, key=lambda x: x.created_at) if progress_records else None
+    last_progress = max(progress_records, key=lambda x: x.updated_at or x.created_at) if progress_records else None
+
+    return {
+        "event_id": event_id,
+        "user_id": user_id,
+        "total_levels": len(levels),
+        "completed_levels": completed_levels,
+        "current_level": current_level,
+        "total_time_seconds": total_time,
+        "started_at": first_progress.created_at if first_progress else None,
+        "last_activity": (last_progress.updated_at or last_progress.created_at) if last_progress else None,
+        "level_progress": level_progress
+    }
@@ -0,0 +1,234 @@
+"""
+Bulk event provisioning.
+
+Creates many events in one request, optionally from a template event whose
+levels (game, number, configs, retries, final flag) and media references
+(the same file URLs; nothing is re-uploaded) are cloned into each of them.
+Rows are written with one multi-row INSERT per table (events, levels, media,
+stats), so provisioning a hundred events is a handful of statements and a
+single commit instead of hundreds of requests. Items are checked first;
+invalid ones are reported and skipped, the rest are created together.
+
+With sharding, events and their event_shards placements are committed
+centrally first, then each shard's levels, media and stats in a transaction
+of their own. Events of a shard that fails are deleted centrally again and
+reported as failed; the other shards' events are still created.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import place_events, remember_shard
+from app.models import Event, EventLevel, EventShard, EventStats, MediaAsset
+from app.schemas.event import EventCreate
+from app.services.event_service import as_utc, encrypt_name, invalidate_event
+
+logger = logging.getLogger(__name__)
+
+# Columns copied from the template
+LEVEL_COLUMNS = (
+    "game_id", "level_number", "level_config", "passing_criteria",
+    "max_retries", "is_final_level", "is_enabled",
+)
+MEDIA_COLUMNS = ("asset_type", "file_url", "thumbnail_url", "display_order", "asset_metadata")
+
+# Event fields an item inherits from the template unless it sets them
+TEMPLATE_FIELDS = ("total_levels", "description", "theme_config")
+
+
+class Template(NamedTuple):
+    event: Event
+    levels: list  # row mappings of event_levels
+    media: list  # row mappings of media_assets
+
+
+def load_template(db: Session, event_id: int) -> Optional[Template]:
+    """The template event with its levels and media, or None if it doesn't exist."""
+    event = db.query(Event).filter(Event.event_id == event_id, Event.deleted_at.is_(None)).first()
+    if event is None:
+        return None
+    db.info["event_id"] = event_id
+    try:
+        levels = db.execute(
+            select(EventLevel.__table__).where(EventLevel.event_id == event_id).order_by(EventLevel.level_number)
+        ).mappings().all()
+        media = db.execute(
+            select(MediaAsset.__table__).where(MediaAsset.event_id == event_id).order_by(MediaAsset.asset_id)
+        ).mappings().all()
+    finally:
+        db.info.pop("event_id")
+    return Template(event, levels, media)
+
+
+def item_error(item: EventCreate) -> Optional[str]:
+    start, end = as_utc(item.event_start_time), as_utc(item.event_end_time)
+    if start is not None and end is not None and end <= start:
+        return "event_end_time must be after event_start_time"
+    if item.total_levels < 1:
+        return "total_levels must be at least 1"
+    return None
+
+
+def _event_row(item: EventCreate, template: Optional[Template]) -> dict:
+    row = {
+        "event_name": item.event_name,
+        "event_date": item.event_date,
+        "organizer_name": item.organizer_name,
+        "organizer_contact": item.organizer_contact,
+        "baby_name_encrypted": encrypt_name(item.baby_name),
+        "qr_code_token": Event.generate_qr_token(),
+        "event_start_time": as_utc(item.event_start_time),
+        "event_end_time": as_utc(item.event_end_time),
+    }
+    for name in TEMPLATE_FIELDS:
+        if template is not None and name not in item.model_fields_set:
+            row[name] = getattr(template.event, name)
+        else:
+            row[name] = getattr(item, name)
+    return row
+
+
+def _insert_event_rows(db: Session, event_ids: List[int], template: Optional[Template], clone_media: bool) -> Dict[int, tuple]:
+    """Levels, media and stats of new events on the current bind. Returns event_id -> (levels, media)."""
+    levels = template.levels if template is not None else []
+    media = template.media if template is not None and clone_media else []
+
+    # (event_id, template level_id) -> cloned level_id
+    level_ids = {}
+    if levels:
+        level_rows = [
+            dict({name: level[name] for name in LEVEL_COLUMNS}, event_id=event_id)
+            for event_id in event_ids for level in levels
+        ]
+        # Returned rows aren't in parameter order for a multi-row insert; match on level_number
+        numbers = {level["level_id"]: level["level_number"] for level in levels}
+        inserted = {
+            (event_id, level_number): level_id
+            for level_id, event_id, level_number in db.execute(
+                insert(EventLevel).returning(EventLevel.level_id, EventLevel.event_id, EventLevel.level_number),
+                level_rows
+            )
+        }
+        level_ids = {
+            (event_id, template_level_id): inserted[(event_id, number)]
+            for event_id in event_ids for template_level_id, number in numbers.items()
+        }
+
+    if media:
+        db.execute(insert(MediaAsset), [
+            dict(
+                {name: asset[name] for name in MEDIA_COLUMNS},
+                event_id=event_id,
+                level_id=level_ids.get((event_id, asset["level_id"])),
+            )
+            for event_id in event_ids for asset in media
+        ])
+
+    # Zeroed counters, so the first start doesn't recount an empty event
+    now = datetime.utcnow()
+    db.execute(insert(EventStats), [
+        {"event_id": event_id, "total_participants": 0, "completed_all_levels": 0,
+         "correct_name_guesses": 0, "reconciled_at": now}
+        for event_id in event_ids
+    ])
+    return {event_id: (len(levels), len(media)) for event_id in event_ids}
+
+
+def _provision_shards(
+    db: Session, placements: Dict[int, int], template: Optional[Template], clone_media: bool
+) -> Tuple[Dict[int, tuple], Dict[int, str]]:
+    """
+    Write each shard's rows of committed events, one transaction per shard.
+    Events whose shard fails are deleted centrally again.
+    Returns (event_id -> (levels, media), event_id -> error).
+    """
+    shards: Dict[int, List[int]] = {}
+    for event_id, shard_id in placements.items():
+        shards.setdefault(shard_id, []).append(event_id)
+
+    counts, failed = {}, {}
+    for shard_id, event_ids in shards.items():
+        db.info["shard_id"] = shard_id
+        try:
+            counts.update(_insert_event_rows(db, event_ids, template, clone_media))
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Provisioning %d events on shard %d failed", len(event_ids), shard_id)
+            failed.update(dict.fromkeys(event_ids, f"Shard {shard_id} unavailable, event not created"))
+        finally:
+            db.info.pop("shard_id", None)
+
+    if failed:
+        try:
+            db.execute(delete(EventShard).where(EventShard.event_id.in_(failed)))
+            db.execute(delete(Event).where(Event.event_id.in_(failed)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return counts, failed
+
+
+def provision_events(
+    db: Session,
+    items: Sequence[EventCreate],
+    template: Optional[Template] = None,
+    clone_media: bool = True,
+) -> List[dict]:
+    """
+    Create the valid items in one transaction (one per database with sharding).
+    Returns one result per item, in order.
+    """
+    results: List[Optional[dict]] = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        error = item_error(item)
+        if error:
+            results[index] = {"index": index, "status": "invalid", "detail": error}
+        else:
+            valid.append(index)
+    if not valid:
+        return results
+
+    event_rows = [_event_row(items[index], template) for index in valid]
+    try:
+        # One multi-row insert; rows are matched back by their unique QR token
+        by_token = dict(db.execute(
+            insert(Event).returning(Event.qr_code_token, Event.event_id), event_rows
+        ).all())
+        event_ids = [by_token[row["qr_code_token"]] for row in event_rows]
+
+        placements = place_events(db, event_ids)
+        counts = {} if placements else _insert_event_rows(db, event_ids, template, clone_media)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    failed = {}
+    if placements:
+        counts, failed = _provision_shards(db, placements, template, clone_media)
+        for event_id, shard_id in placements.items():
+            if event_id not in failed:
+                remember_shard(event_id, shard_id)
+
+    for index, event_id, row in zip(valid, event_ids, event_rows):
+        # Drop any negative entry for the new id / token
+        invalidate_event(event_id, row["qr_code_token"])
+        if event_id in failed:
+            results[index] = {"index": index, "status": "failed", "detail": failed[event_id]}
+            continue
+        levels, media = counts[event_id]
+        results[index] = {
+            "index": index,
+            "status": "created",
+            "event_id": event_id,
+            "qr_code_token": row["qr_code_token"],
+            "levels": levels,
+            "media": media,
+        }
+    return results
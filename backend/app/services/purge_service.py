@@ -0,0 +1,216 @@
+"""
+Background purge of deleted events.
+
+Deleting an event only sets `events.deleted_at` (every lookup then treats it
+as gone) and queues the event here. A single purger thread waits
+EVENT_PURGE_DELAY_SECONDS, so requests already in flight for the event can
+finish, then deletes its progress, media, stats and levels
+EVENT_PURGE_CHUNK_SIZE rows per transaction through `run_write`, pausing
+EVENT_PURGE_PAUSE_SECONDS between chunks so live writes of other events get
+the write lock in between. The event row itself goes last.
+
+Progress is kept per event (see `purge_status`). Events still marked deleted
+when a worker starts are queued again by `resume_purges`.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.tracing import propagate
+from app.core.write_executor import run_write
+from app.database import RoutingSession
+from app.models import Event, EventLevel, EventStats, MediaAsset, UserLevelProgress
+
+logger = logging.getLogger(__name__)
+
+# Children first, so no single delete cascades into a large table
+PURGE_ORDER = [UserLevelProgress.__table__, MediaAsset.__table__, EventStats.__table__, EventLevel.__table__]
+
+SessionFactory = Callable[[], Session]
+
+
+class PurgeStatus:
+    """Progress of one event's purge."""
+
+    def __init__(self, event_id: int, deleted_at: Optional[datetime] = None):
+        self.event_id = event_id
+        self.deleted_at = deleted_at
+        self.state = "queued"  # queued, running, done, failed
+        self.rows_total: Dict[str, int] = {}
+        self.rows_deleted: Dict[str, int] = {}
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "event_id": self.event_id,
+            "state": self.state,
+            "deleted_at": self.deleted_at,
+            "rows_total": dict(self.rows_total),
+            "rows_deleted": dict(self.rows_deleted),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+_statuses = TTLCache(settings.EVENT_PURGE_STATUS_SECONDS)
+
+
+def purge_status(event_id: int) -> Optional[PurgeStatus]:
+    """Progress of a purge queued or run by this worker."""
+    return _statuses.get(event_id)
+
+
+def remaining_rows(db: Session, event_id: int) -> Dict[str, int]:
+    """Rows still to purge per table (db routed to the event's shard)."""
+    return {
+        table.name: db.execute(
+            select(func.count()).select_from(table).where(table.c.event_id == event_id)
+        ).scalar()
+        for table in PURGE_ORDER
+    }
+
+
+def _delete_chunk(table, event_id: int, size: int) -> Callable[[Session], int]:
+    pk = list(table.primary_key.columns)[0]
+
+    def unit(session: Session) -> int:
+        ids = select(pk).where(table.c.event_id == event_id).limit(size).scalar_subquery()
+        return session.execute(delete(table).where(pk.in_(ids))).rowcount
+
+    return unit
+
+
+def purge_event(event_id: int, session_factory: SessionFactory, status: Optional[PurgeStatus] = None) -> PurgeStatus:
+    """Delete a soft-deleted event's rows in chunks, then the event itself."""
+    status = status or PurgeStatus(event_id)
+    _statuses.set(event_id, status)
+    status.state = "running"
+    status.started_at = datetime.utcnow()
+
+    db = session_factory()
+    db.info["event_id"] = event_id
+    try:
+        event = db.get(Event, event_id)
+        if event is None or event.deleted_at is None:
+            # Already purged, or restored in the meantime
+            status.state = "done"
+            return status
+        status.deleted_at = event.deleted_at
+        status.rows_total = remaining_rows(db, event_id)
+        db.rollback()
+
+        for table in PURGE_ORDER:
+            status.rows_deleted[table.name] = 0
+            while True:
+                deleted = run_write(db, _delete_chunk(table, event_id, settings.EVENT_PURGE_CHUNK_SIZE))
+                status.rows_deleted[table.name] += deleted
+                if deleted < settings.EVENT_PURGE_CHUNK_SIZE:
+                    break
+                time.sleep(settings.EVENT_PURGE_PAUSE_SECONDS)
+
+        events = Event.__table__
+        run_write(db, lambda session: session.execute(
+            delete(events).where(events.c.event_id == event_id, events.c.deleted_at.isnot(None))
+        ))
+        status.state = "done"
+        logger.info("Purged event %s: %s", event_id, status.rows_deleted)
+    except Exception as e:
+        status.state = "failed"
+        status.error = str(e)
+        logger.exception("Purge of event %s failed", event_id)
+    finally:
+        status.finished_at = datetime.utcnow()
+        db.close()
+    return status
+
+
+class EventPurger:
+    """One background thread purging queued events one at a time."""
+
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._cleared = threading.Condition()
+        self._generation = 0  # bumped by clear(); older queued purges are skipped
+
+    def submit(self, event_id: int, session_factory: SessionFactory, deleted_at: Optional[datetime] = None) -> PurgeStatus:
+        status = PurgeStatus(event_id, deleted_at)
+        _statuses.set(event_id, status)
+        # The purge joins the trace of the request that deleted the event
+        self._queue.put((
+            self._generation, time.monotonic() + settings.EVENT_PURGE_DELAY_SECONDS,
+            propagate(purge_event, "event.purge"), event_id, session_factory, status
+        ))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-purger", daemon=True)
+                self._thread.start()
+        return status
+
+    def clear(self) -> None:
+        """Drop purges that haven't started (tests)."""
+        with self._cleared:
+            self._generation += 1
+            self._cleared.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            generation, not_before, task, event_id, session_factory, status = self._queue.get()
+            with self._cleared:
+                self._cleared.wait_for(
+                    lambda: generation != self._generation, timeout=max(not_before - time.monotonic(), 0)
+                )
+                if generation != self._generation:
+                    continue
+            task(event_id, session_factory, status)
+
+
+purger = EventPurger()
+
+
+def sessions_like(db: Session) -> SessionFactory:
+    """Session factory bound like `db`, for work that outlives the request."""
+    return sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=db.get_bind())
+
+
+def app_sessions(app) -> SessionFactory:
+    """Session factory bound like the app's get_db (dependency overrides included)."""
+    from app.database import get_db
+
+    sessions = app.dependency_overrides.get(get_db, get_db)()
+    try:
+        return sessions_like(next(sessions))
+    finally:
+        sessions.close()
+
+
+def schedule_purge(db: Session, event_id: int, deleted_at: Optional[datetime] = None) -> PurgeStatus:
+    return purger.submit(event_id, sessions_like(db), deleted_at)
+
+
+def resume_purges(app) -> None:
+    """Queue events left soft-deleted by a previous process (through the app's get_db)."""
+    from app.database import get_db
+
+    sessions = app.dependency_overrides.get(get_db, get_db)()
+    try:
+        db = next(sessions)
+        for event_id, deleted_at in db.query(Event.event_id, Event.deleted_at).filter(Event.deleted_at.isnot(None)):
+            schedule_purge(db, event_id, deleted_at)
+    except Exception as e:
+        # Not migrated yet, or the database is down: the next start picks them up
+        logger.warning("Event purges not resumed: %s", e)
+    finally:
+        sessions.close()
@@ -0,0 +1,214 @@
+"""
+Event dashboard counters.
+
+`event_stats` holds one row per event with the number of participants,
+players who completed the final level and correct name guesses. The
+progress endpoints bump the counters inside the same unit of work as the
+progress row they write, so reading them is a primary-key lookup.
+
+A row is created by a full recount from `user_level_progress` on the first
+write that needs it (reads count on the fly until then). `reconcile_all_event_stats` recounts every event and is
+run every EVENT_STATS_RECONCILE_SECONDS to repair any drift.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tracing import start_trace
+from app.models.event import Event
+from app.models.level import EventLevel
+from app.models.progress import UserLevelProgress
+from app.models.stats import EventStats
+
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS = ("total_participants", "completed_all_levels", "correct_name_guesses")
+
+
+def is_correct_guess(result_data: Optional[str]) -> Optional[bool]:
+    """The `is_correct` flag of a final-level result, or None if it has none."""
+    if not result_data:
+        return None
+    try:
+        return bool(json.loads(result_data).get("is_correct", False))
+    except (ValueError, AttributeError):
+        return None
+
+
+def compute_event_stats(db: Session, event_id: int) -> Dict[str, int]:
+    """Recount an event's stats from its progress rows."""
+    participants = db.query(
+        func.count(UserLevelProgress.user_id.distinct())
+    ).filter(
+        UserLevelProgress.event_id == event_id
+    ).scalar()
+
+    final_rows = db.query(
+        UserLevelProgress.user_id,
+        UserLevelProgress.result_data
+    ).join(
+        EventLevel, EventLevel.level_id == UserLevelProgress.level_id
+    ).filter(
+        UserLevelProgress.event_id == event_id,
+        UserLevelProgress.status == "completed",
+        EventLevel.is_final_level == True
+    ).all()
+
+    return {
+        "total_participants": participants or 0,
+        "completed_all_levels": len({user_id for user_id, _ in final_rows}),
+        "correct_name_guesses": len({
+            user_id for user_id, result_data in final_rows if is_correct_guess(result_data)
+        }),
+    }
+
+
+def reconcile_event_stats(db: Session, event_id: int) -> EventStats:
+    """
+    Overwrite an event's counters with a full recount (not committed).
+    The row is written before counting: that takes its row lock on Postgres
+    and the write lock on SQLite, so no `_bump` can commit between the
+    recount and the overwrite and be lost.
+    """
+    table = EventStats.__table__
+    db.execute(update(table).where(table.c.event_id == event_id).values(reconciled_at=datetime.utcnow()))
+    counts = compute_event_stats(db, event_id)
+    stats = db.get(EventStats, event_id)
+    if stats is None:
+        stats = EventStats(event_id=event_id)
+        db.add(stats)
+    for name, value in counts.items():
+        setattr(stats, name, value)
+    stats.reconciled_at = datetime.utcnow()
+    db.flush()
+    return stats
+
+
+def _bump(db: Session, event_id: int, **deltas: int) -> None:
+    """Add to an event's counters, creating the row by recount if it is missing."""
+    db.flush()
+    table = EventStats.__table__
+    result = db.execute(
+        update(table)
+        .where(table.c.event_id == event_id)
+        .values({name: table.c[name] + delta for name, delta in deltas.items()})
+    )
+    if result.rowcount:
+        return
+    # First write for this event: the recount already includes the flushed change
+    try:
+        with db.begin_nested():
+            reconcile_event_stats(db, event_id)
+    except IntegrityError:
+        # Another transaction created the row first; add on top of its counts
+        _bump(db, event_id, **deltas)
+
+
+def count_start(db: Session, progress: UserLevelProgress) -> None:
+    """Count a participant when `progress` (already flushed) is their first row in the event."""
+    # A user has a handful of rows; `+ 0` keeps SQLite on the user_id index
+    # instead of walking the event's whole range of ix_..._event_status_user
+    has_earlier = db.query(
+        db.query(UserLevelProgress.progress_id).filter(
+            UserLevelProgress.user_id == progress.user_id,
+            UserLevelProgress.event_id + 0 == progress.event_id,
+            UserLevelProgress.progress_id != progress.progress_id
+        ).exists()
+    ).scalar()
+    if not has_earlier:
+        _bump(db, progress.event_id, total_participants=1)
+
+
+def count_completion(db: Session, progress: UserLevelProgress, previous_status: Optional[str]) -> None:
+    """Update the final-level counters after `progress` was completed."""
+    if progress.status != "completed" or previous_status == "completed":
+        return
+    is_final = db.query(EventLevel.is_final_level).filter(
+        EventLevel.level_id == progress.level_id
+    ).scalar()
+    if not is_final:
+        return
+
+    earlier = [result_data for (result_data,) in db.query(UserLevelProgress.result_data).filter(
+        UserLevelProgress.user_id == progress.user_id,
+        UserLevelProgress.level_id == progress.level_id,
+        UserLevelProgress.status == "completed",
+        UserLevelProgress.progress_id != progress.progress_id
+    ).all()]
+
+    deltas = {}
+    if not earlier:
+        deltas["completed_all_levels"] = 1
+    if is_correct_guess(progress.result_data) and not any(is_correct_guess(r) for r in earlier):
+        deltas["correct_name_guesses"] = 1
+    if deltas:
+        _bump(db, progress.event_id, **deltas)
+
+
+def get_event_stats(db: Session, event_id: int) -> Dict[str, int]:
+    """
+    Current counters for an event (db routed to its shard). Read-only: if the
+    row is missing they are counted, and the next write or reconcile creates it.
+    """
+    stats = db.get(EventStats, event_id)
+    if stats is None:
+        return compute_event_stats(db, event_id)
+    return {name: getattr(stats, name) for name in STAT_FIELDS}
+
+
+def reconcile_all_event_stats(session_factory: Callable[[], Session] = None) -> int:
+    """Recount every event, one transaction per event. Returns the number of events."""
+    if session_factory is None:
+        from app.database import SessionLocal
+        session_factory = SessionLocal
+
+    db = session_factory()
+    try:
+        event_ids = [event_id for (event_id,) in db.query(Event.event_id).filter(Event.deleted_at.is_(None)).all()]
+    finally:
+        db.close()
+
+    for event_id in event_ids:
+        db = session_factory()
+        db.info["event_id"] = event_id
+        try:
+            reconcile_event_stats(db, event_id)
+            db.commit()
+        finally:
+            db.close()
+    return len(event_ids)
+
+
+_reconciler_started = False
+
+
+def start_stats_reconciler() -> None:
+    """Recount all events every EVENT_STATS_RECONCILE_SECONDS in a background thread."""
+    global _reconciler_started
+    if settings.EVENT_STATS_RECONCILE_SECONDS <= 0 or _reconciler_started:
+        return
+    _reconciler_started = True
+
+    def reconcile_loop():
+        while True:
+            time.sleep(settings.EVENT_STATS_RECONCILE_SECONDS)
+            try:
+                with start_trace("event_stats.reconcile"):
+                    reconcile_all_event_stats()
+            except Exception:
+                logger.exception("Event stats reconciliation failed")
+
+    threading.Thread(target=reconcile_loop, name="event-stats-reconciler", daemon=True).start()
+
+
+if __name__ == "__main__":
+    # python -m app.services.stats_service: recount every event now (e.g. after migrating)
+    print(f"✅ Recounted stats for {reconcile_all_event_stats()} events")
@@ -0,0 +1,170 @@
+"""
+Tooling for per-event sharding.
+
+Event-scoped tables (see EVENT_SCOPED_TABLES in app/database.py) live on the
+shard chosen for their event; users, games, events and the event_shards
+directory stay on the central database.
+
+Usage:
+    python -m app.sharding init                      # create event-scoped tables on every shard
+    python -m app.sharding where <event_id>          # show an event's shard
+    python -m app.sharding move <event_id> <shard>   # move an event's rows to another shard
+
+Move events while they are inactive: other workers cache placements and
+event data, and level/progress/media ids are reassigned on the target shard
+(this worker's caches are dropped). An event with games still in progress is
+refused, since their clients address the rows by id.
+"""
+import sys
+from typing import Dict
+
+from sqlalchemy import delete, func, insert, select
+
+from app.database import (
+    Base, EVENT_SCOPED_TABLES, engine, shard_engines, sharding_enabled,
+    shard_for_event, remember_shard
+)
+from app.models import EventLevel, MediaAsset, UserLevelProgress, EventShard, EventStats
+
+# Copy order for moves: parents first so level ids can be remapped in children
+_MOVE_ORDER = [EventLevel.__table__, MediaAsset.__table__, UserLevelProgress.__table__]
+
+# Delete order for purges: children first. event_stats is copied as is (keyed by event_id).
+_PURGE_ORDER = [EventStats.__table__] + list(reversed(_MOVE_ORDER))
+
+
+def _scoped_tables():
+    return [table for name, table in Base.metadata.tables.items() if name in EVENT_SCOPED_TABLES]
+
+
+def init_shards() -> None:
+    """Create the event-scoped tables on every shard."""
+    for shard in shard_engines:
+        Base.metadata.create_all(bind=shard, tables=_scoped_tables())
+
+
+def purge_event_rows(event_id: int, shard_id: int = None, central=None) -> None:
+    """Delete an event's rows from its shard (central cascades don't reach shards)."""
+    if shard_id is None:
+        shard_id = shard_for_event(event_id, central=central)
+    with shard_engines[shard_id].begin() as conn:
+        for table in _PURGE_ORDER:
+            conn.execute(delete(table).where(table.c.event_id == event_id))
+
+
+def _games_in_progress(event_id: int, shard) -> int:
+    table = UserLevelProgress.__table__
+    with shard.connect() as conn:
+        return conn.execute(
+            select(func.count()).select_from(table)
+            .where(table.c.event_id == event_id, table.c.status == "in_progress")
+        ).scalar()
+
+
+def _copy_event_rows(event_id: int, source, target) -> Dict[str, int]:
+    """Copy an event's rows, giving them new primary keys on the target shard."""
+    copied = {}
+    level_ids: Dict[int, int] = {}
+
+    with source.connect() as src, target.begin() as dst:
+        for table in _MOVE_ORDER:
+            pk = list(table.primary_key.columns)[0]
+            rows = src.execute(select(table).where(table.c.event_id == event_id)).mappings().all()
+
+            for row in rows:
+                values = dict(row)
+                old_id = values.pop(pk.name)
+                if table is not EventLevel.__table__ and values.get("level_id") is not None:
+                    values["level_id"] = level_ids.get(values["level_id"], values["level_id"])
+                new_id = dst.execute(insert(table).values(**values)).inserted_primary_key[0]
+                if table is EventLevel.__table__:
+                    level_ids[old_id] = new_id
+
+            copied[table.name] = len(rows)
+
+        stats = EventStats.__table__
+        rows = src.execute(select(stats).where(stats.c.event_id == event_id)).mappings().all()
+        if rows:
+            dst.execute(insert(stats), [dict(row) for row in rows])
+        copied[stats.name] = len(rows)
+    return copied
+
+
+def _forget_cached(event_id: int) -> None:
+    """Drop this worker's cached event data, which holds the old level ids."""
+    from app.api.leaderboard import invalidate_leaderboard
+    from app.services.event_service import invalidate_event
+    from app.services.funnel_service import drop_funnel
+    from app.services.manifest_service import invalidate_manifest
+
+    invalidate_event(event_id)
+    invalidate_manifest(event_id)
+    invalidate_leaderboard(event_id, final=True)
+    drop_funnel(event_id)
+
+
+def move_event(event_id: int, target_shard: int, central=None) -> Dict[str, int]:
+    """
+    Move an event's rows to another shard.
+    Copies to the target, repoints the directory, then deletes from the source.
+    Safe to re-run after a failure: leftovers on the target are cleared first.
+    Refused while the event has games in progress (their progress ids would change).
+    """
+    if not sharding_enabled():
+        raise RuntimeError("Sharding is not enabled (set SHARD_DATABASE_URLS)")
+    if not 0 <= target_shard < len(shard_engines):
+        raise ValueError(f"Shard {target_shard} does not exist")
+
+    central = central or engine
+    source_shard = shard_for_event(event_id, central=central)
+    if source_shard == target_shard:
+        return {}
+    in_progress = _games_in_progress(event_id, shard_engines[source_shard])
+    if in_progress:
+        raise RuntimeError(f"Event {event_id} has {in_progress} games in progress; move it once they finish")
+
+    # The directory doesn't point at the target yet, so anything there is a leftover
+    purge_event_rows(event_id, target_shard)
+    copied = _copy_event_rows(event_id, shard_engines[source_shard], shard_engines[target_shard])
+
+    table = EventShard.__table__
+    with central.begin() as conn:
+        conn.execute(delete(table).where(table.c.event_id == event_id))
+        conn.execute(insert(table).values(event_id=event_id, shard_id=target_shard))
+    remember_shard(event_id, target_shard)
+    _forget_cached(event_id)
+
+    purge_event_rows(event_id, source_shard)
+    return copied
+
+
+def main(argv):
+    if not argv or argv[0] not in ("init", "where", "move"):
+        print(__doc__)
+        return 1
+    if not sharding_enabled():
+        print("❌ Sharding is not enabled (set SHARD_DATABASE_URLS)")
+        return 1
+
+    command = argv[0]
+    if command == "init":
+        init_shards()
+        print(f"✅ Initialized {len(shard_engines)} shards")
+    elif command == "where":
+        event_id = int(argv[1])
+        print(f"Event {event_id} is on shard {shard_for_event(event_id)}")
+    elif command == "move":
+        event_id, target = int(argv[1]), int(argv[2])
+        try:
+            copied = move_event(event_id, target)
+        except (RuntimeError, ValueError) as e:
+            print(f"❌ {e}")
+            return 1
+        for table_name, count in copied.items():
+            print(f"  ✓ {table_name}: {count} rows")
+        print(f"✅ Event {event_id} is now on shard {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
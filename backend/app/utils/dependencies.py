@@ -1,13 +1,18 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.security import decode_access_token
 from app.models.user import User
+from app.core.tracing import traced
+from app.services.event_service import EventSnapshot, get_event
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
+@traced("dependency.get_current_user")
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -38,3 +43,32 @@ def get_current_user(
         )
     
     return user
+
+
+def get_optional_user_id(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[int]:
+    """User id from the JWT when one is sent (no DB lookup); None for anonymous calls."""
+    if credentials is None:
+        return None
+    
+    payload = decode_access_token(credentials.credentials)
+    if payload is None or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return int(payload["sub"])
+
+
+def require_event(db: Session, event_id: int) -> EventSnapshot:
+    """Cached snapshot of the event; 404 if it doesn't exist or was deleted."""
+    event = get_event(db, event_id)
+    if event is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    return event
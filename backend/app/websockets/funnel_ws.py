@@ -0,0 +1,62 @@
+"""
+Push channel for the organizer funnel dashboard.
+
+Clients connect to /ws/events/{event_id}/funnel?token=<access token> and get
+the funnel snapshot on connect and again whenever it changes, checked every
+FUNNEL_PUSH_INTERVAL_SECONDS. Bursts of completions are coalesced into one
+message, and an idle dashboard costs a version comparison per interval.
+Each database read uses its own short-lived session: a socket kept open for
+hours must not hold a pooled connection or a read snapshot, which on SQLite
+in WAL mode would stop checkpoints.
+"""
+import asyncio
+from typing import Any, Callable
+
+from fastapi import APIRouter, WebSocket, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.services.event_service import get_event
+from app.services.funnel_service import get_funnel, tracked_funnel
+from app.services.purge_service import SessionFactory, app_sessions
+
+router = APIRouter()
+
+
+def _read(sessions: SessionFactory, event_id: int, read: Callable[[Session, int], Any]):
+    """Run one read on a short-lived session, so an open socket holds no connection or snapshot."""
+    db = sessions()
+    db.info["event_id"] = event_id
+    try:
+        return read(db, event_id)
+    finally:
+        db.close()
+
+
+@router.websocket("/ws/events/{event_id}/funnel")
+async def funnel_updates(websocket: WebSocket, event_id: int, token: str = ""):
+    payload = decode_access_token(token) if token else None
+    if payload is None or payload.get("sub") is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    sessions = app_sessions(websocket.app)
+    if not await run_in_threadpool(_read, sessions, event_id, get_event):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Event not found")
+        return
+
+    await websocket.accept()
+    sent, sent_version = None, None
+    while True:
+        funnel = tracked_funnel(event_id) or await run_in_threadpool(_read, sessions, event_id, get_funnel)
+        if funnel is not sent or funnel.version != sent_version:
+            sent, sent_version = funnel, funnel.version
+            await websocket.send_text(funnel.body().decode())
+        try:
+            # Waiting on the socket (rather than sleeping) notices disconnects right away
+            message = await asyncio.wait_for(websocket.receive(), settings.FUNNEL_PUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            continue
+        if message["type"] == "websocket.disconnect":
+            return
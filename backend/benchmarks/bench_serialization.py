@@ -0,0 +1,135 @@
+"""
+Serialization cost of one leaderboard page, old path vs new.
+
+  validated-twice+json     LeaderboardEntry per row, LeaderboardResponse,
+                           response_model validation, jsonable_encoder +
+                           json.dumps (the stdlib JSONResponse path)
+  validated-twice+pydantic same models, response_model validation and
+                           Pydantic's dump-to-bytes fast path
+  dicts+orjson             plain dicts encoded once by ORJSONResponse
+                           (what the endpoint does now)
+
+Only serialization is measured; the rows are built up front as the
+leaderboard query returns them.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --entries 200 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core.responses import ORJSONResponse  # noqa: E402
+from app.schemas.leaderboard import LeaderboardEntry, LeaderboardResponse  # noqa: E402
+
+BADGES = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+
+def make_rows(entries: int):
+    """(user_id, levels, total_time, last_completed, name, correct_guess) like the query output."""
+    start = datetime(2024, 6, 1, 18, 0, 0)
+    return [
+        (1000 + i, 5 - i % 3, 120 + i * 7, start + timedelta(seconds=i * 13), f"Guest {i}", i % 2 == 0)
+        for i in range(entries)
+    ]
+
+
+def validated_twice(rows, adapter):
+    leaderboard = [
+        LeaderboardEntry(
+            rank=rank, user_id=user_id, name=name, levels_completed=levels,
+            total_time_seconds=total_time, all_levels_completed=levels == 5,
+            correct_name_guess=guess, completed_at=last, badge=BADGES.get(rank)
+        )
+        for rank, (user_id, levels, total_time, last, name, guess) in enumerate(rows, start=1)
+    ]
+    response = LeaderboardResponse(
+        event_id=1, total_participants=len(rows), leaderboard=leaderboard, current_user_rank=1
+    )
+    # response_model validation of the returned object
+    return adapter.validate_python(response, from_attributes=True)
+
+
+def old_stdlib(rows, adapter):
+    value = validated_twice(rows, adapter)
+    return json.dumps(
+        jsonable_encoder(adapter.dump_python(value)), ensure_ascii=False,
+        allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def old_pydantic(rows, adapter):
+    return adapter.dump_json(validated_twice(rows, adapter))
+
+
+def new_orjson(rows, adapter):
+    leaderboard = [
+        {
+            "rank": rank, "user_id": user_id, "name": name, "levels_completed": levels,
+            "total_time_seconds": total_time, "all_levels_completed": levels == 5,
+            "correct_name_guess": guess, "completed_at": last, "badge": BADGES.get(rank),
+        }
+        for rank, (user_id, levels, total_time, last, name, guess) in enumerate(rows, start=1)
+    ]
+    return ORJSONResponse({
+        "event_id": 1, "total_participants": len(rows), "leaderboard": leaderboard, "current_user_rank": 1,
+    }).body
+
+
+PATHS = {
+    "validated-twice+json": old_stdlib,
+    "validated-twice+pydantic": old_pydantic,
+    "dicts+orjson": new_orjson,
+}
+
+
+def measure(fn, rows, adapter, number: int, repeat: int) -> float:
+    """Median microseconds per page."""
+    runs = timeit.repeat(lambda: fn(rows, adapter), number=number, repeat=repeat)
+    return statistics.median(runs) / number * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=50, help="rows per page (default: the API limit, 50)")
+    parser.add_argument("--number", type=int, default=200, help="pages per timing run")
+    parser.add_argument("--repeat", type=int, default=7, help="timing runs per path")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    rows = make_rows(args.entries)
+    adapter = TypeAdapter(LeaderboardResponse)
+
+    # Every path must produce the same document
+    expected = json.loads(old_stdlib(rows, adapter))
+    for name, fn in PATHS.items():
+        assert json.loads(fn(rows, adapter)) == expected, f"{name} output differs"
+
+    results = {name: measure(fn, rows, adapter, args.number, args.repeat) for name, fn in PATHS.items()}
+    baseline = results["validated-twice+json"]
+
+    if args.json:
+        print(json.dumps({
+            "entries": args.entries,
+            "us_per_page": {k: round(v, 1) for k, v in results.items()},
+        }, indent=2))
+        return
+
+    print(f"Leaderboard page of {args.entries} entries")
+    for name, us in results.items():
+        print(f"  {name:<26} {us:9.1f} us/page   {baseline / us:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
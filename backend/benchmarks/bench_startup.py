@@ -0,0 +1,98 @@
+"""
+Cold-start benchmark: time from process launch to the first served request.
+
+Each run starts a fresh `uvicorn app.main:app` process against a migrated
+SQLite database and polls /health until it answers. Also reports the bare
+`import app.main` time in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 5 --json   # machine-readable
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(env) -> float:
+    """Seconds for a fresh interpreter to import the app."""
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_request(env, timeout: float = 30.0) -> float:
+    """Seconds from launching uvicorn to the first 200 from /health."""
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("server did not answer /health in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=BACKEND_DIR, env=env, capture_output=True, check=True
+        )
+
+        imports = [measure_import(env) for _ in range(args.runs)]
+        first_requests = [measure_first_request(env) for _ in range(args.runs)]
+
+    results = {
+        "runs": args.runs,
+        "import_ms": {"median": statistics.median(imports) * 1000, "min": min(imports) * 1000},
+        "first_request_ms": {
+            "median": statistics.median(first_requests) * 1000, "min": min(first_requests) * 1000
+        },
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"import app.main      median {results['import_ms']['median']:8.1f} ms"
+              f"   min {results['import_ms']['min']:8.1f} ms")
+        print(f"first served request median {results['first_request_ms']['median']:8.1f} ms"
+              f"   min {results['first_request_ms']['min']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Write-contention benchmark for the SQLite engine profile.
+
+Simulates many guests starting and completing levels at the same time:
+each worker thread runs short read-then-write transactions against its
+own connection, like start_level/complete_level do.
+
+Compares a plain create_engine() (rollback journal, synchronous=FULL,
+no busy timeout) against build_engine() from app/database.py.
+
+Usage:
+    python benchmarks/bench_write_contention.py --threads 32 --ops 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, insert, select, func, update  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app.database import Base, build_engine  # noqa: E402
+from app.models import User, Event, EventLevel, Game, UserLevelProgress  # noqa: E402
+
+
+def setup_schema(db_engine):
+    """Create tables and one event with a single level."""
+    Base.metadata.create_all(bind=db_engine)
+    with db_engine.begin() as conn:
+        conn.execute(insert(Game.__table__), [{
+            "game_id": 1, "game_name": "Bench", "game_type": "BENCH",
+            "component_name": "Bench", "is_active": True
+        }])
+        conn.execute(insert(Event.__table__), [{
+            "event_id": 1, "event_name": "Bench", "event_date": datetime.utcnow(),
+            "organizer_name": "Bench", "organizer_contact": "+910000000000",
+            "baby_name_encrypted": "QmVuY2g=", "qr_code_token": "bench", "total_levels": 1,
+            "is_active": True
+        }])
+        conn.execute(insert(EventLevel.__table__), [{
+            "level_id": 1, "event_id": 1, "game_id": 1, "level_number": 1,
+            "max_retries": -1, "is_final_level": False, "is_enabled": True
+        }])
+
+
+def worker(db_engine, thread_idx, ops, results):
+    """Run start/complete transactions for one simulated guest per op."""
+    ok = 0
+    locked = 0
+    for i in range(ops):
+        user_id = thread_idx * ops + i + 1
+        try:
+            with db_engine.begin() as conn:
+                conn.execute(insert(User.__table__), [{"user_id": user_id, "name": f"Guest {user_id}"}])
+                conn.execute(select(func.count()).select_from(UserLevelProgress.__table__).where(
+                    UserLevelProgress.event_id == 1
+                ))
+                result = conn.execute(insert(UserLevelProgress.__table__), [{
+                    "user_id": user_id, "event_id": 1, "level_id": 1,
+                    "status": "in_progress", "attempts_count": 1, "start_time": datetime.utcnow()
+                }])
+            progress_id = result.inserted_primary_key[0]
+            with db_engine.begin() as conn:
+                conn.execute(update(UserLevelProgress.__table__).where(
+                    UserLevelProgress.progress_id == progress_id
+                ).values(status="completed", is_passed=True, time_taken_seconds=30))
+            ok += 1
+        except OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                locked += 1
+            else:
+                raise
+    results[thread_idx] = (ok, locked)
+
+
+def run(label, db_engine, threads, ops):
+    setup_schema(db_engine)
+    results = {}
+    pool = [threading.Thread(target=worker, args=(db_engine, t, ops, results)) for t in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    ok = sum(r[0] for r in results.values())
+    locked = sum(r[1] for r in results.values())
+    print(f"{label:<10} {ok:>8} {locked:>8} {elapsed:>9.2f}s {ok / elapsed:>10.1f}")
+    db_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=100, help="start+complete pairs per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        default_url = f"sqlite:///{os.path.join(tmp, 'default.db')}"
+        tuned_url = f"sqlite:///{os.path.join(tmp, 'tuned.db')}"
+
+        print(f"{args.threads} threads x {args.ops} start/complete pairs")
+        print(f"{'profile':<10} {'ok':>8} {'locked':>8} {'elapsed':>10} {'pairs/s':>10}")
+        run("default", create_engine(
+            default_url,
+            connect_args={"check_same_thread": False, "timeout": 0},
+            pool_size=args.threads
+        ), args.threads, args.ops)
+        run("tuned", build_engine(tuned_url, pool_size=args.threads), args.threads, args.ops)
+
+
+if __name__ == "__main__":
+    main()
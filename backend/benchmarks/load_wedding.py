@@ -0,0 +1,372 @@
+"""
+Wedding-scale load test: N guests playing one event end to end.
+
+Each guest arrives according to the chosen curve, then:
+  scan QR (GET /events/qr/{token}) -> send + verify OTP -> list levels ->
+  for each level: start, autosave a few times, complete (optionally failing
+  and retrying) -> while playing, poll the leaderboard on a timer.
+
+By default the app is started locally (uvicorn) against a fresh migrated
+SQLite database with one seeded event, and SMS is stubbed via OTP_STUB_CODE.
+Pass --url and --qr-token to target an already running server instead
+(it must have OTP_STUB_CODE set to --otp).
+
+Arrival curves:
+  spike    everyone scans within --spike-seconds (the "QR on the big screen" moment)
+  ramp     arrival rate grows linearly over --duration
+  poisson  random arrivals at an average of guests / --duration per second
+  steady   evenly spaced over --duration
+
+Usage:
+    python benchmarks/load_wedding.py --guests 300 --curve spike
+    python benchmarks/load_wedding.py --guests 500 --curve poisson --duration 60 --json > run.json
+    python benchmarks/load_wedding.py --env WRITE_QUEUE_ENABLED=True --output queue.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# --- Arrival curves -------------------------------------------------------
+
+def arrival_offsets(curve: str, guests: int, duration: float, spike_seconds: float, rng: random.Random) -> List[float]:
+    """Seconds after the start at which each guest arrives."""
+    if curve == "spike":
+        return sorted(rng.uniform(0, spike_seconds) for _ in range(guests))
+    if curve == "ramp":
+        # Rate grows linearly, so cumulative arrivals grow with t^2
+        return [duration * ((i + 1) / guests) ** 0.5 for i in range(guests)]
+    if curve == "poisson":
+        rate = guests / duration
+        offsets, t = [], 0.0
+        for _ in range(guests):
+            t += rng.expovariate(rate)
+            offsets.append(t)
+        return offsets
+    if curve == "steady":
+        return [duration * i / guests for i in range(guests)]
+    raise ValueError(f"Unknown arrival curve: {curve}")
+
+
+# --- Measurements ---------------------------------------------------------
+
+class Recorder:
+    """Latency and status of every request, keyed by endpoint template."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str,
+                      expect=(200, 201), **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        self.statuses[endpoint][status] += 1
+        if response is None or response.status_code not in expect:
+            self.errors[endpoint] += 1
+            return None
+        return response
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    # pct * n / 100 rather than pct / 100 * n: 0.07 * 100 is 7.000000000000001
+    rank = max(math.ceil(pct * len(sorted_values) / 100) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def build_report(recorder: Recorder, elapsed: float, config: dict) -> dict:
+    endpoints = {}
+    total_requests = total_errors = 0
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        values = sorted(latencies)
+        errors = recorder.errors.get(endpoint, 0)
+        total_requests += len(values)
+        total_errors += errors
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": errors,
+            "error_rate": errors / len(values),
+            "throughput_rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000,
+            "statuses": dict(recorder.statuses[endpoint]),
+        }
+    return {
+        "config": config,
+        "elapsed_seconds": elapsed,
+        "requests": total_requests,
+        "errors": total_errors,
+        "error_rate": total_errors / total_requests if total_requests else 0.0,
+        "throughput_rps": total_requests / elapsed if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+# --- Guest behaviour ------------------------------------------------------
+
+async def poll_leaderboard(client, recorder, event_id, headers, interval, stop: asyncio.Event):
+    while not stop.is_set():
+        await recorder.request(
+            client, "GET /api/events/{event_id}/leaderboard", "GET",
+            f"/api/events/{event_id}/leaderboard", headers=headers
+        )
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def play_level(client, recorder, event_id, level_id, headers, args, rng) -> bool:
+    """Start, autosave and complete one level; retries failed attempts."""
+    for attempt in range(args.max_attempts):
+        response = await recorder.request(
+            client, "POST /api/events/{event_id}/levels/{level_id}/start", "POST",
+            f"/api/events/{event_id}/levels/{level_id}/start", json={}, headers=headers
+        )
+        if response is None:
+            return False
+        progress_id = response.json()["progress_id"]
+
+        for save in range(args.autosaves):
+            await asyncio.sleep(rng.uniform(0, 2 * args.think_time))
+            await recorder.request(
+                client, "PUT /api/events/{event_id}/levels/{level_id}/progress", "PUT",
+                f"/api/events/{event_id}/levels/{level_id}/progress",
+                json={"progress_id": progress_id, "game_state": json.dumps({"moves": save + 1})},
+                headers=headers
+            )
+
+        passed = attempt == args.max_attempts - 1 or rng.random() >= args.fail_rate
+        response = await recorder.request(
+            client, "POST /api/events/{event_id}/levels/{level_id}/complete", "POST",
+            f"/api/events/{event_id}/levels/{level_id}/complete",
+            json={
+                "progress_id": progress_id,
+                "result_data": json.dumps({"score": rng.randint(0, 1000)}),
+                "is_passed": passed,
+            },
+            headers=headers
+        )
+        if response is None:
+            return False
+        if passed:
+            return True
+    return False
+
+
+async def guest(index: int, offset: float, started: float, client, recorder, args):
+    rng = random.Random(args.seed * 100003 + index)
+    await asyncio.sleep(max(0.0, started + offset - time.perf_counter()))
+
+    scanned = await recorder.request(client, "GET /api/events/qr/{qr_token}", "GET", f"/api/events/qr/{args.qr_token}")
+    if scanned is None:
+        return
+    event_id = scanned.json()["event_id"]
+
+    phone = f"+91{7000000000 + index}"
+    if await recorder.request(client, "POST /api/auth/send-otp", "POST", "/api/auth/send-otp",
+                              json={"phone_number": phone}) is None:
+        return
+    login = await recorder.request(
+        client, "POST /api/auth/verify-otp", "POST", "/api/auth/verify-otp",
+        json={"phone_number": phone, "otp_code": args.otp, "name": f"Guest {index}"}
+    )
+    if login is None:
+        return
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    levels = await recorder.request(
+        client, "GET /api/events/{event_id}/levels", "GET", f"/api/events/{event_id}/levels", headers=headers
+    )
+    if levels is None:
+        return
+
+    stop = asyncio.Event()
+    poller = asyncio.create_task(
+        poll_leaderboard(client, recorder, event_id, headers, args.poll_interval, stop)
+    )
+    try:
+        for level in sorted(levels.json(), key=lambda l: l["level_number"])[:args.levels]:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think_time))
+            if not await play_level(client, recorder, event_id, level["level_id"], headers, args, rng):
+                break
+    finally:
+        stop.set()
+        await poller
+
+
+async def run_load(args, base_url: str) -> dict:
+    rng = random.Random(args.seed)
+    offsets = arrival_offsets(args.curve, args.guests, args.duration, args.spike_seconds, rng)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            guest(i, offset, started, client, recorder, args)
+            for i, offset in enumerate(offsets)
+        ))
+        elapsed = time.perf_counter() - started
+
+    config = {k: v for k, v in vars(args).items() if k not in ("json", "output")}
+    return build_report(recorder, elapsed, config)
+
+
+# --- Local server ---------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+SEED_EVENT = """
+import base64, json, sys
+from datetime import datetime, timedelta
+from app.database import SessionLocal
+from app.models import Event, EventLevel, Game
+
+levels = int(sys.argv[1])
+db = SessionLocal()
+game = Game(game_name="Load Test Game", game_type="LOAD_TEST", component_name="LoadTestGame",
+            default_config_schema="{}", is_active=True)
+db.add(game)
+db.flush()
+event = Event(
+    event_name="Load Test Wedding", event_date=datetime.now() + timedelta(days=1),
+    organizer_name="Load Test", organizer_contact="+919999999999",
+    baby_name_encrypted=base64.b64encode(b"Guest").decode(),
+    qr_code_token=Event.generate_qr_token(), total_levels=levels, is_active=True
+)
+db.add(event)
+db.flush()
+for n in range(1, levels + 1):
+    db.add(EventLevel(event_id=event.event_id, game_id=game.game_id, level_number=n,
+                      level_config=json.dumps({}), passing_criteria=json.dumps({"type": "completion"}),
+                      max_retries=-1, is_final_level=n == levels, is_enabled=True))
+db.commit()
+print(event.qr_code_token)
+"""
+
+
+def start_local_server(args, tmp: str):
+    """Migrate and seed a temporary database, then start uvicorn on it."""
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'load.db')}",
+        ENVIRONMENT="loadtest",
+        DEBUG="False",
+        OTP_STUB_CODE=args.otp,
+    )
+    for pair in args.env:
+        key, _, value = pair.partition("=")
+        env[key] = value
+
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"],
+                   cwd=BACKEND_DIR, env=env, capture_output=True, check=True)
+    seeded = subprocess.run([sys.executable, "-c", SEED_EVENT, str(args.levels)],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    qr_token = seeded.stdout.strip().splitlines()[-1]
+
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1):
+                return proc, base_url, qr_token
+        except OSError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("server did not answer /health in time")
+
+
+def print_report(report: dict):
+    print(f"{report['requests']} requests in {report['elapsed_seconds']:.1f}s "
+          f"({report['throughput_rps']:.1f} req/s), error rate {report['error_rate']:.2%}")
+    print(f"{'endpoint':58} {'n':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for endpoint, stats in report["endpoints"].items():
+        print(f"{endpoint:58} {stats['requests']:6d} {stats['error_rate']:6.1%} "
+              f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guests", type=int, default=200)
+    parser.add_argument("--curve", choices=["spike", "ramp", "poisson", "steady"], default="spike")
+    parser.add_argument("--duration", type=float, default=30.0, help="arrival window for ramp/poisson/steady")
+    parser.add_argument("--spike-seconds", type=float, default=2.0, help="arrival window for spike")
+    parser.add_argument("--levels", type=int, default=3, help="levels each guest plays")
+    parser.add_argument("--autosaves", type=int, default=2, help="autosaves per attempt")
+    parser.add_argument("--fail-rate", type=float, default=0.2, help="chance an attempt fails")
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--think-time", type=float, default=0.5, help="mean seconds between actions")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="leaderboard polling period")
+    parser.add_argument("--connections", type=int, default=100, help="client connection pool size")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--otp", default="123456", help="stub OTP code")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--env", action="append", default=[], help="extra KEY=VALUE for the local server")
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--qr-token", help="event QR token (required with --url)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.qr_token:
+            parser.error("--qr-token is required with --url")
+        report = asyncio.run(run_load(args, args.url))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            proc, base_url, args.qr_token = start_local_server(args, tmp)
+            try:
+                report = asyncio.run(run_load(args, base_url))
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Fixtures for the query regression suite.
+
+Builds one large synthetic database per session (migrated with Alembic, filled
+by `seed_data.generate_bulk_data`) and serves the app against it.
+
+Query counts and plans are the hard checks. Latency depends on the machine,
+so it is only reported (against the baseline) unless --check-latency is given.
+Every measurement starts with empty in-process caches, so counts don't depend
+on which endpoints ran before.
+
+Run from backend/:
+    python -m pytest benchmarks/regression --no-cov
+    python -m pytest benchmarks/regression --no-cov --update-baselines   # after an intended change
+    python -m pytest benchmarks/regression --no-cov --check-latency      # same machine as the baselines
+"""
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import clear_caches
+from app.core.security import create_access_token
+from app.database import (
+    RoutingSession, build_engine, get_db, get_read_db, get_event_db, get_event_read_db
+)
+from app.models import Event, EventLevel, MediaAsset, UserLevelProgress
+from app.services.game_service import reset_catalog
+from app.services.stats_service import reconcile_all_event_stats
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# Dataset size: large enough that a full scan of a hot table shows up in the plan
+SCALE = dict(users=20_000, events=20, guests_per_event=500, levels_per_event=5, seed=2024)
+MEDIA_PER_LEVEL = 4
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baselines", action="store_true", default=False,
+        help="rewrite benchmarks/regression/baselines.json from this run"
+    )
+    parser.addoption(
+        "--check-latency", action="store_true", default=False,
+        help="fail on median latency over the baseline (otherwise only reported)"
+    )
+
+
+# (name, median ms, limit ms) of endpoints slower than their baseline allows
+slow_endpoints_key = pytest.StashKey[list]()
+
+
+def pytest_configure(config):
+    config.stash[slow_endpoints_key] = []
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    slow = config.stash.get(slow_endpoints_key, [])
+    if slow:
+        terminalreporter.section("latency over baseline (report only)")
+        for name, latency_ms, limit in slow:
+            terminalreporter.write_line(f"{name}: median {latency_ms:.1f} ms, limit {limit:.1f} ms")
+
+
+@dataclass
+class BenchContext:
+    engine: object
+    sessions: sessionmaker
+    event_id: int
+    qr_token: str
+    level_id: int
+    final_level_id: int
+    user_id: int
+    headers: dict
+
+
+class QueryCapture:
+    """Counts statements executed on the bench engine and records them for EXPLAIN."""
+
+    def __init__(self, engine):
+        self.statements = []
+        self.count = 0
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def clear(self):
+        self.statements.clear()
+        self.count = 0
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.count += 1
+            if not executemany:
+                self.statements.append((statement, parameters))
+
+
+def _seed_media(engine):
+    with engine.connect() as conn:
+        levels = conn.execute(select(EventLevel.level_id, EventLevel.event_id)).all()
+    rows = [
+        {
+            "event_id": event_id,
+            "level_id": level_id,
+            "asset_type": "MEMORY_CARD_IMAGE",
+            "file_url": f"https://example.com/{level_id}/{n}.jpg",
+            "display_order": n,
+        }
+        for level_id, event_id in levels
+        for n in range(MEDIA_PER_LEVEL)
+    ]
+    with engine.begin() as conn:
+        conn.execute(MediaAsset.__table__.insert(), rows)
+
+
+@pytest.fixture(scope="session")
+def bench(tmp_path_factory):
+    """A migrated, bulk-seeded SQLite database and the ids the endpoints need."""
+    sys.path.insert(0, BACKEND_DIR)
+    from seed_data import generate_bulk_data
+
+    url = f"sqlite:///{tmp_path_factory.mktemp('bench') / 'bench.db'}"
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR, env=dict(os.environ, DATABASE_URL=url), capture_output=True, check=True
+    )
+
+    engine = build_engine(url)
+    with engine.begin() as conn:
+        from app.models import Game
+        conn.execute(Game.__table__.insert(), [
+            {"game_name": "Memory Match", "game_type": "MEMORY_MATCH", "component_name": "MemoryMatchGame"},
+            {"game_name": "Name Guessing", "game_type": "NAME_GUESS", "component_name": "NameGuessingGame"},
+        ])
+    generate_bulk_data(engine, **SCALE)
+    _seed_media(engine)
+    # Bulk inserts bypass the stats counters; a deployment recounts after migrating
+    reconcile_all_event_stats(sessionmaker(class_=RoutingSession, bind=engine))
+
+    with engine.connect() as conn:
+        event_id, qr_token = conn.execute(
+            select(Event.event_id, Event.qr_code_token).order_by(Event.event_id)
+        ).first()
+        level_ids = conn.execute(
+            select(EventLevel.level_id).where(EventLevel.event_id == event_id).order_by(EventLevel.level_number)
+        ).scalars().all()
+        # The busiest guest of the event
+        user_id = conn.execute(
+            select(UserLevelProgress.user_id)
+            .where(UserLevelProgress.event_id == event_id)
+            .group_by(UserLevelProgress.user_id)
+            .order_by(func.count().desc(), UserLevelProgress.user_id)
+        ).scalars().first()
+
+    token = create_access_token(data={"sub": str(user_id)})
+    yield BenchContext(
+        engine=engine,
+        sessions=sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine),
+        event_id=event_id,
+        qr_token=qr_token,
+        level_id=level_ids[0],
+        final_level_id=level_ids[-1],
+        user_id=user_id,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def capture(bench):
+    return QueryCapture(bench.engine)
+
+
+@pytest.fixture(scope="session")
+def bench_client(bench):
+    """Test client for the app with every session dependency pointed at the bench DB."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    def override():
+        db = bench.sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    for dependency in (get_db, get_read_db, get_event_db, get_event_read_db):
+        app.dependency_overrides[dependency] = override
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    """Event, catalog, manifest, leaderboard and funnel caches start empty for every endpoint."""
+    clear_caches()
+    reset_catalog()
+
+
+@pytest.fixture
+def slow_endpoints(request):
+    return request.config.stash[slow_endpoints_key]
+
+
+@pytest.fixture(scope="session")
+def baselines():
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH) as f:
+            return json.load(f)
+    return {}
+
+
+@pytest.fixture(scope="session")
+def results(request):
+    """Measurements from this run; written as the new baselines with --update-baselines."""
+    measured = {}
+    yield measured
+    if request.config.getoption("--update-baselines") and measured:
+        with open(BASELINES_PATH, "w") as f:
+            json.dump(dict(sorted(measured.items())), f, indent=2)
+            f.write("\n")
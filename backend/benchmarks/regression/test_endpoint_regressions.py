@@ -0,0 +1,122 @@
+"""
+Per-endpoint query-count, query-plan and latency regression checks.
+
+Each endpoint runs against the large seeded database, with cold caches. A
+test fails when:
+  * it issues more SQL statements than its baseline (a new N+1), or
+  * any statement full-scans a hot table (EXPLAIN QUERY PLAN shows SCAN).
+A median latency above the baseline by more than the tolerance is reported,
+and fails the test only with --check-latency (baselines are per machine).
+"""
+import json
+import re
+import statistics
+import time
+
+import pytest
+
+# Tables that grow with traffic; a SCAN of one of these is a regression
+HOT_TABLES = {"user_level_progress", "event_levels", "media_assets", "users", "events", "otp_verifications"}
+
+RUNS = 5
+LATENCY_FACTOR = 2.0
+LATENCY_SLACK_MS = 10.0
+
+_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def _endpoints():
+    """(name, request builder) for every endpoint under test."""
+    return [
+        ("GET /api/events/qr/{qr_token}", lambda b: ("GET", f"/api/events/qr/{b.qr_token}", {})),
+        ("GET /api/events/{event_id}", lambda b: ("GET", f"/api/events/{b.event_id}", {})),
+        ("GET /api/events/{event_id}/levels", lambda b: ("GET", f"/api/events/{b.event_id}/levels", {})),
+        ("GET /api/events/{event_id}/levels/{level_id}",
+         lambda b: ("GET", f"/api/events/{b.event_id}/levels/{b.level_id}", {})),
+        ("GET /api/events/{event_id}/media", lambda b: ("GET", f"/api/events/{b.event_id}/media", {})),
+        ("GET /api/events/{event_id}/progress", lambda b: ("GET", f"/api/events/{b.event_id}/progress", {})),
+        ("GET /api/events/{event_id}/levels/{level_id}/attempts",
+         lambda b: ("GET", f"/api/events/{b.event_id}/levels/{b.final_level_id}/attempts", {})),
+        ("GET /api/events/{event_id}/leaderboard",
+         lambda b: ("GET", f"/api/events/{b.event_id}/leaderboard", {})),
+        ("GET /api/events/{event_id}/leaderboard?filter=completed",
+         lambda b: ("GET", f"/api/events/{b.event_id}/leaderboard?filter=completed", {})),
+        ("GET /api/events/{event_id}/leaderboard/me",
+         lambda b: ("GET", f"/api/events/{b.event_id}/leaderboard/me", {})),
+        ("GET /api/events/qr/{qr_token}/manifest", lambda b: ("GET", f"/api/events/qr/{b.qr_token}/manifest", {})),
+        ("GET /api/events/{event_id}/funnel", lambda b: ("GET", f"/api/events/{b.event_id}/funnel", {})),
+        ("GET /api/events/{event_id}/export", lambda b: ("GET", f"/api/events/{b.event_id}/export", {})),
+        ("GET /api/events/{event_id}/export?format=ndjson",
+         lambda b: ("GET", f"/api/events/{b.event_id}/export?format=ndjson", {})),
+        ("GET /api/games", lambda b: ("GET", "/api/games", {})),
+        ("GET /api/auth/me", lambda b: ("GET", "/api/auth/me", {})),
+        ("POST /api/events/{event_id}/levels/{level_id}/start",
+         lambda b: ("POST", f"/api/events/{b.event_id}/levels/{b.level_id}/start", {"json": {}})),
+    ]
+
+
+ENDPOINTS = _endpoints()
+
+
+def _explain(engine, statements):
+    """Unique EXPLAIN QUERY PLAN detail lines for the captured statements."""
+    plans = set()
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+                continue
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                plans.add(row[-1])
+    return sorted(plans)
+
+
+def _full_scans(plans):
+    return sorted({m.group(1) for line in plans if (m := _SCAN.match(line)) and m.group(1) in HOT_TABLES})
+
+
+@pytest.mark.parametrize("name,build", ENDPOINTS, ids=[name for name, _ in ENDPOINTS])
+def test_endpoint(name, build, bench, bench_client, capture, baselines, results, slow_endpoints, request):
+    method, path, kwargs = build(bench)
+
+    # Warm-up run, also used for the query count and plans
+    capture.clear()
+    capture.active = True
+    response = bench_client.request(method, path, headers=bench.headers, **kwargs)
+    capture.active = False
+    assert response.status_code in (200, 201), response.text
+    # Counted on the engine rather than from X-DB-Queries, which is sent before
+    # a streamed body (the export) runs its queries
+    queries = capture.count
+    plans = _explain(bench.engine, capture.statements)
+
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        bench_client.request(method, path, headers=bench.headers, **kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+    latency_ms = statistics.median(timings)
+
+    results[name] = {"queries": queries, "latency_ms": round(latency_ms, 2), "plan": plans}
+
+    scans = _full_scans(plans)
+    assert not scans, f"{name} full-scans {scans}:\n" + "\n".join(plans)
+
+    if request.config.getoption("--update-baselines"):
+        return
+    baseline = baselines.get(name)
+    if baseline is None:
+        pytest.fail(f"No baseline for {name}; run with --update-baselines")
+
+    assert queries <= baseline["queries"], (
+        f"{name} now issues {queries} queries (baseline {baseline['queries']})"
+    )
+    limit = baseline["latency_ms"] * LATENCY_FACTOR + LATENCY_SLACK_MS
+    if latency_ms <= limit:
+        return
+    if not request.config.getoption("--check-latency"):
+        slow_endpoints.append((name, latency_ms, limit))
+        return
+    pytest.fail(
+        f"{name} median {latency_ms:.1f} ms exceeds {limit:.1f} ms "
+        f"(baseline {baseline['latency_ms']} ms)\nplan:\n" + json.dumps(plans, indent=2)
+    )
@@ -1,17 +1,23 @@
 """
 Seed data script for Utsav Games
 Populates the database with sample games, events, levels, and test users.
+
+Usage:
+    python seed_data.py                 # small hand-written sample data
+    python seed_data.py --clear         # clear existing data first
+    python seed_data.py --generate --users 1000000 --events 5000 --seed 7
+                                        # bulk synthetic data for performance work
 """
+import base64
+import random
 import sys
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine, Base
-from app.models import User, Event, Game, EventLevel, MediaAsset
-from app.core.security import get_password_hash
+from app.database import SessionLocal
+from app.models import User, Event, Game, EventLevel, MediaAsset, UserLevelProgress
 import json
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic: run `alembic upgrade head` before seeding.
 
 def clear_database(db: Session):
     """Clear all existing data (optional - use with caution!)"""
@@ -396,8 +402,251 @@ def print_summary(users, games, events):
     print("\n")
 
 
+# ---------------------------------------------------------------------------
+# Bulk generator: production-sized synthetic data for performance work.
+# Rows are built as plain dicts and written with Core executemany inserts in
+# large batches, with explicit primary keys so every table can be streamed.
+# The same seed always produces the same data.
+# ---------------------------------------------------------------------------
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Anjali", "Vikram", "Neha", "Arjun", "Kavya", "Rohan", "Isha",
+               "Aditya", "Meera", "Karan", "Pooja", "Siddharth", "Diya", "Manish", "Sneha", "Nikhil", "Riya"]
+LAST_NAMES = ["Sharma", "Kumar", "Mehta", "Patel", "Reddy", "Iyer", "Nair", "Gupta", "Singh", "Joshi",
+              "Das", "Rao", "Verma", "Kapoor", "Bose", "Menon", "Shah", "Pillai", "Chopra", "Malhotra"]
+BABY_NAMES = ["Aarav", "Anaya", "Vihaan", "Myra", "Reyansh", "Kiara", "Ayaan", "Saanvi", "Ishaan", "Aadhya"]
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(engine, table, rows, batch_size) -> int:
+    """Insert rows in batches, one transaction per batch."""
+    count = 0
+    for batch in _batched(rows, batch_size):
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+        count += len(batch)
+    return count
+
+
+def _next_id(conn, column) -> int:
+    from sqlalchemy import func, select
+    return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+
+def generate_bulk_data(
+    engine,
+    users: int = 100_000,
+    events: int = 1_000,
+    guests_per_event: int = 150,
+    levels_per_event: int = 5,
+    seed: int = 42,
+    batch_size: int = 20_000,
+    base_date: datetime = datetime(2025, 1, 1),
+    shard_engine_for_event=None,
+) -> dict:
+    """
+    Append synthetic users, events, levels and attempts to the database.
+
+    Guests drop off level by level; each level takes one or more attempts
+    (harder levels fail more often), and the final level records a name guess
+    that passes only when it matches the baby's name. shard_engine_for_event
+    (event_id -> engine) routes event-scoped rows when sharding is on.
+    """
+    from sqlalchemy import select
+
+    rng = random.Random(seed)
+    users_table, events_table = User.__table__, Event.__table__
+    levels_table, progress_table = EventLevel.__table__, UserLevelProgress.__table__
+    route = shard_engine_for_event or (lambda event_id: engine)
+
+    with engine.connect() as conn:
+        first_user = _next_id(conn, users_table.c.user_id)
+        first_event = _next_id(conn, events_table.c.event_id)
+        game_ids = list(conn.execute(select(Game.__table__.c.game_id)).scalars())
+    if not game_ids:
+        raise RuntimeError("No games in the catalog; run `python seed_data.py` first")
+
+    def user_rows():
+        for user_id in range(first_user, first_user + users):
+            yield {
+                "user_id": user_id,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "phone_number": f"+91{6000000000 + user_id}",
+                "is_verified": True,
+                "created_at": base_date + timedelta(minutes=rng.randrange(525_600)),
+            }
+
+    counts = {"users": _insert(engine, users_table, user_rows(), batch_size)}
+
+    event_plans = []
+
+    def event_rows():
+        for event_id in range(first_event, first_event + events):
+            baby_name = rng.choice(BABY_NAMES)
+            event_date = base_date + timedelta(days=rng.randrange(365), hours=rng.randrange(9, 20))
+            event_plans.append((event_id, baby_name, event_date))
+            yield {
+                "event_id": event_id,
+                "event_name": f"{baby_name}'s Naming Ceremony",
+                "event_date": event_date,
+                "organizer_name": f"{rng.choice(LAST_NAMES)} Family",
+                "organizer_contact": f"+91{9000000000 + event_id % 1_000_000_000}",
+                "baby_name_encrypted": base64.b64encode(baby_name.encode()).decode(),
+                "qr_code_token": f"gen{seed}-{event_id}-{rng.getrandbits(48):012x}",
+                "total_levels": levels_per_event,
+                "is_active": True,
+                "event_start_time": event_date,
+                "event_end_time": event_date + timedelta(hours=6),
+                "theme_config": json.dumps({"primary_color": "#F4C430"}),
+                "created_at": event_date - timedelta(days=rng.randint(7, 60)),
+            }
+
+    counts["events"] = _insert(engine, events_table, event_rows(), batch_size)
+
+    # Level and attempt ids are allocated here, so they stay unique across shards
+    with engine.connect() as conn:
+        next_level = _next_id(conn, levels_table.c.level_id)
+    next_progress = 1
+    for target in {route(event_id) for event_id, _, _ in event_plans}:
+        with target.connect() as conn:
+            next_level = max(next_level, _next_id(conn, levels_table.c.level_id))
+            next_progress = max(next_progress, _next_id(conn, progress_table.c.progress_id))
+
+    counts["event_levels"] = counts["user_level_progress"] = 0
+    for plan_batch in _batched(event_plans, max(1, batch_size // (guests_per_event * levels_per_event * 2))):
+        level_rows, progress_rows = [], []
+        for event_id, baby_name, event_date in plan_batch:
+            level_ids = []
+            for number in range(1, levels_per_event + 1):
+                level_ids.append(next_level)
+                level_rows.append({
+                    "level_id": next_level,
+                    "event_id": event_id,
+                    "game_id": game_ids[(number - 1) % len(game_ids)],
+                    "level_number": number,
+                    "level_config": json.dumps({"difficulty": number}),
+                    "passing_criteria": json.dumps({"type": "completion"}),
+                    "max_retries": -1,
+                    "is_final_level": number == levels_per_event,
+                    "is_enabled": True,
+                    "created_at": event_date - timedelta(days=1),
+                })
+                next_level += 1
+
+            guest_count = max(1, int(rng.gauss(guests_per_event, guests_per_event / 4)))
+            guests = rng.sample(range(first_user, first_user + users), min(guest_count, users))
+            for user_id in guests:
+                clock = event_date + timedelta(minutes=rng.expovariate(1 / 45))
+                for number, level_id in enumerate(level_ids, start=1):
+                    # Drop-off before each level after the first
+                    if number > 1 and rng.random() > 0.85:
+                        break
+                    final = number == levels_per_event
+                    fail_rate = 0.15 + 0.1 * number
+                    passed = False
+                    for attempt in range(rng.randint(1, 5)):
+                        took = int(rng.lognormvariate(4, 0.6))  # median ~55s
+                        if final:
+                            guess = baby_name if rng.random() > 0.6 else rng.choice(BABY_NAMES)
+                            passed = guess == baby_name
+                            result = {"guess": guess, "is_correct": passed}
+                        else:
+                            passed = rng.random() > fail_rate
+                            result = {"score": rng.randint(0, 1000)}
+                        progress_rows.append({
+                            "progress_id": next_progress,
+                            "user_id": user_id,
+                            "event_id": event_id,
+                            "level_id": level_id,
+                            "status": "completed" if passed else "failed",
+                            "attempts_count": 1,
+                            "start_time": clock,
+                            "completion_time": clock + timedelta(seconds=took),
+                            "time_taken_seconds": took,
+                            "result_data": json.dumps(result),
+                            "is_passed": passed,
+                            "created_at": clock,
+                        })
+                        next_progress += 1
+                        clock += timedelta(seconds=took + rng.randint(5, 120))
+                        if passed:
+                            break
+                    if not passed:
+                        break
+
+        by_target = {}
+        for row in level_rows:
+            by_target.setdefault(route(row["event_id"]), ([], []))[0].append(row)
+        for row in progress_rows:
+            by_target.setdefault(route(row["event_id"]), ([], []))[1].append(row)
+        for target, (target_levels, target_progress) in by_target.items():
+            counts["event_levels"] += _insert(target, levels_table, target_levels, batch_size)
+            counts["user_level_progress"] += _insert(target, progress_table, target_progress, batch_size)
+
+    return counts
+
+
+def generate_main(argv):
+    """Entry point for `python seed_data.py --generate ...`."""
+    import argparse
+    import time
+    from app.database import engine, sharding_enabled, shard_engines, shard_for_event
+
+    parser = argparse.ArgumentParser(prog="seed_data.py --generate", description=generate_bulk_data.__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=1_000)
+    parser.add_argument("--guests-per-event", type=int, default=150)
+    parser.add_argument("--levels", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    router = None
+    if sharding_enabled():
+        router = lambda event_id: shard_engines[shard_for_event(event_id)]
+
+    db = SessionLocal()
+    try:
+        if db.query(Game).count() == 0:
+            seed_games(db)
+    finally:
+        db.close()
+
+    print("\n" + "="*60)
+    print(f"🏭 GENERATING DATA (seed {args.seed})")
+    print("="*60)
+    started = time.perf_counter()
+    counts = generate_bulk_data(
+        engine,
+        users=args.users,
+        events=args.events,
+        guests_per_event=args.guests_per_event,
+        levels_per_event=args.levels,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        shard_engine_for_event=router,
+    )
+    elapsed = time.perf_counter() - started
+    for table, count in counts.items():
+        print(f"  ✓ {table}: {count:,} rows")
+    print(f"✅ Generated {sum(counts.values()):,} rows in {elapsed:.1f}s")
+
+
 def main():
     """Main seed function"""
+    if len(sys.argv) > 1 and sys.argv[1] == "--generate":
+        generate_main(sys.argv[2:])
+        return
+
     print("\n" + "="*60)
     print("🌱 SEEDING DATABASE")
     print("="*60)
@@ -1,6 +1,12 @@
 """
 Pytest configuration and fixtures
 """
+import os
+
+# Tests assert query counts through X-DB-Queries and read /metrics; set before the app is imported
+os.environ.setdefault("SQL_INSTRUMENTATION_HEADERS", "True")
+os.environ.setdefault("METRICS_ENABLED", "True")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -8,9 +14,10 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db, get_event_db, get_event_read_db
 from app.models import User, Event, Game, EventLevel, OTPVerification
 from app.core.security import create_access_token
+from app.services.game_service import reset_catalog
 from datetime import datetime, timedelta
 import base64
 
@@ -25,6 +32,17 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_response_caches():
+    """Cached pages, the game catalog and queued purges must not leak between tests (ids repeat)."""
+    from app.core.cache import clear_caches
+    from app.services.purge_service import purger
+    clear_caches()
+    reset_catalog()
+    yield
+    purger.clear()
+
+
 @pytest.fixture(scope="function")
 def db():
     """Create a fresh database for each test"""
@@ -47,7 +65,12 @@ def client(db):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_event_db] = override_get_db
+    app.dependency_overrides[get_event_read_db] = override_get_db
     with TestClient(app) as test_client:
+        # Fixtures insert games after startup; let the catalog load on first use
+        reset_catalog()
         yield test_client
     app.dependency_overrides.clear()
 
@@ -0,0 +1,108 @@
+"""
+Tests for the incremental columnar analytics export
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.analytics import export_progress, flatten_results, load_watermarks
+from app.models import User, UserLevelProgress
+from tests.conftest import engine
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.files = {}
+
+    def __call__(self, path, columns, types):
+        self.files[path] = (columns, types)
+
+
+def _finish(db, event, level, user, minutes, status="completed", result=None):
+    db.add(UserLevelProgress(
+        user_id=user.user_id, event_id=event.event_id, level_id=level.level_id, status=status,
+        is_passed=status == "completed", time_taken_seconds=30,
+        completion_time=datetime(2026, 10, 1) + timedelta(minutes=minutes),
+        result_data=json.dumps(result or {})
+    ))
+    db.commit()
+
+
+def _export(tmp_path, writer, **kwargs):
+    return export_progress(str(tmp_path), sources=[("primary", engine)], central=engine, writer=writer, **kwargs)
+
+
+def test_flatten_results_types():
+    columns, types = flatten_results([
+        json.dumps({"guess": "Asha", "is_correct": True, "score": 3, "moves": [1]}),
+        json.dumps({"guess": "Ravi", "is_correct": False, "score": 2.5, "extra": None}),
+        "not json",
+    ])
+
+    assert types == {
+        "result_guess": "string", "result_is_correct": "bool", "result_score": "float64",
+        "result_moves": "string", "result_extra": "string",
+    }
+    assert columns["result_score"] == [3.0, 2.5, None]
+    assert columns["result_moves"] == ["[1]", None, None]
+
+
+def test_export_joins_and_partitions(tmp_path, db, test_user, test_event, test_level, test_game):
+    _finish(db, test_event, test_level, test_user, 1, result={"is_correct": True})
+    _finish(db, test_event, test_level, test_user, 2, status="failed")
+    db.add(UserLevelProgress(
+        user_id=test_user.user_id, event_id=test_event.event_id, level_id=test_level.level_id, status="in_progress"
+    ))
+    db.commit()
+    writer = RecordingWriter()
+
+    assert _export(tmp_path, writer) == {"rows": 2, "files": 1}
+
+    (path, (columns, types)), = writer.files.items()
+    assert os.path.basename(os.path.dirname(path)) == f"event={test_event.event_id}"
+    assert columns["status"] == ["completed", "failed"]
+    assert columns["game_type"] == [test_game.game_type] * 2
+    assert columns["level_number"] == [1, 1]
+    assert columns["result_is_correct"] == [True, None]
+    assert types["completion_time"] == "timestamp"
+
+
+def test_export_is_incremental(tmp_path, db, test_user, test_event, test_level):
+    _finish(db, test_event, test_level, test_user, 1)
+    _export(tmp_path, RecordingWriter())
+    assert load_watermarks(str(tmp_path))["primary"][0] == datetime(2026, 10, 1, 0, 1)
+
+    assert _export(tmp_path, RecordingWriter()) == {"rows": 0, "files": 0}
+
+    _finish(db, test_event, test_level, test_user, 45)
+    _finish(db, test_event, test_level, test_user, 70)
+    writer = RecordingWriter()
+    assert _export(tmp_path, writer, batch_size=1, partition="month") == {"rows": 2, "files": 2}
+    assert all(os.path.dirname(path).endswith("month=2026-10") for path in writer.files)
+
+
+def test_recent_rows_wait_for_the_next_run(tmp_path, db, monkeypatch, test_user, test_event, test_level):
+    _finish(db, test_event, test_level, test_user, 1)
+    db.add(UserLevelProgress(
+        user_id=test_user.user_id, event_id=test_event.event_id, level_id=test_level.level_id,
+        status="completed", is_passed=True, completion_time=datetime.utcnow() - timedelta(seconds=5)
+    ))
+    db.commit()
+
+    assert _export(tmp_path, RecordingWriter()) == {"rows": 1, "files": 1}
+    assert load_watermarks(str(tmp_path))["primary"][0] == datetime(2026, 10, 1, 0, 1)
+
+    monkeypatch.setattr("app.analytics.settings.ANALYTICS_EXPORT_SAFETY_LAG_SECONDS", 0)
+    assert _export(tmp_path, RecordingWriter()) == {"rows": 1, "files": 1}
+
+
+def test_parquet_files_written(tmp_path, db, test_user, test_event, test_level):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    _finish(db, test_event, test_level, test_user, 1, result={"guess": "Asha"})
+
+    export_progress(str(tmp_path), sources=[("primary", engine)], central=engine)
+
+    table = parquet.read_table(str(tmp_path / f"event={test_event.event_id}"))
+    assert table.column("result_guess").to_pylist() == ["Asha"]
@@ -156,3 +156,16 @@ class TestAuthentication:
         data = response.json()
         assert data["name"] == "Updated Name"
         assert data["email"] == "updated@example.com"
+
+    @pytest.mark.parametrize("environment, stubbed", [
+        ("loadtest", True), ("test", True), ("production", False), ("staging", False), ("", False),
+    ])
+    def test_otp_stub_only_in_allowed_environments(self, monkeypatch, environment, stubbed):
+        """Test that OTP_STUB_CODE is ignored outside the allowlisted environments"""
+        from app.core.config import settings
+        from app.services.otp_service import generate_otp
+
+        monkeypatch.setattr(settings, "OTP_STUB_CODE", "000000")
+        monkeypatch.setattr(settings, "ENVIRONMENT", environment)
+
+        assert (generate_otp() == "000000") is stubbed
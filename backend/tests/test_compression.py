@@ -0,0 +1,161 @@
+"""
+Tests for response compression and precompressed cached bodies
+"""
+import gzip
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core import compression
+from app.core.cache import CachedBody, TTLCache
+from app.core.config import settings
+from app.models.progress import UserLevelProgress
+
+
+@pytest.mark.parametrize("header,expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0", None),
+    ("*", compression.available_encodings()[0]),
+])
+def test_negotiate(header, expected):
+    assert compression.negotiate(header) == expected
+
+
+def test_negotiate_prefers_brotli_when_installed():
+    expected = "br" if compression.brotli is not None else "gzip"
+    assert compression.negotiate("gzip, br") == expected
+
+
+@pytest.fixture
+def small_app():
+    app = FastAPI()
+    app.add_middleware(compression.CompressionMiddleware)
+
+    @app.get("/big")
+    def big():
+        return {"items": [{"level_config": '{"pairs": 8, "theme": "flowers"}'} for _ in range(100)]}
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse("x" * 5000)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b'{"n": %d}\n' % i for i in range(500)), media_type="application/json")
+
+    return TestClient(app)
+
+
+def test_compresses_large_json(small_app):
+    response = small_app.get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert len(response.json()["items"]) == 100
+
+
+def test_small_body_sent_as_is(small_app):
+    response = small_app.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+
+def test_no_accept_encoding(small_app):
+    response = small_app.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_compresses_text_and_streams(small_app):
+    assert small_app.get("/text", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+
+    response = small_app.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.count("\n") == 500
+
+
+def test_cached_body_compresses_once(monkeypatch):
+    calls = []
+    real = compression.compress
+    monkeypatch.setattr(compression, "compress", lambda body, enc: calls.append(enc) or real(body, enc))
+    body = CachedBody(b'{"leaderboard": []}' * 100)
+    request = Request({"type": "http", "headers": [(b"accept-encoding", b"gzip")]})
+
+    first = body.response(request)
+    second = body.response(request)
+
+    assert calls == ["gzip"]
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.body == second.body
+    assert gzip.decompress(first.body) == body.body
+
+
+def test_ttl_cache_expiry_and_disable(monkeypatch):
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    later = time.monotonic() + 11
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: later)
+    assert cache.get("a") is None
+
+    disabled = TTLCache(ttl=0)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+
+
+def test_leaderboard_page_cached_and_precompressed(monkeypatch, client, auth_headers, db, test_user,
+                                                    test_event, test_level, multiple_users):
+    monkeypatch.setattr(settings, "COMPRESSION_MIN_SIZE", 0)
+    db.add(UserLevelProgress(
+        user_id=test_user.user_id, event_id=test_event.event_id, level_id=test_level.level_id,
+        status="completed", time_taken_seconds=42, is_passed=True
+    ))
+    db.commit()
+    url = f"/api/events/{test_event.event_id}/leaderboard"
+
+    first = client.get(url, headers=auth_headers)
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.json()["current_user_rank"] == 1
+
+    # A new result written behind the cache's back is not visible until the TTL ends
+    db.add(UserLevelProgress(
+        user_id=multiple_users[0].user_id, event_id=test_event.event_id, level_id=test_level.level_id,
+        status="completed", time_taken_seconds=10, is_passed=True
+    ))
+    db.commit()
+    cached = client.get(url, headers=auth_headers)
+    assert cached.content == first.content
+    assert cached.headers["X-DB-Queries"] == "1"  # only the user lookup
+
+
+def test_completion_invalidates_leaderboard(client, auth_headers, db, test_user, test_event, test_level):
+    url = f"/api/events/{test_event.event_id}/leaderboard"
+    assert client.get(url, headers=auth_headers).json()["leaderboard"] == []
+
+    progress = UserLevelProgress(
+        user_id=test_user.user_id, event_id=test_event.event_id, level_id=test_level.level_id,
+        status="in_progress"
+    )
+    db.add(progress)
+    db.commit()
+    completed = client.post(
+        f"/api/events/{test_event.event_id}/levels/{test_level.level_id}/complete",
+        json={"progress_id": progress.progress_id, "result_data": "{}", "is_passed": True},
+        headers=auth_headers
+    )
+    assert completed.status_code == 200
+
+    assert client.get(url, headers=auth_headers).json()["current_user_rank"] == 1
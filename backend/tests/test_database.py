@@ -0,0 +1,88 @@
+"""
+Tests for the database engine profile
+"""
+from sqlalchemy import text
+
+from app.database import build_engine
+
+
+class TestEngineProfile:
+
+    def test_sqlite_pragmas_applied(self, tmp_path):
+        """Test that the SQLite tuning profile is applied on connect"""
+        engine = build_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+
+        engine.dispose()
+
+    def test_sqlite_foreign_keys_can_be_disabled(self, tmp_path):
+        """Test that foreign key enforcement can be turned off per engine"""
+        engine = build_engine(f"sqlite:///{tmp_path / 'nofk.db'}", foreign_keys=False)
+
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 0
+
+        engine.dispose()
+
+
+class TestReadRouting:
+
+    def _request(self, token):
+        from starlette.requests import Request
+        return Request({
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+            "client": ("127.0.0.1", 1234),
+        })
+
+    def test_note_write_pins_client_to_primary(self):
+        """Test read-your-writes stickiness is per client"""
+        from app.database import note_write, _is_sticky
+
+        writer = self._request("writer-token")
+        reader = self._request("reader-token")
+        note_write(writer)
+
+        assert _is_sticky(writer)
+        assert not _is_sticky(reader)
+
+    def test_anonymous_clients_are_not_pinned(self):
+        """Test that anonymous writes don't pin everyone behind the same address"""
+        from starlette.requests import Request
+        from app.database import note_write, _is_sticky, _recent_writers
+
+        anonymous = Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": ("10.0.0.1", 1)})
+        neighbour = Request({"type": "http", "method": "GET", "path": "/", "headers": [], "client": ("10.0.0.1", 2)})
+        size = len(_recent_writers)
+        note_write(anonymous)
+
+        assert len(_recent_writers) == size
+        assert not _is_sticky(neighbour)
+
+    def test_sync_sqlite_replica(self, tmp_path):
+        """Test that the backup API copies the primary into the replica"""
+        from app.database import Base, sync_sqlite_replica
+        from app.models import User
+
+        primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+        replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+        primary = build_engine(primary_url)
+        Base.metadata.create_all(bind=primary)
+        with primary.begin() as conn:
+            conn.execute(User.__table__.insert(), [{"name": "Replicated"}])
+
+        sync_sqlite_replica(primary_url, replica_url)
+
+        replica = build_engine(replica_url)
+        with replica.connect() as conn:
+            assert conn.execute(text("SELECT name FROM users")).scalar() == "Replicated"
+        primary.dispose()
+        replica.dispose()
@@ -0,0 +1,67 @@
+"""
+Tests for the event lookup cache
+"""
+from app.services import event_service
+
+
+def test_qr_lookup_served_from_cache(client, test_event):
+    url = f"/api/events/qr/{test_event.qr_code_token}"
+    first = client.get(url)
+    second = client.get(url)
+
+    assert first.headers["X-DB-Queries"] == "1"
+    assert second.headers["X-DB-Queries"] == "0"
+    assert second.json()["event_name"] == test_event.event_name
+
+
+def test_unknown_token_cached_negatively(client, test_event):
+    assert client.get("/api/events/qr/guess-1").status_code == 404
+    repeat = client.get("/api/events/qr/guess-1")
+
+    assert repeat.status_code == 404
+    assert repeat.headers["X-DB-Queries"] == "0"
+
+
+def test_guessing_flood_does_not_evict_events(monkeypatch, client, test_event):
+    monkeypatch.setattr(event_service._missing, "maxsize", 5)
+    url = f"/api/events/qr/{test_event.qr_code_token}"
+    client.get(url)
+
+    for n in range(50):
+        client.get(f"/api/events/qr/guess-{n}")
+
+    assert len(event_service._missing) == 5
+    assert client.get(url).headers["X-DB-Queries"] == "0"
+
+
+def test_admin_writes_invalidate(client, auth_headers, test_event):
+    url = f"/api/events/qr/{test_event.qr_code_token}"
+    client.get(url)
+
+    client.put(f"/api/events/{test_event.event_id}", json={"event_name": "Renamed"}, headers=auth_headers)
+    assert client.get(url).json()["event_name"] == "Renamed"
+
+    client.patch(f"/api/events/{test_event.event_id}/activate?is_active=false", headers=auth_headers)
+    assert client.get(url).status_code == 410
+
+    client.delete(f"/api/events/{test_event.event_id}", headers=auth_headers)
+    assert client.get(url).status_code == 404
+    assert client.get(f"/api/events/{test_event.event_id}/levels").status_code == 404
+
+
+def test_create_clears_negative_entry(client, db, auth_headers):
+    assert event_service.get_event(db, 1) is None
+
+    created = client.post("/api/events", json={
+        "event_name": "Naming Day", "event_date": "2030-01-01T10:00:00",
+        "organizer_name": "Org", "organizer_contact": "+910000000000", "baby_name": "Asha"
+    }, headers=auth_headers).json()
+
+    assert event_service.get_event(db, created["event_id"]).event_name == "Naming Day"
+
+
+def test_snapshot_omits_the_answer(db, test_event):
+    snapshot = event_service.get_event(db, test_event.event_id)
+
+    assert not hasattr(snapshot, "baby_name_encrypted")
+    assert snapshot is event_service.get_event_by_token(db, test_event.qr_code_token)
@@ -0,0 +1,111 @@
+"""
+Tests for soft deletion and the chunked background purge
+"""
+import time
+from datetime import datetime
+
+from app.core.config import settings
+from app.models import Event, EventLevel, EventStats, MediaAsset, User, UserLevelProgress
+from app.services.purge_service import purge_event, purge_status, sessions_like
+
+
+def _add_history(db, event, level, guests):
+    for i in range(guests):
+        user = User(name=f"Guest {i}", phone_number=f"+91700000{i:04d}", is_verified=True)
+        db.add(user)
+        db.flush()
+        db.add(UserLevelProgress(
+            user_id=user.user_id, event_id=event.event_id, level_id=level.level_id, status="completed"
+        ))
+    db.add(MediaAsset(event_id=event.event_id, level_id=level.level_id, asset_type="COVER", file_url="https://x/c.jpg"))
+    db.commit()
+
+
+def test_deleted_event_disappears_at_once(client, db, auth_headers, test_event, test_level):
+    assert client.delete(f"/api/events/{test_event.event_id}", headers=auth_headers).status_code == 204
+
+    assert client.get(f"/api/events/{test_event.event_id}", headers=auth_headers).status_code == 404
+    assert client.get(f"/api/events/qr/{test_event.qr_code_token}").status_code == 404
+    assert client.get("/api/events", headers=auth_headers).json() == []
+    assert client.delete(f"/api/events/{test_event.event_id}", headers=auth_headers).status_code == 404
+
+    db.expire_all()
+    assert db.get(Event, test_event.event_id).deleted_at is not None
+    status = client.get(f"/api/events/{test_event.event_id}/deletion", headers=auth_headers).json()
+    assert status["state"] == "queued"
+
+
+def test_purge_deletes_in_chunks(monkeypatch, client, db, auth_headers, test_event, test_level):
+    _add_history(db, test_event, test_level, 5)
+    monkeypatch.setattr(settings, "EVENT_PURGE_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "EVENT_PURGE_PAUSE_SECONDS", 0)
+    event_id = test_event.event_id
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+
+    status = purge_event(event_id, sessions_like(db))
+
+    assert status.state == "done"
+    assert status.rows_total["user_level_progress"] == 5
+    assert status.rows_deleted == {
+        "user_level_progress": 5, "media_assets": 1, "event_stats": 0, "event_levels": 1
+    }
+    db.expire_all()
+    assert db.query(UserLevelProgress).count() == 0
+    assert db.query(EventLevel).count() == 0
+    assert db.get(Event, event_id) is None
+    assert purge_status(event_id) is status
+
+
+def test_status_after_restart_reports_remaining(client, db, auth_headers, test_event, test_level):
+    _add_history(db, test_event, test_level, 3)
+    client.delete(f"/api/events/{test_event.event_id}", headers=auth_headers)
+    from app.core.cache import clear_caches
+    clear_caches()  # another worker: no in-memory status
+
+    status = client.get(f"/api/events/{test_event.event_id}/deletion", headers=auth_headers).json()
+
+    assert status["state"] == "pending"
+    assert status["rows_remaining"]["user_level_progress"] == 3
+    assert client.get("/api/events/999/deletion", headers=auth_headers).status_code == 404
+
+
+def test_background_purger_runs(monkeypatch, client, db, auth_headers, test_event, test_level):
+    _add_history(db, test_event, test_level, 2)
+    monkeypatch.setattr(settings, "EVENT_PURGE_DELAY_SECONDS", 0)
+    event_id = test_event.event_id
+
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+    deadline = time.monotonic() + 5
+    while purge_status(event_id).state not in ("done", "failed") and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert purge_status(event_id).state == "done"
+    db.expire_all()
+    assert db.query(UserLevelProgress).count() == 0
+
+
+def test_event_routes_404_after_delete(client, db, auth_headers, test_event, test_level):
+    event_id, level_id = test_event.event_id, test_level.level_id
+    client.delete(f"/api/events/{event_id}", headers=auth_headers)
+
+    assert client.get(f"/api/events/{event_id}/levels").status_code == 404
+    assert client.get(f"/api/events/{event_id}/levels/{level_id}").status_code == 404
+    assert client.get(f"/api/events/{event_id}/media").status_code == 404
+    assert client.get(f"/api/events/{event_id}/leaderboard", headers=auth_headers).status_code == 404
+    start = client.post(f"/api/events/{event_id}/levels/{level_id}/start", headers=auth_headers, json={})
+    assert start.status_code == 404
+    db.expire_all()
+    assert db.query(UserLevelProgress).count() == 0
+    assert db.query(EventStats).count() == 0
+
+
+def test_write_units_reject_events_deleted_mid_request(client, db, auth_headers, test_event, test_level):
+    event_id, level_id = test_event.event_id, test_level.level_id
+    client.get(f"/api/events/{event_id}/levels")  # the event is cached as live
+    test_event.deleted_at = datetime.utcnow()  # deleted by another worker
+    db.commit()
+
+    start = client.post(f"/api/events/{event_id}/levels/{level_id}/start", headers=auth_headers, json={})
+
+    assert start.status_code == 404
+    assert db.query(UserLevelProgress).count() == 0
@@ -0,0 +1,149 @@
+"""
+Tests for the incremental event dashboard counters
+"""
+import json
+import threading
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models import EventLevel, User, UserLevelProgress
+from app.models.stats import EventStats
+from app.services.stats_service import reconcile_all_event_stats
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def final_level(db, test_event, test_game):
+    level = EventLevel(
+        event_id=test_event.event_id, game_id=test_game.game_id, level_number=2,
+        level_config=json.dumps({}), is_final_level=True, is_enabled=True
+    )
+    db.add(level)
+    db.commit()
+    db.refresh(level)
+    return level
+
+
+def _play(client, headers, event, level, is_correct=None):
+    base = f"/api/events/{event.event_id}/levels/{level.level_id}"
+    progress_id = client.post(f"{base}/start", json={}, headers=headers).json()["progress_id"]
+    result = {} if is_correct is None else {"guess": "TestBaby", "is_correct": is_correct}
+    client.post(f"{base}/complete", json={
+        "progress_id": progress_id, "result_data": json.dumps(result), "is_passed": True
+    }, headers=headers)
+
+
+def _stats(client, headers, event):
+    return client.get(f"/api/events/{event.event_id}", headers=headers).json()["stats"]
+
+
+def test_counters_follow_play(client, auth_headers, test_event, test_level, final_level):
+    assert _stats(client, auth_headers, test_event) == {
+        "total_participants": 0, "completed_all_levels": 0, "correct_name_guesses": 0
+    }
+
+    _play(client, auth_headers, test_event, test_level)
+    assert _stats(client, auth_headers, test_event)["total_participants"] == 1
+
+    _play(client, auth_headers, test_event, final_level, is_correct=False)
+    assert _stats(client, auth_headers, test_event) == {
+        "total_participants": 1, "completed_all_levels": 1, "correct_name_guesses": 0
+    }
+
+    # Replaying counts the correct guess once, but not the player or completion again
+    _play(client, auth_headers, test_event, final_level, is_correct=True)
+    _play(client, auth_headers, test_event, final_level, is_correct=True)
+    assert _stats(client, auth_headers, test_event) == {
+        "total_participants": 1, "completed_all_levels": 1, "correct_name_guesses": 1
+    }
+
+
+def test_missing_row_is_counted_without_writing(client, db, auth_headers, test_event, test_level, final_level):
+    for i, is_correct in enumerate([True, False]):
+        user = User(name=f"Guest {i}", phone_number=f"+91700000{i:04d}", is_verified=True)
+        db.add(user)
+        db.flush()
+        db.add(UserLevelProgress(
+            user_id=user.user_id, event_id=test_event.event_id, level_id=final_level.level_id,
+            status="completed", is_passed=True, result_data=json.dumps({"is_correct": is_correct})
+        ))
+    db.commit()
+
+    assert _stats(client, auth_headers, test_event) == {
+        "total_participants": 2, "completed_all_levels": 2, "correct_name_guesses": 1
+    }
+    # Counted on the fly; the GET doesn't write the row
+    assert db.get(EventStats, test_event.event_id) is None
+
+
+def test_reconcile_repairs_drift(client, db, auth_headers, test_event, test_level):
+    _play(client, auth_headers, test_event, test_level)
+    stats = db.get(EventStats, test_event.event_id)
+    stats.total_participants = 7
+    db.commit()
+
+    assert reconcile_all_event_stats(TestingSessionLocal) == 1
+
+    db.expire_all()
+    assert _stats(client, auth_headers, test_event)["total_participants"] == 1
+
+
+def test_recount_is_not_overwritten_by_concurrent_bump(monkeypatch, tmp_path):
+    """Test that a bump committed while the reconciler counts is kept"""
+    from datetime import datetime
+    from app.database import Base, build_engine
+    from app.models import Event, Game
+    from app.services import stats_service
+
+    engine = build_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(autoflush=False, bind=engine)
+    db = sessions()
+    db.add_all([
+        Game(game_id=1, game_name="Game", game_type="GAME", component_name="Game"),
+        Event(event_id=1, event_name="Event", event_date=datetime.utcnow(), organizer_name="O",
+              organizer_contact="+919999999999", baby_name_encrypted="eA==", qr_code_token="token"),
+        User(user_id=1, name="First", phone_number="+917000000001"),
+        User(user_id=2, name="Second", phone_number="+917000000002"),
+    ])
+    db.flush()
+    db.add(EventLevel(level_id=1, event_id=1, game_id=1, level_number=1))
+    db.add(UserLevelProgress(user_id=1, event_id=1, level_id=1, status="in_progress"))
+    db.add(EventStats(event_id=1, total_participants=1, completed_all_levels=0, correct_name_guesses=0))
+    db.commit()
+    db.close()
+
+    def start_second_guest():
+        guest = sessions()
+        progress = UserLevelProgress(user_id=2, event_id=1, level_id=1, status="in_progress")
+        guest.add(progress)
+        guest.flush()
+        stats_service.count_start(guest, progress)
+        guest.commit()
+        guest.close()
+
+    compute = stats_service.compute_event_stats
+
+    def compute_then_race(session, event_id):
+        counts = compute(session, event_id)
+        # The guest starts between the recount and its write; it has to wait
+        racer = threading.Thread(target=start_second_guest)
+        racer.start()
+        racer.join(timeout=0.5)
+        assert racer.is_alive()
+        threads.append(racer)
+        return counts
+
+    threads = []
+    monkeypatch.setattr(stats_service, "compute_event_stats", compute_then_race)
+    reconciler = sessions()
+    stats_service.reconcile_event_stats(reconciler, 1)
+    reconciler.commit()
+    reconciler.close()
+    threads[0].join(timeout=10)
+
+    db = sessions()
+    assert db.get(EventStats, 1).total_participants == 2
+    db.close()
+    engine.dispose()
@@ -0,0 +1,84 @@
+"""
+Tests for the streaming results export
+"""
+import csv
+import io
+import json
+
+from app.core.config import settings
+from app.models import User, UserLevelProgress
+from app.services.export_service import stream_csv, stream_export
+from app.services.purge_service import sessions_like
+
+
+def _add_results(db, event, level, names):
+    for i, name in enumerate(names):
+        user = User(name=name, phone_number=f"+91700000{i:04d}", is_verified=True)
+        db.add(user)
+        db.flush()
+        db.add(UserLevelProgress(
+            user_id=user.user_id, event_id=event.event_id, level_id=level.level_id,
+            status="completed", attempts_count=1, is_passed=True, time_taken_seconds=30 + i,
+            result_data=json.dumps({"guess": f"Name {i}", "is_correct": i % 2 == 0, "moves": [1, 2]})
+        ))
+    db.commit()
+
+
+def test_csv_export(client, db, auth_headers, test_event, test_level):
+    _add_results(db, test_event, test_level, ["Asha", "=HYPERLINK(\"x\")"])
+
+    response = client.get(
+        f"/api/events/{test_event.event_id}/export?fields=guess,is_correct", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "event-1-results.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["name"] for r in rows] == ["Asha", "'=HYPERLINK(\"x\")"]
+    assert rows[0]["level_number"] == "1"
+    assert rows[0]["result.guess"] == "Name 0"
+    assert [r["result.is_correct"] for r in rows] == ["True", "False"]
+
+
+def test_ndjson_export(client, db, auth_headers, test_event, test_level):
+    _add_results(db, test_event, test_level, ["Asha", "Ravi"])
+
+    response = client.get(
+        f"/api/events/{test_event.event_id}/export?format=ndjson&fields=moves", headers=auth_headers
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [line["name"] for line in lines] == ["Asha", "Ravi"]
+    assert lines[0]["result.moves"] == [1, 2]
+    assert "result.guess" not in lines[0]
+
+
+def test_export_streams_in_batches(monkeypatch, db, test_event, test_level):
+    _add_results(db, test_event, test_level, [f"Guest {i}" for i in range(5)])
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    db.info["event_id"] = test_event.event_id
+
+    chunks = list(stream_csv(db, test_event.event_id, []))
+
+    assert len(chunks) == 3
+    assert chunks[0].decode().splitlines()[0].startswith("user_id,name,level_number")
+    assert sum(len(chunk.decode().splitlines()) for chunk in chunks) == 6
+
+
+def test_export_reads_through_its_own_session(db, test_event, test_level):
+    _add_results(db, test_event, test_level, ["Asha", "Ravi"])
+    stream = stream_export(sessions_like(db), test_event.event_id, "ndjson", [])
+    db.close()  # the request's session is gone before the body streams
+
+    rows = [json.loads(line) for chunk in stream for line in chunk.splitlines()]
+
+    assert sorted(row["name"] for row in rows) == ["Asha", "Ravi"]
+
+
+def test_export_errors(client, auth_headers, test_event):
+    base = f"/api/events/{test_event.event_id}/export"
+    assert client.get(base + "?fields=guess;drop", headers=auth_headers).status_code == 400
+    assert client.get(base + "?format=xlsx", headers=auth_headers).status_code == 422
+    assert client.get("/api/events/999/export", headers=auth_headers).status_code == 404
@@ -0,0 +1,89 @@
+"""
+Tests for the live organizer funnel
+"""
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.sketch import DDSketch
+from app.models import UserLevelProgress
+
+
+def _play(client, headers, event, level, passed=True):
+    base = f"/api/events/{event.event_id}/levels/{level.level_id}"
+    progress_id = client.post(f"{base}/start", json={}, headers=headers).json()["progress_id"]
+    client.post(f"{base}/complete", json={
+        "progress_id": progress_id, "result_data": json.dumps({}), "is_passed": passed
+    }, headers=headers)
+
+
+def test_sketch_quantiles_within_accuracy():
+    sketch = DDSketch(0.01)
+    for value in range(1, 1001):
+        sketch.add(value)
+
+    assert sketch.quantile(0.5) == pytest.approx(500, rel=0.02)
+    assert sketch.quantile(0.9) == pytest.approx(900, rel=0.02)
+    assert DDSketch().quantile(0.5) is None
+
+
+def test_sketches_merge():
+    left, right, both = DDSketch(), DDSketch(), DDSketch()
+    for value in range(1, 200):
+        (left if value % 2 else right).add(value)
+        both.add(value)
+    left.merge(right)
+
+    assert left.count == both.count
+    assert left.quantile(0.9) == both.quantile(0.9)
+    with pytest.raises(ValueError):
+        left.merge(DDSketch(0.05))
+
+
+def test_snapshot_replays_progress(client, db, auth_headers, test_user, test_event, test_level):
+    for status_, seconds in [("failed", 20), ("failed", 25), ("completed", 40), ("in_progress", None)]:
+        db.add(UserLevelProgress(
+            user_id=test_user.user_id, event_id=test_event.event_id, level_id=test_level.level_id,
+            status=status_, time_taken_seconds=seconds
+        ))
+    db.commit()
+
+    level = client.get(f"/api/events/{test_event.event_id}/funnel", headers=auth_headers).json()["levels"][0]
+
+    assert level["level_number"] == 1
+    assert (level["started"], level["in_progress"], level["completed"], level["failed"]) == (4, 1, 1, 2)
+    assert level["retries"] == {"2": 1}
+    assert level["median_seconds"] == pytest.approx(40, rel=0.01)
+
+
+def test_live_updates_without_queries(client, auth_headers, test_event, test_level):
+    url = f"/api/events/{test_event.event_id}/funnel"
+    client.get(url, headers=auth_headers)
+
+    _play(client, auth_headers, test_event, test_level, passed=False)
+    _play(client, auth_headers, test_event, test_level)
+    response = client.get(url, headers=auth_headers)
+
+    level = response.json()["levels"][0]
+    assert (level["started"], level["completed"], level["failed"]) == (2, 1, 1)
+    assert level["retries"] == {"1": 1}
+    assert response.headers["X-DB-Queries"] == "1"  # the user lookup only
+
+
+def test_websocket_pushes_changes(client, auth_headers, test_user_token, test_event, test_level):
+    with client.websocket_connect(f"/ws/events/{test_event.event_id}/funnel?token={test_user_token}") as ws:
+        assert ws.receive_json()["levels"][0]["started"] == 0
+
+        _play(client, auth_headers, test_event, test_level)
+
+        update = ws.receive_json()
+        while update["levels"][0]["completed"] == 0:
+            update = ws.receive_json()
+        assert update["levels"][0]["started"] == 1
+
+
+def test_websocket_requires_token(client, test_event):
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/ws/events/{test_event.event_id}/funnel") as ws:
+            ws.receive_json()
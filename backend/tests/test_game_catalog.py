@@ -0,0 +1,74 @@
+"""
+Tests for the in-memory game catalog snapshot
+"""
+import dataclasses
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.services import game_service
+
+
+def test_snapshot_parses_schema_and_is_immutable(db, test_game):
+    test_game.default_config_schema = json.dumps({"pairs": {"type": "integer"}})
+    db.commit()
+
+    catalog = game_service.load_catalog(db)
+    game = catalog.get(test_game.game_id)
+
+    assert game.config_schema == {"pairs": {"type": "integer"}}
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        game.game_name = "Other"
+    with pytest.raises(TypeError):
+        catalog.by_id[999] = game
+
+
+def test_catalog_endpoints_skip_the_database(client, test_game):
+    client.get("/api/games")  # loads the snapshot
+
+    listed = client.get("/api/games")
+    detail = client.get(f"/api/games/{test_game.game_id}")
+
+    assert listed.headers["X-DB-Queries"] == "0"
+    assert detail.headers["X-DB-Queries"] == "0"
+    assert detail.json()["game_type"] == test_game.game_type
+
+
+def test_level_list_resolves_games_without_a_query(client, test_event, test_level, test_game):
+    client.get("/api/games")
+    client.get(f"/api/events/qr/{test_event.qr_code_token}")  # event lookup cached
+
+    response = client.get(f"/api/events/{test_event.event_id}/levels")
+
+    assert response.json()[0]["game_name"] == test_game.game_name
+    assert response.headers["X-DB-Queries"] == "1"
+
+
+def test_writes_swap_the_snapshot(client, auth_headers, test_game):
+    before = client.get("/api/games").json()
+
+    created = client.post("/api/games", json={
+        "game_name": "Word Scramble", "game_type": "WORD_SCRAMBLE", "component_name": "WordScrambleGame"
+    }, headers=auth_headers).json()
+    assert len(client.get("/api/games").json()) == len(before) + 1
+
+    client.delete(f"/api/games/{created['game_id']}", headers=auth_headers)
+    assert client.get(f"/api/games/{created['game_id']}").status_code == 404
+
+
+def test_snapshot_reloads_after_max_age(monkeypatch, client, db, test_game):
+    client.get("/api/games")
+    test_game.is_active = False
+    db.commit()
+    assert len(client.get("/api/games").json()) == 1  # still the old snapshot
+
+    monkeypatch.setattr(settings, "GAME_CATALOG_MAX_AGE_SECONDS", 0.000001)
+    assert client.get("/api/games").json() == []
+
+
+def test_preload_uses_overridden_session(client, test_game):
+    game_service.preload_catalog(app)
+
+    assert game_service.get_catalog(None).get(test_game.game_id) is not None
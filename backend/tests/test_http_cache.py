@@ -0,0 +1,72 @@
+"""
+Tests for ETag / Last-Modified / Cache-Control on public endpoints
+"""
+from datetime import datetime, timedelta, timezone
+
+from app.core.http_cache import http_date
+from app.models.media import MediaAsset
+
+
+def test_games_etag_and_revalidation(client, auth_headers, test_game):
+    first = client.get("/api/games")
+
+    assert first.status_code == 200
+    assert first.headers["ETag"].startswith('W/"')
+    assert "stale-while-revalidate=" in first.headers["Cache-Control"]
+    assert first.json()[0]["game_id"] == test_game.game_id
+
+    second = client.get("/api/games", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+    client.put(f"/api/games/{test_game.game_id}", json={"game_name": "Renamed"}, headers=auth_headers)
+    changed = client.get("/api/games", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+def test_game_detail_last_modified(client, test_game):
+    response = client.get(f"/api/games/{test_game.game_id}")
+    assert "Last-Modified" in response.headers
+
+    later = http_date(datetime.now(timezone.utc) + timedelta(minutes=1))
+    assert client.get(
+        f"/api/games/{test_game.game_id}", headers={"If-Modified-Since": later}
+    ).status_code == 304
+
+
+def test_qr_lookup_conditional(client, test_event):
+    url = f"/api/events/qr/{test_event.qr_code_token}"
+    etag = client.get(url).headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    # If-None-Match wins over If-Modified-Since
+    later = http_date(datetime.now(timezone.utc) + timedelta(minutes=1))
+    assert client.get(url, headers={"If-None-Match": '"other"', "If-Modified-Since": later}).status_code == 200
+
+
+def test_levels_conditional_and_missing_event(client, test_event, test_level):
+    url = f"/api/events/{test_event.event_id}/levels"
+    first = client.get(url)
+    assert first.json()[0]["level_id"] == test_level.level_id
+
+    assert client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert client.get("/api/events/9999/levels").status_code == 404
+
+
+def test_media_revalidation_skips_row_loading(client, db, test_event):
+    db.add(MediaAsset(event_id=test_event.event_id, asset_type="PHOTO", file_url="https://x/1.jpg"))
+    db.commit()
+    url = f"/api/events/{test_event.event_id}/media"
+    etag = client.get(url).headers["ETag"]
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["X-DB-Queries"] == "1"
+
+    db.add(MediaAsset(event_id=test_event.event_id, asset_type="PHOTO", file_url="https://x/2.jpg"))
+    db.commit()
+    refreshed = client.get(url, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert len(refreshed.json()) == 2
@@ -0,0 +1,104 @@
+"""
+Tests for per-request SQL instrumentation
+"""
+import logging
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db_instrumentation import (
+    RequestQueryStats, SQLInstrumentationMiddleware, fingerprint, install_sql_instrumentation
+)
+from app.database import get_db
+
+
+class TestFingerprint:
+
+    def test_literals_are_normalized(self):
+        """Test that statements differing only in values share a fingerprint"""
+        a = fingerprint("SELECT * FROM users WHERE user_id = 1 AND name = 'Asha'")
+        b = fingerprint("SELECT *\n  FROM users WHERE user_id = 42 AND name = 'Ravi'")
+        assert a == b
+
+    def test_in_lists_are_collapsed(self):
+        """Test that IN lists of any length share a fingerprint"""
+        assert fingerprint("SELECT 1 WHERE id IN (?, ?)") == fingerprint("SELECT 1 WHERE id IN (?, ?, ?, ?)")
+
+    def test_repeated_fingerprints_are_flagged(self):
+        """Test that fingerprints at or over the threshold are reported"""
+        stats = RequestQueryStats()
+        for user_id in range(5):
+            stats.record(f"SELECT * FROM user_level_progress WHERE user_id = {user_id}", 0.001)
+        stats.record("SELECT * FROM events", 0.001)
+
+        repeated = stats.repeated(5)
+        assert list(repeated.values()) == [5]
+        assert stats.count == 6
+
+
+class TestMiddleware:
+
+    def _app(self, db):
+        install_sql_instrumentation()
+        app = FastAPI()
+        app.add_middleware(SQLInstrumentationMiddleware)
+
+        @app.get("/queries/{n}")
+        def run_queries(n: int, session=Depends(get_db)):
+            for i in range(n):
+                session.execute(text("SELECT :i"), {"i": i}).scalar()
+            return {"ran": n}
+
+        app.dependency_overrides[get_db] = lambda: db
+        return app
+
+    def test_headers_report_query_count(self, db):
+        """Test that X-DB-Queries and Server-Timing are set per request"""
+        client = TestClient(self._app(db))
+
+        response = client.get("/queries/3")
+        assert response.status_code == 200
+        assert response.headers["X-DB-Queries"] == "3"
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+        assert 'desc="3 queries"' in response.headers["Server-Timing"]
+        assert "X-DB-N-Plus-One" not in response.headers
+
+        # Counts are per request, not cumulative
+        assert client.get("/queries/1").headers["X-DB-Queries"] == "1"
+
+    def test_n_plus_one_flagged_and_logged(self, db, caplog, monkeypatch):
+        """Test that repeated statements are flagged in headers and logs"""
+        monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 4)
+        client = TestClient(self._app(db))
+
+        with caplog.at_level(logging.WARNING, logger="app.sql"):
+            response = client.get("/queries/6")
+
+        assert response.headers["X-DB-N-Plus-One"] == "6"
+        assert any("Likely N+1" in r.getMessage() for r in caplog.records)
+
+    def test_headers_off_still_logs(self, db, caplog, monkeypatch):
+        """Test that turning the headers off keeps the N+1 warning"""
+        monkeypatch.setattr(settings, "SQL_INSTRUMENTATION_HEADERS", False)
+        monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 4)
+        client = TestClient(self._app(db))
+
+        with caplog.at_level(logging.WARNING, logger="app.sql"):
+            response = client.get("/queries/6")
+
+        assert "X-DB-Queries" not in response.headers
+        assert "Server-Timing" not in response.headers
+        assert any("Likely N+1" in r.getMessage() for r in caplog.records)
+
+    def test_slow_request_logs_query_list(self, db, caplog, monkeypatch):
+        """Test that slow requests are logged with every statement"""
+        monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 0)
+        client = TestClient(self._app(db))
+
+        with caplog.at_level(logging.WARNING, logger="app.sql"):
+            client.get("/queries/2")
+
+        slow = [r.getMessage() for r in caplog.records if "Slow request" in r.getMessage()]
+        assert slow and slow[0].count("SELECT ?") == 2
@@ -0,0 +1,88 @@
+"""
+Tests for leaderboard name-guess results and query count
+"""
+import json
+
+import pytest
+
+from app.core.cache import clear_caches
+from app.models.level import EventLevel
+from app.models.progress import UserLevelProgress
+from app.models.user import User
+
+
+@pytest.fixture
+def final_level(db, test_event, test_game):
+    level = EventLevel(
+        event_id=test_event.event_id,
+        game_id=test_game.game_id,
+        level_number=2,
+        level_config=json.dumps({}),
+        is_final_level=True,
+        is_enabled=True
+    )
+    db.add(level)
+    db.commit()
+    db.refresh(level)
+    return level
+
+
+def _add_guests(db, event, first_level, final_level, count, start=0):
+    """Guests who completed both levels; even-numbered ones guessed the name right."""
+    for i in range(start, start + count):
+        user = User(name=f"Guest {i}", phone_number=f"+91700000{i:04d}", is_verified=True)
+        db.add(user)
+        db.flush()
+        db.add(UserLevelProgress(
+            user_id=user.user_id, event_id=event.event_id, level_id=first_level.level_id,
+            status="completed", time_taken_seconds=30 + i, is_passed=True
+        ))
+        db.add(UserLevelProgress(
+            user_id=user.user_id, event_id=event.event_id, level_id=final_level.level_id,
+            status="completed", time_taken_seconds=60, is_passed=True,
+            result_data=json.dumps({"guess": "TestBaby", "is_correct": i % 2 == 0})
+        ))
+    db.commit()
+
+
+@pytest.mark.leaderboard
+class TestLeaderboardNameGuess:
+
+    def test_correct_name_guess_from_final_level(self, client, auth_headers, db, test_event, test_level, final_level):
+        _add_guests(db, test_event, test_level, final_level, 4)
+
+        response = client.get(f"/api/events/{test_event.event_id}/leaderboard", headers=auth_headers)
+
+        assert response.status_code == 200
+        entries = response.json()["leaderboard"]
+        assert [e["name"] for e in entries] == ["Guest 0", "Guest 1", "Guest 2", "Guest 3"]
+        assert [e["correct_name_guess"] for e in entries] == [True, False, True, False]
+        assert [e["badge"] for e in entries] == ["🥇", "🥈", "🥉", None]
+
+    def test_offset_keeps_ranks(self, client, auth_headers, db, test_event, test_level, final_level):
+        _add_guests(db, test_event, test_level, final_level, 4)
+
+        response = client.get(
+            f"/api/events/{test_event.event_id}/leaderboard?offset=2&limit=2", headers=auth_headers
+        )
+
+        entries = response.json()["leaderboard"]
+        assert [e["rank"] for e in entries] == [3, 4]
+        assert [e["correct_name_guess"] for e in entries] == [True, False]
+
+    def test_query_count_independent_of_participants(self, client, auth_headers, db, test_event, test_level, final_level):
+        _add_guests(db, test_event, test_level, final_level, 2)
+        url = f"/api/events/{test_event.event_id}/leaderboard"
+        few = int(client.get(url, headers=auth_headers).headers["X-DB-Queries"])
+
+        _add_guests(db, test_event, test_level, final_level, 20, start=2)
+        clear_caches()
+        many = client.get(url, headers=auth_headers)
+
+        assert len(many.json()["leaderboard"]) == 22
+        assert int(many.headers["X-DB-Queries"]) == few
+
+    def test_missing_event(self, client, auth_headers):
+        response = client.get("/api/events/9999/leaderboard", headers=auth_headers)
+
+        assert response.status_code == 404
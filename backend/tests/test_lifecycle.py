@@ -0,0 +1,96 @@
+"""
+Tests for the event lifecycle scheduler and final leaderboards
+"""
+from datetime import datetime, timedelta
+
+from app.api.leaderboard import invalidate_leaderboard
+from app.models import Event, User, UserLevelProgress
+from app.services.lifecycle_service import run_lifecycle
+from app.services.purge_service import sessions_like
+
+
+def _schedule(db, event, start=None, end=None, is_active=False):
+    event.event_start_time, event.event_end_time, event.is_active = start, end, is_active
+    db.commit()
+
+
+def test_activates_and_deactivates_on_schedule(client, db, test_event):
+    now = datetime.utcnow()
+    later = Event(
+        event_name="Later", event_date=now, organizer_name="O", organizer_contact="+910000000000",
+        baby_name_encrypted="eA==", qr_code_token="later_token", is_active=True,
+        event_start_time=now - timedelta(hours=2), event_end_time=now - timedelta(seconds=5)
+    )
+    db.add(later)
+    _schedule(db, test_event, start=now - timedelta(seconds=5), end=now + timedelta(hours=1))
+
+    acted = run_lifecycle(sessions_like(db), now - timedelta(seconds=15), now)
+
+    assert acted["activated"] == [test_event.event_id]
+    assert acted["deactivated"] == [later.event_id]
+    db.expire_all()
+    assert test_event.is_active is True
+    assert later.is_active is False
+
+
+def test_manual_toggle_is_not_overridden(client, db, test_event):
+    now = datetime.utcnow()
+    # Started before the previous tick; the organizer switched it off since
+    _schedule(db, test_event, start=now - timedelta(minutes=5), is_active=False)
+
+    acted = run_lifecycle(sessions_like(db), now - timedelta(seconds=15), now)
+
+    assert acted["activated"] == []
+    db.expire_all()
+    assert test_event.is_active is False
+
+
+def test_prewarms_before_start(client, db, test_event, test_level):
+    now = datetime.utcnow()
+    _schedule(db, test_event, start=now + timedelta(minutes=2), end=now + timedelta(hours=2))
+
+    acted = run_lifecycle(sessions_like(db), now - timedelta(seconds=15), now)
+
+    assert acted["warmed"] == [test_event.event_id]
+    qr = client.get(f"/api/events/qr/{test_event.qr_code_token}")
+    manifest = client.get(f"/api/events/qr/{test_event.qr_code_token}/manifest")
+    assert qr.headers["X-DB-Queries"] == "0"
+    assert manifest.headers["X-DB-Queries"] == "0"
+
+
+def test_final_leaderboard_ignores_late_results(client, db, auth_headers, test_event, test_level):
+    now = datetime.utcnow()
+    _schedule(db, test_event, start=now - timedelta(hours=1), end=now - timedelta(seconds=1), is_active=True)
+    on_time = User(name="On time", phone_number="+917000000001", is_verified=True)
+    late = User(name="Late", phone_number="+917000000002", is_verified=True)
+    db.add_all([on_time, late])
+    db.flush()
+    for user, finished in ((on_time, now - timedelta(minutes=5)), (late, now + timedelta(minutes=5))):
+        db.add(UserLevelProgress(
+            user_id=user.user_id, event_id=test_event.event_id, level_id=test_level.level_id,
+            status="completed", is_passed=True, time_taken_seconds=30,
+            start_time=finished - timedelta(seconds=30), completion_time=finished
+        ))
+    db.commit()
+
+    acted = run_lifecycle(sessions_like(db), now - timedelta(seconds=15), now)
+    assert acted["deactivated"] == [test_event.event_id]
+
+    # A completion only drops the live pages; the frozen ones stay
+    invalidate_leaderboard(test_event.event_id)
+    response = client.get(f"/api/events/{test_event.event_id}/leaderboard", headers=auth_headers)
+    data = response.json()
+    assert [entry["name"] for entry in data["leaderboard"]] == ["On time"]
+    assert data["total_participants"] == 1
+    assert response.headers["X-DB-Queries"] == "1"  # the caller's user lookup only
+
+
+def test_schedule_times_stored_as_utc(client, db, auth_headers):
+    response = client.post("/api/events", headers=auth_headers, json={
+        "event_name": "Shower", "event_date": "2026-11-01T10:00:00+05:30",
+        "organizer_name": "O", "organizer_contact": "+919999999999", "baby_name": "Asha",
+        "event_start_time": "2026-11-01T10:00:00+05:30",
+    })
+
+    event = db.get(Event, response.json()["event_id"])
+    assert event.event_start_time == datetime(2026, 11, 1, 4, 30)
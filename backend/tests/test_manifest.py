@@ -0,0 +1,85 @@
+"""
+Tests for the one-round-trip event manifest
+"""
+import json
+
+from app.models.media import MediaAsset
+from app.models.progress import UserLevelProgress
+
+
+def _url(event):
+    return f"/api/events/qr/{event.qr_code_token}/manifest"
+
+
+def _add_media(db, event, level):
+    db.add_all([
+        MediaAsset(event_id=event.event_id, level_id=level.level_id, asset_type="MEMORY_CARD_IMAGE",
+                   file_url="https://x/card.jpg", display_order=1),
+        MediaAsset(event_id=event.event_id, level_id=None, asset_type="COVER", file_url="https://x/cover.jpg"),
+    ])
+    db.commit()
+
+
+def test_anonymous_manifest(client, db, test_event, test_level, test_game):
+    _add_media(db, test_event, test_level)
+
+    response = client.get(_url(test_event))
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["event"]["event_id"] == test_event.event_id
+    assert data["event"]["theme"] == {"color": "blue"}
+    level = data["levels"][0]
+    assert level["config"] == {"difficulty": "easy"}
+    assert level["game"]["component_name"] == test_game.component_name
+    assert [m["asset_type"] for m in level["media"]] == ["MEMORY_CARD_IMAGE"]
+    assert [m["asset_type"] for m in data["event_media"]] == ["COVER"]
+    assert data["progress"] is None
+    assert response.headers["ETag"] == f'W/"{data["version"]}"'
+
+
+def test_anonymous_manifest_is_cached(client, test_event, test_level):
+    first = client.get(_url(test_event))
+    second = client.get(_url(test_event))
+
+    assert second.content == first.content
+    assert second.headers["X-DB-Queries"] == "0"
+    assert client.get(_url(test_event), headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+
+def test_manifest_with_progress(client, db, auth_headers, test_user, test_event, test_level):
+    db.add(UserLevelProgress(
+        user_id=test_user.user_id, event_id=test_event.event_id, level_id=test_level.level_id,
+        status="completed", time_taken_seconds=40, is_passed=True
+    ))
+    db.commit()
+    public = client.get(_url(test_event)).json()
+
+    response = client.get(_url(test_event), headers=auth_headers)
+
+    data = response.json()
+    assert response.headers["Cache-Control"] == "private, no-store"
+    assert data["progress"]["user_id"] == test_user.user_id
+    assert data["progress"]["completed_levels"] == 1
+    assert {k: v for k, v in data.items() if k != "progress"} == {k: v for k, v in public.items() if k != "progress"}
+
+
+def test_level_edit_changes_version(client, auth_headers, test_event, test_level):
+    before = client.get(_url(test_event)).json()["version"]
+
+    client.put(
+        f"/api/events/{test_event.event_id}/levels/{test_level.level_id}",
+        json={"level_config": json.dumps({"difficulty": "hard"})}, headers=auth_headers
+    )
+    after = client.get(_url(test_event)).json()
+
+    assert after["version"] != before
+    assert after["levels"][0]["config"] == {"difficulty": "hard"}
+
+
+def test_manifest_errors(client, auth_headers, test_event):
+    assert client.get("/api/events/qr/nope/manifest").status_code == 404
+    assert client.get(_url(test_event), headers={"Authorization": "Bearer junk"}).status_code == 401
+
+    client.patch(f"/api/events/{test_event.event_id}/activate?is_active=false", headers=auth_headers)
+    assert client.get(_url(test_event)).status_code == 410
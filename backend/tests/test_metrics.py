@@ -0,0 +1,92 @@
+"""
+Tests for the /metrics endpoint and metrics registry
+"""
+import json
+
+import pytest
+
+from app.core.metrics import Counter, Histogram, Registry, HTTP_REQUEST_DURATION, LEVEL_COMPLETIONS, OTP_SENDS
+from app.models import UserLevelProgress
+
+
+class TestRegistry:
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram rendering in Prometheus text format"""
+        registry = Registry()
+        latency = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+        latency.observe(0.05, route="/a")
+        latency.observe(0.5, route="/a")
+        latency.observe(5, route="/a")
+
+        text = registry.render()
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+
+    def test_label_names_are_enforced(self):
+        """Test that observations must use the declared labels"""
+        counter = Counter("things_total", "Things", ("kind",))
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+
+
+class TestMetricsEndpoint:
+
+    def test_metrics_served_in_text_format(self, client):
+        """Test that /metrics returns Prometheus text"""
+        client.get("/health")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds_bucket" in response.text
+        assert "threadpool_threads_limit" in response.text
+
+    def test_token_required_when_set(self, monkeypatch, client):
+        """Test that METRICS_TOKEN gates scrapes behind a bearer token"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+    def test_latency_labelled_by_route_template(self, client, auth_headers, test_event):
+        """Test that histograms use the route template, not the raw path"""
+        before = HTTP_REQUEST_DURATION.count(
+            method="GET", route="/api/events/{event_id}/levels", status="200"
+        )
+        client.get(f"/api/events/{test_event.event_id}/levels", headers=auth_headers)
+
+        after = HTTP_REQUEST_DURATION.count(
+            method="GET", route="/api/events/{event_id}/levels", status="200"
+        )
+        assert after == before + 1
+        assert f"/api/events/{test_event.event_id}/levels" not in client.get("/metrics").text
+
+    def test_domain_counters(self, client, auth_headers, db, test_user, test_event, test_level):
+        """Test the OTP send and level completion counters"""
+        otp_before = OTP_SENDS.value(result="logged")
+        client.post("/api/auth/send-otp", json={"phone_number": "+919876543210"})
+        assert OTP_SENDS.value(result="logged") == otp_before + 1
+
+        progress = UserLevelProgress(
+            user_id=test_user.user_id,
+            event_id=test_event.event_id,
+            level_id=test_level.level_id,
+            status="in_progress",
+            attempts_count=1
+        )
+        db.add(progress)
+        db.commit()
+
+        passed_before = LEVEL_COMPLETIONS.value(result="passed")
+        client.post(
+            f"/api/events/{test_event.event_id}/levels/{test_level.level_id}/complete",
+            json={"progress_id": progress.progress_id, "result_data": json.dumps({}), "is_passed": True},
+            headers=auth_headers
+        )
+        assert LEVEL_COMPLETIONS.value(result="passed") == passed_before + 1
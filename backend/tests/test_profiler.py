@@ -0,0 +1,136 @@
+"""
+Tests for the on-demand profiler
+"""
+import json
+import os
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiler
+from app.core.config import settings
+
+
+def busy_dependency():
+    return "dep"
+
+
+def spin(ms: float):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(profiler.ProfilerMiddleware)
+
+    @app.get("/slow")
+    def slow_endpoint(dep: str = Depends(busy_dependency)):
+        spin(60)
+        return {"ok": True}
+
+    return app
+
+
+class TestSignature:
+
+    def test_signature_bound_to_request(self, monkeypatch):
+        """Test that signatures only verify for their own method and path"""
+        monkeypatch.setattr(settings, "PROFILER_SECRET", "s3cret")
+        header = profiler.sign("GET", "/api/events/1/progress")
+
+        assert profiler.verify(header, "GET", "/api/events/1/progress")
+        assert not profiler.verify(header, "GET", "/api/events/2/progress")
+        assert not profiler.verify(header, "POST", "/api/events/1/progress")
+        assert not profiler.verify("123.deadbeef", "GET", "/api/events/1/progress")
+
+    def test_expired_signature_rejected(self, monkeypatch):
+        """Test that old signatures are refused"""
+        monkeypatch.setattr(settings, "PROFILER_SECRET", "s3cret")
+        old = int(time.time()) - settings.PROFILER_SIGNATURE_MAX_AGE_SECONDS - 10
+        assert not profiler.verify(profiler.sign("GET", "/slow", timestamp=old), "GET", "/slow")
+
+
+class TestRequestProfile:
+
+    def test_signed_request_writes_speedscope_artifact(self, monkeypatch, tmp_path):
+        """Test that a signed request is profiled and saved"""
+        monkeypatch.setattr(settings, "PROFILER_SECRET", "s3cret")
+        monkeypatch.setattr(settings, "PROFILER_OUTPUT_DIR", str(tmp_path))
+        client = TestClient(_app())
+
+        response = client.get("/slow", headers={"X-Profile": profiler.sign("GET", "/slow")})
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+
+        with open(os.path.join(tmp_path, response.headers["X-Profile-Artifact"])) as f:
+            profile = json.load(f)
+        names = {frame["name"] for frame in profile["shared"]["frames"]}
+        assert "slow_endpoint" in names and "spin" in names
+        assert profile["profiles"][0]["type"] == "sampled"
+        assert profile["profiles"][0]["samples"]
+
+    def test_samples_hold_no_frames(self):
+        """Test that samples are stored as frame keys, not frame objects"""
+        with profiler.RequestProfile(interval_ms=1) as profile:
+            spin(20)
+
+        assert profile._samples
+        for stack in profile._samples:
+            assert all(isinstance(key, tuple) and len(key) == 3 for key in stack)
+        assert profile.stacks({spin.__code__})
+
+    def test_unsigned_request_not_profiled(self, monkeypatch, tmp_path):
+        """Test that requests without a valid signature are untouched"""
+        monkeypatch.setattr(settings, "PROFILER_SECRET", "s3cret")
+        monkeypatch.setattr(settings, "PROFILER_OUTPUT_DIR", str(tmp_path))
+        client = TestClient(_app())
+
+        assert "X-Profile-Artifact" not in client.get("/slow").headers
+        assert "X-Profile-Artifact" not in client.get("/slow", headers={"X-Profile": "1.bad"}).headers
+        assert os.listdir(tmp_path) == []
+
+
+class TestBackgroundSampler:
+
+    def test_stacks_aggregated_per_route(self, monkeypatch):
+        """Test that sampled stacks are grouped by route template"""
+        monkeypatch.setattr(settings, "PROFILER_SECRET", "s3cret")
+        client = TestClient(_app())
+        client.get("/slow")  # teaches the sampler the route
+
+        sampler = profiler.BackgroundSampler(interval_ms=2, window_seconds=60)
+        sampler.start()
+        try:
+            client.get("/slow")
+        finally:
+            sampler.stop()
+
+        report = sampler.report()
+        assert [p["name"] for p in report["profiles"]] == ["/slow"]
+        assert report["profiles"][0]["samples"]
+
+
+class TestAdminEndpoints:
+
+    def test_admin_routes_require_signature(self, monkeypatch):
+        """Test that profiler admin routes are gated by the signature"""
+        from app.main import create_app
+
+        monkeypatch.setattr(settings, "PROFILER_SECRET", "s3cret")
+        client = TestClient(create_app())
+        path = "/api/admin/profiler/sampler"
+
+        assert client.get(path).status_code == 403
+        response = client.get(path, headers={"X-Profile": profiler.sign("GET", path)})
+        assert response.status_code == 200
+        assert response.json()["running"] is False
+
+    def test_admin_routes_absent_when_disabled(self):
+        """Test that nothing is mounted without PROFILER_SECRET"""
+        from app.main import create_app
+
+        client = TestClient(create_app())
+        assert client.get("/api/admin/profiler/sampler").status_code == 404
@@ -0,0 +1,101 @@
+"""
+Tests for bulk event provisioning
+"""
+from app.core.config import settings
+from app.models import Event, EventLevel, EventStats, MediaAsset
+
+
+def _item(i, **extra):
+    return dict({
+        "event_name": f"Ceremony {i}", "event_date": "2026-12-01T10:00:00",
+        "organizer_name": "Agency", "organizer_contact": "+919999999999", "baby_name": f"Baby {i}",
+    }, **extra)
+
+
+def _add_media(db, event, level):
+    db.add_all([
+        MediaAsset(event_id=event.event_id, level_id=level.level_id, asset_type="PUZZLE_IMAGE",
+                   file_url="https://cdn/p.jpg", display_order=1),
+        MediaAsset(event_id=event.event_id, asset_type="COVER", file_url="https://cdn/c.jpg"),
+    ])
+    db.commit()
+
+
+def test_clones_template_levels_and_media(client, db, auth_headers, test_event, test_level):
+    _add_media(db, test_event, test_level)
+
+    response = client.post("/api/events/bulk", headers=auth_headers, json={
+        "template_event_id": test_event.event_id,
+        "events": [_item(1), _item(2, description="Own description")],
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (2, 0)
+    assert [(r["index"], r["status"], r["levels"], r["media"]) for r in data["results"]] == [
+        (0, "created", 1, 2), (1, "created", 1, 2)
+    ]
+
+    first, second = (db.get(Event, r["event_id"]) for r in data["results"])
+    assert first.theme_config == test_event.theme_config
+    assert first.description == test_event.description
+    assert second.description == "Own description"
+    assert first.qr_code_token != second.qr_code_token
+
+    level = db.query(EventLevel).filter(EventLevel.event_id == first.event_id).one()
+    assert (level.game_id, level.level_config) == (test_level.game_id, test_level.level_config)
+    media = {m.asset_type: m.level_id for m in db.query(MediaAsset).filter(MediaAsset.event_id == first.event_id)}
+    assert media == {"PUZZLE_IMAGE": level.level_id, "COVER": None}
+    assert db.get(EventStats, first.event_id).total_participants == 0
+
+    manifest = client.get(f"/api/events/qr/{first.qr_code_token}/manifest").json()
+    assert [l["level_id"] for l in manifest["levels"]] == [level.level_id]
+
+
+def test_statement_count_independent_of_batch_size(client, auth_headers, test_event, test_level):
+    def provision(n):
+        return client.post("/api/events/bulk", headers=auth_headers, json={
+            "template_event_id": test_event.event_id, "events": [_item(i) for i in range(n)],
+        })
+
+    small, large = provision(2), provision(20)
+
+    assert large.json()["created"] == 20
+    assert large.headers["X-DB-Queries"] == small.headers["X-DB-Queries"]
+
+
+def test_invalid_items_are_reported_and_skipped(client, db, auth_headers):
+    response = client.post("/api/events/bulk", headers=auth_headers, json={"events": [
+        _item(1),
+        _item(2, event_start_time="2026-12-01T12:00:00", event_end_time="2026-12-01T11:00:00"),
+    ]})
+
+    data = response.json()
+    assert (data["created"], data["failed"]) == (1, 1)
+    assert data["results"][1] == {
+        "index": 1, "status": "invalid", "event_id": None, "qr_code_token": None,
+        "levels": 0, "media": 0, "detail": "event_end_time must be after event_start_time",
+    }
+    assert db.query(Event).count() == 1
+
+
+def test_without_media(client, db, auth_headers, test_event, test_level):
+    _add_media(db, test_event, test_level)
+
+    response = client.post("/api/events/bulk", headers=auth_headers, json={
+        "template_event_id": test_event.event_id, "clone_media": False, "events": [_item(1)],
+    })
+
+    assert response.json()["results"][0]["media"] == 0
+    assert db.query(MediaAsset).count() == 2
+
+
+def test_rejected_requests(monkeypatch, client, auth_headers):
+    missing = client.post("/api/events/bulk", headers=auth_headers, json={
+        "template_event_id": 999, "events": [_item(1)],
+    })
+    assert missing.status_code == 404
+
+    monkeypatch.setattr(settings, "EVENT_PROVISION_MAX_ITEMS", 2)
+    too_many = client.post("/api/events/bulk", headers=auth_headers, json={"events": [_item(i) for i in range(3)]})
+    assert too_many.status_code == 400
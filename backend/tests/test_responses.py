@@ -0,0 +1,58 @@
+"""
+Tests for the orjson response path
+"""
+import json
+from datetime import datetime
+
+from app.core.responses import ORJSONResponse, dump_json, row_fields
+from app.schemas.leaderboard import LeaderboardResponse
+from app.schemas.level import LevelResponse
+from app.models.progress import UserLevelProgress
+
+
+def test_dump_json_handles_datetimes_and_int_keys():
+    body = dump_json({"at": datetime(2024, 6, 1, 18, 30), 1: "one", "name": "Gudiya 🥇"})
+
+    assert json.loads(body) == {"at": "2024-06-01T18:30:00", "1": "one", "name": "Gudiya 🥇"}
+
+
+def test_row_fields_skips_sqlalchemy_state(test_level):
+    fields = row_fields(test_level, LevelResponse.model_fields)
+
+    assert "_sa_instance_state" not in fields
+    assert fields["level_id"] == test_level.level_id
+    LevelResponse.model_validate(fields)
+
+
+def test_default_response_class(client):
+    response = client.get("/health")
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["status"] == "healthy"
+
+
+def test_leaderboard_matches_schema(client, auth_headers, db, test_user, test_event, test_level):
+    db.add(UserLevelProgress(
+        user_id=test_user.user_id, event_id=test_event.event_id, level_id=test_level.level_id,
+        status="completed", time_taken_seconds=42, is_passed=True, completion_time=datetime(2024, 6, 1, 18, 30)
+    ))
+    db.commit()
+
+    response = client.get(f"/api/events/{test_event.event_id}/leaderboard", headers=auth_headers)
+
+    data = LeaderboardResponse.model_validate(response.json())
+    assert data.current_user_rank == 1
+    assert data.leaderboard[0].badge == "🥇"
+    assert data.leaderboard[0].completed_at == datetime(2024, 6, 1, 18, 30)
+
+
+def test_level_detail_has_no_orm_state(client, test_event, test_level):
+    response = client.get(f"/api/events/{test_event.event_id}/levels/{test_level.level_id}")
+
+    assert response.status_code == 200
+    assert "_sa_instance_state" not in response.json()
+    assert response.json()["game_name"]
+
+
+def test_response_render():
+    assert ORJSONResponse({"ok": True}).body == b'{"ok":true}'
@@ -0,0 +1,75 @@
+"""
+Tests for the bulk synthetic data generator
+"""
+import json
+
+from sqlalchemy import func, select
+
+from app.database import Base, build_engine
+from app.models import Event, EventLevel, Game, User, UserLevelProgress
+from seed_data import generate_bulk_data
+
+
+def _engine(path):
+    engine = build_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Game.__table__.insert(), [
+            {"game_name": "Memory Match", "game_type": "MEMORY_MATCH", "component_name": "MemoryMatchGame"},
+        ])
+    return engine
+
+
+def _dump(engine, table):
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(select(table).order_by(*table.primary_key.columns))]
+
+
+class TestGenerateBulkData:
+
+    def test_deterministic_from_seed(self, tmp_path):
+        """Test that the same seed produces identical rows"""
+        first, second = _engine(tmp_path / "a.db"), _engine(tmp_path / "b.db")
+        kwargs = dict(users=200, events=4, guests_per_event=30, levels_per_event=3, seed=9, batch_size=50)
+
+        counts = generate_bulk_data(first, **kwargs)
+        assert generate_bulk_data(second, **kwargs) == counts
+        for model in (User, Event, EventLevel, UserLevelProgress):
+            assert _dump(first, model.__table__) == _dump(second, model.__table__)
+
+        assert counts["users"] == 200
+        assert counts["events"] == 4
+        assert counts["event_levels"] == 12
+        assert counts["user_level_progress"] > 0
+
+    def test_attempt_distribution(self, tmp_path):
+        """Test retries, failures and final-guess results"""
+        engine = _engine(tmp_path / "c.db")
+        generate_bulk_data(engine, users=500, events=3, guests_per_event=100, levels_per_event=3, seed=1)
+
+        with engine.connect() as conn:
+            statuses = dict(conn.execute(
+                select(UserLevelProgress.status, func.count()).group_by(UserLevelProgress.status)
+            ).all())
+            final_results = conn.execute(
+                select(UserLevelProgress.result_data, UserLevelProgress.is_passed, Event.baby_name_encrypted)
+                .join(EventLevel, EventLevel.level_id == UserLevelProgress.level_id)
+                .join(Event, Event.event_id == UserLevelProgress.event_id)
+                .where(EventLevel.is_final_level == True)
+            ).all()
+
+        assert statuses["completed"] > 0 and statuses["failed"] > 0
+        assert final_results
+        for result_data, is_passed, _ in final_results:
+            result = json.loads(result_data)
+            assert result["is_correct"] == is_passed
+
+    def test_appends_after_existing_rows(self, tmp_path):
+        """Test that a second run continues the id sequences"""
+        engine = _engine(tmp_path / "d.db")
+        generate_bulk_data(engine, users=50, events=2, guests_per_event=10, seed=1)
+        generate_bulk_data(engine, users=50, events=2, guests_per_event=10, seed=2)
+
+        with engine.connect() as conn:
+            assert conn.execute(select(func.count()).select_from(User)).scalar() == 100
+            assert conn.execute(select(func.count()).select_from(Event)).scalar() == 4
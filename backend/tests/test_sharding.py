@@ -0,0 +1,189 @@
+"""
+Tests for per-event sharding
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, build_engine, configure_shards, shard_engines, shard_for_event, RoutingSession
+from app.models import Event, EventLevel, EventStats, Game, UserLevelProgress
+from app.schemas.event import EventCreate
+from app.services import manifest_service
+from app.services.provisioning_service import load_template, provision_events
+from app.sharding import init_shards, move_event
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    central = build_engine(f"sqlite:///{tmp_path / 'central.db'}")
+    Base.metadata.create_all(bind=central)
+    configure_shards([f"sqlite:///{tmp_path / f'shard_{i}.db'}" for i in range(2)])
+    init_shards()
+
+    sessions = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=central)
+    db = sessions()
+    db.add(Game(game_id=1, game_name="Game", game_type="GAME", component_name="Game"))
+    for event_id in (1, 2):
+        db.add(Event(
+            event_id=event_id, event_name=f"Event {event_id}", event_date=datetime.utcnow(),
+            organizer_name="Organizer", organizer_contact="+919999999999",
+            baby_name_encrypted="QmFieQ==", qr_code_token=f"token-{event_id}"
+        ))
+    db.commit()
+    db.close()
+
+    yield central, sessions
+
+    configure_shards([])
+    central.dispose()
+
+
+def _count(db_engine, table, event_id):
+    with db_engine.connect() as conn:
+        return conn.execute(
+            text(f"SELECT count(*) FROM {table} WHERE event_id = :event_id"), {"event_id": event_id}
+        ).scalar()
+
+
+class TestSharding:
+
+    def test_event_scoped_rows_routed_by_event_id(self, sharded):
+        """Test that event-scoped rows land on the event's shard, not the central DB"""
+        central, sessions = sharded
+
+        for event_id in (1, 2):
+            db = sessions()
+            db.info["event_id"] = event_id
+            db.add(EventLevel(event_id=event_id, game_id=1, level_number=1))
+            db.commit()
+            assert db.query(EventLevel).filter(EventLevel.event_id == event_id).count() == 1
+            db.close()
+
+        assert _count(central, "event_levels", 1) == 0
+        assert _count(shard_engines[1], "event_levels", 1) == 1
+        assert _count(shard_engines[0], "event_levels", 2) == 1
+
+    def test_cross_shard_join_rejected(self, sharded):
+        """Test that joining a global table to an event-scoped one fails loudly"""
+        _, sessions = sharded
+        db = sessions()
+        db.info["event_id"] = 1
+
+        with pytest.raises(RuntimeError):
+            db.query(EventLevel, Game).join(Game, EventLevel.game_id == Game.game_id).all()
+        db.close()
+
+    def test_move_event_between_shards(self, sharded):
+        """Test moving an event's levels and progress to another shard"""
+        central, sessions = sharded
+        db = sessions()
+        db.info["event_id"] = 1
+        level = EventLevel(event_id=1, game_id=1, level_number=1)
+        db.add(level)
+        db.flush()
+        db.add(UserLevelProgress(user_id=1, event_id=1, level_id=level.level_id, status="completed"))
+        db.add(EventStats(event_id=1, total_participants=1, completed_all_levels=1, correct_name_guesses=0))
+        db.commit()
+        db.close()
+        manifest_service._manifests.set(1, "manifest with the old level ids")
+
+        copied = move_event(1, 0, central=central)
+
+        assert copied == {"event_levels": 1, "media_assets": 0, "user_level_progress": 1, "event_stats": 1}
+        assert _count(shard_engines[0], "event_stats", 1) == 1
+        assert manifest_service._manifests.get(1) is None
+        assert _count(shard_engines[1], "user_level_progress", 1) == 0
+        assert _count(shard_engines[0], "user_level_progress", 1) == 1
+
+        db = sessions()
+        db.info["event_id"] = 1
+        progress = db.query(UserLevelProgress).filter(UserLevelProgress.event_id == 1).one()
+        moved_level = db.query(EventLevel).filter(EventLevel.event_id == 1).one()
+        assert progress.level_id == moved_level.level_id
+        db.close()
+
+    def test_move_refused_with_games_in_progress(self, sharded):
+        """Test that an event is not moved while players hold progress ids"""
+        central, sessions = sharded
+        db = sessions()
+        db.info["event_id"] = 1
+        level = EventLevel(event_id=1, game_id=1, level_number=1)
+        db.add(level)
+        db.flush()
+        db.add(UserLevelProgress(user_id=1, event_id=1, level_id=level.level_id, status="in_progress"))
+        db.commit()
+        db.close()
+
+        with pytest.raises(RuntimeError, match="in progress"):
+            move_event(1, 0, central=central)
+
+        assert _count(shard_engines[1], "user_level_progress", 1) == 1
+        assert _count(shard_engines[0], "event_levels", 1) == 0
+
+    def test_provisioned_events_land_on_their_shards(self, sharded):
+        """Test that bulk provisioning writes cloned levels and stats to each event's shard"""
+        central, sessions = sharded
+        db = sessions()
+        db.info["event_id"] = 1
+        db.add(EventLevel(event_id=1, game_id=1, level_number=1))
+        db.commit()
+        db.close()
+
+        db = sessions()
+        template = load_template(db, 1)
+        results = provision_events(db, [
+            EventCreate(event_name=f"Copy {i}", event_date=datetime.utcnow(), organizer_name="Organizer",
+                        organizer_contact="+919999999999", baby_name="Baby")
+            for i in range(2)
+        ], template)
+        db.close()
+
+        for result in results:
+            event_id = result["event_id"]
+            shard, other = shard_engines[event_id % 2], shard_engines[1 - event_id % 2]
+            assert (_count(shard, "event_levels", event_id), _count(shard, "event_stats", event_id)) == (1, 1)
+            assert _count(other, "event_levels", event_id) == 0
+            assert _count(central, "event_levels", event_id) == 0
+            assert _count(central, "event_shards", event_id) == 1
+
+    def test_provisioning_reports_a_failed_shard(self, sharded):
+        """Test that events whose shard write fails are removed centrally and reported"""
+        central, sessions = sharded
+        with shard_engines[0].begin() as conn:
+            conn.execute(text("DROP TABLE event_stats"))
+
+        db = sessions()
+        results = provision_events(db, [
+            EventCreate(event_name=f"New {i}", event_date=datetime.utcnow(), organizer_name="Organizer",
+                        organizer_contact="+919999999999", baby_name="Baby")
+            for i in range(2)
+        ])
+        db.close()
+
+        assert [result["status"] for result in results] == ["created", "failed"]
+        assert results[1]["detail"] == "Shard 0 unavailable, event not created"
+        created = results[0]["event_id"]
+        assert _count(shard_engines[1], "event_stats", created) == 1
+        with central.connect() as conn:
+            assert conn.execute(text("SELECT event_id FROM events WHERE event_id > 2")).scalars().all() == [created]
+            assert conn.execute(text("SELECT event_id FROM event_shards")).scalars().all() == [created]
+
+    def test_placement_survives_adding_a_shard(self, sharded, tmp_path):
+        """Test that created events keep their recorded shard when SHARD_DATABASE_URLS changes"""
+        from app.api.events import create_event
+
+        central, sessions = sharded
+        db = sessions()
+        event = create_event(EventCreate(
+            event_name="New", event_date=datetime.utcnow(), organizer_name="Organizer",
+            organizer_contact="+919999999999", baby_name="Baby"
+        ), db=db, current_user=None)
+        event_id = event.event_id
+        db.close()
+        assert event_id == 3 and shard_for_event(event_id, central=central) == 1
+
+        configure_shards([f"sqlite:///{tmp_path / f'shard_{i}.db'}" for i in range(3)])
+
+        assert shard_for_event(event_id, central=central) == 1
+        assert shard_for_event(2, central=central) == 2  # no entry: the modulo fallback
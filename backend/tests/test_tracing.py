@@ -0,0 +1,181 @@
+"""
+Tests for request tracing
+"""
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import tracing
+from app.core.config import settings
+from app.database import get_db, get_read_db, get_event_db, get_event_read_db
+from app.services.purge_service import purge_status
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """Enable tracing with an in-memory exporter"""
+    memory = tracing.InMemoryExporter()
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing.tracer, "enabled", True)
+    tracing.tracer.set_exporter(memory)
+    yield memory
+    tracing.tracer.set_exporter(None)
+
+
+@pytest.fixture
+def traced_client(db, exporter):
+    """Test client for an app built with tracing on"""
+    from app.main import create_app
+
+    app = create_app()
+    for dependency in (get_db, get_read_db, get_event_db, get_event_read_db):
+        app.dependency_overrides[dependency] = lambda: db
+    return TestClient(app)
+
+
+class TestRequestSpans:
+
+    def test_request_span_tree(self, traced_client, exporter, auth_headers):
+        """Test that dependencies and SQL nest under the request span"""
+        response = traced_client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+
+        spans = {span.name: span for span in exporter.spans}
+        root = spans["GET /api/auth/me"]
+        dependency = spans["dependency.get_current_user"]
+        queries = [span for span in exporter.spans if span.name == "db.query"]
+
+        assert root.parent_id is None
+        assert root.attributes["http.status_code"] == 200
+        assert dependency.parent_id == root.span_id
+        assert any(q.parent_id == dependency.span_id for q in queries)
+        assert {span.trace_id for span in exporter.spans} == {root.trace_id}
+        assert response.headers["traceparent"] == f"00-{root.trace_id}-{root.span_id}-01"
+
+    def test_incoming_traceparent_continued(self, traced_client, exporter):
+        """Test that an incoming W3C traceparent is used as the parent"""
+        trace_id, parent_id = "a" * 32, "b" * 16
+        traced_client.get("/health", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+
+        root = exporter.spans[-1]
+        assert root.trace_id == trace_id
+        assert root.parent_id == parent_id
+
+    def test_service_spans(self, traced_client, exporter):
+        """Test that service calls get their own spans"""
+        traced_client.post("/api/auth/send-otp", json={"phone_number": "+919876543210"})
+
+        names = [span.name for span in exporter.spans]
+        assert "otp_service.create_otp" in names
+        assert "otp_service.send_otp_sms" in names
+        assert "db.run_write" in names
+
+
+class TestPropagation:
+
+    def test_background_work_joins_the_trace(self, exporter):
+        """Test that propagate() carries the span into another thread"""
+        root = tracing.Span("root", "c" * 32)
+        token = tracing._current_span.set(root)
+        try:
+            task = tracing.propagate(lambda: tracing.current_span().name, name="background.job")
+        finally:
+            tracing._current_span.reset(token)
+
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(name=task()))
+        thread.start()
+        thread.join()
+
+        assert result["name"] == "background.job"
+        span = exporter.spans[-1]
+        assert span.parent_id == root.span_id and span.trace_id == root.trace_id
+
+    def test_purge_joins_the_deleting_request(self, monkeypatch, traced_client, exporter, auth_headers, test_event):
+        """Test that the background purge is traced under the DELETE request"""
+        monkeypatch.setattr(settings, "EVENT_PURGE_DELAY_SECONDS", 0)
+        event_id = test_event.event_id
+        response = traced_client.delete(f"/api/events/{event_id}", headers=auth_headers)
+        trace_id = response.headers["traceparent"].split("-")[1]
+
+        deadline = time.monotonic() + 5
+        while purge_status(event_id).state not in ("done", "failed") and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        [purge] = [span for span in exporter.spans if span.name == "event.purge"]
+        assert purge.trace_id == trace_id
+        assert purge.thread == "event-purger"
+
+    def test_background_loop_starts_its_own_trace(self, exporter):
+        """Test that start_trace() opens a local root span"""
+        with tracing.start_trace("event.lifecycle"):
+            with tracing.start_span("child"):
+                pass
+
+        child, root = exporter.spans
+        assert root.local_root and root.parent_id is None
+        assert child.parent_id == root.span_id and child.trace_id == root.trace_id
+
+    def test_disabled_tracing_is_noop(self, monkeypatch):
+        """Test that nothing is recorded when tracing is off"""
+        monkeypatch.setattr(tracing.tracer, "enabled", False)
+        with tracing.start_span("anything") as span:
+            assert span is tracing.NOOP_SPAN
+
+
+class TestJSONLinesExporter:
+
+    def test_spans_written_one_per_line(self, tmp_path):
+        """Test the local JSON-lines exporter"""
+        path = tmp_path / "traces.jsonl"
+        exporter = tracing.JSONLinesExporter(str(path))
+        span = tracing.Span("GET /health", "d" * 32, attributes={"http.status_code": 200})
+        span.duration = 0.002
+        exporter.export(span)
+        exporter.shutdown()
+
+        [line] = path.read_text().splitlines()
+        record = json.loads(line)
+        assert record["name"] == "GET /health"
+        assert record["trace_id"] == "d" * 32
+        assert record["duration_ms"] == 2.0
+        assert record["attributes"]["http.status_code"] == 200
+
+    def test_background_work_is_flushed(self, monkeypatch, tmp_path):
+        """Test that propagated work ending after its request span still reaches the file"""
+        path = tmp_path / "traces.jsonl"
+        monkeypatch.setattr(tracing.tracer, "enabled", True)
+        tracing.tracer.set_exporter(tracing.JSONLinesExporter(str(path)))
+        try:
+            request = tracing.Span("GET /x", "a" * 32)
+            request.local_root = True
+            token = tracing._current_span.set(request)
+            task = tracing.propagate(lambda: None, name="background.job")
+            tracing._current_span.reset(token)
+            request.end()
+
+            thread = threading.Thread(target=task)
+            thread.start()
+            thread.join()
+
+            names = [json.loads(line)["name"] for line in path.read_text().splitlines()]
+            assert names == ["GET /x", "background.job"]
+        finally:
+            tracing.tracer.set_exporter(None)
+
+    def test_continued_trace_is_flushed(self, tmp_path):
+        """Test that a request span with a remote parent still flushes the file"""
+        path = tmp_path / "traces.jsonl"
+        exporter = tracing.JSONLinesExporter(str(path))
+        span = tracing.Span("GET /health", "e" * 32, parent_id="f" * 16)
+        span.local_root = True
+        span.duration = 0.001
+        exporter.export(span)
+
+        try:
+            assert len(path.read_text().splitlines()) == 1
+        finally:
+            exporter.shutdown()
@@ -0,0 +1,162 @@
+"""
+Tests for the single-writer queue with group commit
+"""
+import threading
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import write_executor
+from app.core.config import settings
+from app.database import Base, build_engine
+from app.core.write_executor import WriteExecutor, run_write
+from app.models import User
+
+
+@pytest.fixture
+def writer_sessions(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'writer.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    engine.dispose()
+
+
+class TestWriteExecutor:
+
+    def test_batch_is_one_transaction(self, writer_sessions):
+        """Test that a failed group commit rolls back every unit of the batch"""
+        class FailingCommitSession(Session):
+            def commit(self):
+                raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+
+        failing = sessionmaker(class_=FailingCommitSession, autoflush=False, bind=writer_sessions.kw["bind"])
+        executor = WriteExecutor(failing, max_batch=100, max_wait_ms=200)
+
+        def create_user(i):
+            def unit(session):
+                session.add(User(name=f"Guest {i}", phone_number=f"+91900000{i:04d}"))
+                session.flush()
+            return unit
+
+        futures = [executor.submit(create_user(i)) for i in range(10)]
+        for future in futures:
+            with pytest.raises(OperationalError):
+                future.result(timeout=10)
+        executor.shutdown()
+
+        assert executor.batches_committed == 0
+        session = writer_sessions()
+        assert session.query(User).count() == 0
+        session.close()
+
+    def test_units_share_a_commit(self, writer_sessions):
+        """Test that queued units are committed together and each caller gets its own result"""
+        executor = WriteExecutor(writer_sessions, max_batch=100, max_wait_ms=200)
+
+        def create_user(i):
+            def unit(session):
+                user = User(name=f"Guest {i}", phone_number=f"+91900000{i:04d}")
+                session.add(user)
+                session.flush()
+                return user.user_id
+            return unit
+
+        futures = [executor.submit(create_user(i)) for i in range(20)]
+        user_ids = [f.result(timeout=10) for f in futures]
+        executor.shutdown()
+
+        assert len(set(user_ids)) == 20
+        assert (executor.batches_committed, executor.units_committed) == (1, 20)
+
+    def test_dead_writer_is_restarted(self, writer_sessions):
+        """Test that submit() starts a new writer thread if the previous one died"""
+        executor = WriteExecutor(writer_sessions)
+        executor.submit(lambda session: None).result(timeout=10)
+        executor._queue.put(write_executor._STOP)  # ends the thread without clearing it
+        executor._thread.join(timeout=10)
+
+        assert executor.submit(lambda session: "ok").result(timeout=10) == "ok"
+        executor.shutdown()
+
+    def test_failed_unit_does_not_affect_batch(self, writer_sessions):
+        """Test that one failing unit gets its own error while others commit"""
+        executor = WriteExecutor(writer_sessions, max_batch=10, max_wait_ms=50)
+
+        def create_user(phone):
+            def unit(session):
+                session.add(User(name="Guest", phone_number=phone))
+                session.flush()
+                return phone
+            return unit
+
+        ok = executor.submit(create_user("+919000000001"))
+        duplicate = executor.submit(create_user("+919000000001"))
+        other = executor.submit(create_user("+919000000002"))
+
+        assert ok.result(timeout=10) == "+919000000001"
+        with pytest.raises(Exception):
+            duplicate.result(timeout=10)
+        assert other.result(timeout=10) == "+919000000002"
+        executor.shutdown()
+
+        session = writer_sessions()
+        assert session.query(User).count() == 2
+        session.close()
+
+    def test_run_write_without_queue_commits_on_session(self, db):
+        """Test that run_write falls back to the caller's session when disabled"""
+        def create_user(session):
+            user = User(name="Direct", phone_number="+919000000003")
+            session.add(user)
+            return user
+
+        user = run_write(db, create_user)
+
+        assert user.user_id is not None
+        assert db.query(User).filter(User.name == "Direct").count() == 1
+
+    def test_pending_changes_are_refused(self, db, monkeypatch, writer_sessions):
+        """Test that run_write refuses to drop changes made on the request session"""
+        monkeypatch.setattr(settings, "WRITE_QUEUE_ENABLED", True)
+        monkeypatch.setattr(write_executor, "_executor", WriteExecutor(writer_sessions))
+        db.add(User(name="Pending", phone_number="+919000000009"))
+
+        with pytest.raises(RuntimeError, match="uncommitted changes"):
+            run_write(db, lambda session: None)
+        assert len(db.new) == 1
+        write_executor._executor.shutdown()
+
+    def test_queue_does_not_starve_on_pool(self, tmp_path, monkeypatch):
+        """Test that more waiting writers than pooled connections all complete"""
+
+        engine = build_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=2, max_overflow=0, pool_timeout=3)
+        Base.metadata.create_all(bind=engine)
+        request_sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        executor = WriteExecutor(sessionmaker(autoflush=False, expire_on_commit=False, bind=engine))
+        monkeypatch.setattr(settings, "WRITE_QUEUE_ENABLED", True)
+        monkeypatch.setattr(write_executor, "_executor", executor)
+
+        errors = []
+
+        def request(i):
+            db = request_sessions()
+            try:
+                db.query(User).count()  # the request holds a connection, as get_db does
+                run_write(db, lambda session: session.add(User(name="Guest", phone_number=f"+91910000{i:04d}")))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        executor.shutdown()
+
+        assert errors == []
+        session = request_sessions()
+        assert session.query(User).count() == 8
+        session.close()
+        engine.dispose()